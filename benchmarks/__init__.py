@@ -0,0 +1,13 @@
+"""Measure the bot's hot paths offline, without a Discord connection.
+
+Run from the project root, e.g. `python -m benchmarks core --guilds 50`.
+"""
+
+import os
+import sys
+
+# The bot's packages live in /src and are imported as top-level packages.
+SRC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
@@ -0,0 +1,53 @@
+"""Run a benchmark scenario and write its results as JSON."""
+
+import argparse
+import asyncio
+import json
+
+from . import (core, dst, feeds, gateway, harness, lifecycle, loadgen, outbox,
+               priorities, reload, scheduler, serialization, snapshots)
+
+# Every scenario module exposes add_arguments(parser) and async run(args) -> dict.
+SCENARIOS = {
+    'core': core,
+    'dst': dst,
+    'feeds': feeds,
+    'gateway': gateway,
+    'lifecycle': lifecycle,
+    'loadgen': loadgen,
+    'outbox': outbox,
+    'priorities': priorities,
+    'reload': reload,
+    'scheduler': scheduler,
+    'serialization': serialization,
+    'snapshots': snapshots,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--output', help='Where to write the results.'
+                                         ' Defaults to benchmarks/results/.')
+    subparsers = parser.add_subparsers(dest='scenario', required=True)
+
+    for name, module in SCENARIOS.items():
+        module.add_arguments(subparsers.add_parser(name, help=module.__doc__))
+
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            return await SCENARIOS[args.scenario].run(args)
+        finally:
+            await harness.drain()
+
+    results = asyncio.run(run())
+    params = {key: value for key, value in vars(args).items() if key not in ('output',)}
+    path = harness.write_results(args.scenario, params, results, args.output)
+
+    print(json.dumps(results, indent=2))
+    print(f'Results written to {path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark model operations, persistence and slash command bodies."""
+
+import argparse
+import contextlib
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from cogs.tasks import Tasks
+from cogs.teams import Teams
+from core import models, serialization
+from core.data_management import DataManager, data_manager
+from utils.dt_utils import DATE_FORMATS
+from . import fakes, fleet, harness, slash
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--teams', type=int, default=5, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=100, help='Per team.')
+    parser.add_argument('--tags', type=int, default=20, help='Distinct tags per team.')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build a fleet and time every hot path on it."""
+    bot = fleet.build_fleet(fleet.FleetConfig(guilds=args.guilds, teams=args.teams,
+                                              tasks=args.tasks, tags=args.tags,
+                                              seed=args.seed))
+    repeat = args.repeat
+    results = {}
+
+    # The last guild is the worst case for a linear search.
+    guild = data_manager.guilds[-1]
+    team = guild.teams[-1]
+    tags = sorted({tag for task in team.tasks for tag in task.tags})[:2]
+    now = datetime.now(guild.tz)
+
+    results['get_guild'] = harness.measure(
+        lambda: data_manager.get_guild(guild.disc_guild_obj), repeat)
+    results['arrange_by_due_date'] = harness.measure(
+        lambda: models.Team.arrange_by_due_date(team.tasks), repeat)
+    results['get_tasks_in_range'] = harness.measure(
+        lambda: team.get_tasks_in_range(now, now + timedelta(days=2)), repeat)
+    results['search_for_tags'] = harness.measure(
+        lambda: team.search_for_tags(tags + ['unknown']), repeat)
+    query = ' '.join(team.tasks[0].content.split()[:2])
+    results['search_tasks'] = harness.measure(lambda: team.search_tasks(query), repeat)
+    results['encode_guild'] = harness.measure(lambda: serialization.encode_guild(guild), repeat)
+
+    # Stored data is applied to the guilds already loaded, like on a reload.
+    record = serialization.encode_guild(guild)
+    results['reconcile_guild'] = harness.measure(
+        lambda: serialization.reconcile_guild(guild, record), repeat)
+
+    # Persistence goes to a scratch file instead of the bot's data directory,
+    # and its logging is kept, but out of the way.
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        default_paths = DataManager.JSON_PATH, DataManager.SNAPSHOT_PATH
+        DataManager.JSON_PATH = os.path.join(directory, 'guilds.json')
+        DataManager.SNAPSHOT_PATH = os.path.join(directory, 'guilds.snapshot')
+
+        try:
+            results['save_data'] = harness.measure(data_manager.save_data, max(1, repeat // 4))
+            results['file_size_bytes'] = os.path.getsize(DataManager.SNAPSHOT_PATH)
+            live_guilds = data_manager.guilds
+            results['load_data'] = await harness.measure_async(
+                lambda: data_manager.load_data(bot), max(1, repeat // 4))
+            data_manager.guilds = live_guilds
+
+        finally:
+            DataManager.JSON_PATH, DataManager.SNAPSHOT_PATH = default_paths
+
+    results['commands'] = await _time_commands(bot, guild, team, tags, repeat)
+    return results
+
+
+async def _time_commands(bot: fakes.FakeBot, guild: models.Guild, team: models.Team,
+                         tags: list, repeat: int) -> Dict[str, Any]:
+    """Time every slash command body end to end, checks included."""
+    tasks_cog = Tasks(bot)
+    teams_cog = Teams(bot)
+    author = fleet.single_team_member(guild, team)
+
+    query = ' '.join(team.tasks[0].content.split()[:2])
+    date_format = DATE_FORMATS[guild.locale] + '/%Y'
+    busiest_day, busiest_tasks = max(models.Team.arrange_by_due_date(team.tasks).items(),
+                                     key=lambda x: len(x[1]))
+    busiest_date = busiest_day.strftime(date_format)
+    # Tasks are picked by index from the last list the user was shown.
+    team.remember_listing(author.id, busiest_day, busiest_tasks)
+    future_date = (datetime.now(guild.tz) + timedelta(days=7)).strftime(date_format)
+
+    invocations = {
+        '_tasks': (tasks_cog, {}),
+        '_summary': (tasks_cog, {}),
+        '_due_on': (tasks_cog, {'date': busiest_date}),
+        '_tagged_with': (tasks_cog, {'tags': ';'.join(tags[:1])}),
+        '_search': (tasks_cog, {'query': query}),
+        '_new_task': (tasks_cog, {'content': 'benchmark task', 'due_date': future_date,
+                                  'tags': ';'.join(tags)}),
+        '_edit_task': (tasks_cog, {'date': busiest_date, 'task': '1'}),
+        '_delete_tasks': (tasks_cog, {'date': busiest_date}),
+        '_teams': (teams_cog, {}),
+    }
+
+    results = {}
+
+    for name, (cog, options) in invocations.items():
+        async def invoke():
+            ctx = fakes.FakeSlashContext(guild.disc_guild_obj, author, name.lstrip('_'))
+            await slash.invoke(cog, name, ctx, **options)
+
+        results[name] = await harness.measure_async(invoke, repeat)
+
+    return results
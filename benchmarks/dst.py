@@ -0,0 +1,131 @@
+"""Simulate a year of batches and recurring tasks across daylight saving transitions."""
+
+import argparse
+import datetime as dt
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from utils import dt_utils, tz_utils
+from . import harness
+
+ZONES = ['America/New_York', 'Europe/London', 'Australia/Sydney', 'Australia/Lord_Howe',
+         'America/Sao_Paulo', 'Asia/Kolkata', 'UTC-5']
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--zones', nargs='+', default=ZONES)
+    parser.add_argument('--year', type=int, default=datetime.now(timezone.utc).year)
+    parser.add_argument('--repeat', type=int, default=20)
+    # Guild.BATCH_TIME, given here so these checks don't need discord.
+    parser.add_argument('--batch-time', default='06:00')
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Check every zone's schedule over a year, hour by hour, and time the lookups."""
+    results = {}
+    batch_time = dt.time.fromisoformat(args.batch_time)
+
+    for name in args.zones:
+        tz = tz_utils.get_zone(name)
+        tz_utils.transition_table(tz, args.year)
+        start = datetime(args.year, 1, 1, tzinfo=timezone.utc)
+        stop = datetime(args.year + 1, 1, 1, tzinfo=timezone.utc)
+
+        errors = (_check_offsets(tz, args.year, start, stop)
+                  + _check_batches(tz, batch_time, start, stop)
+                  + _check_recurrence(tz, args.year))
+
+        table = tz_utils.transition_table(tz, args.year)
+        middle = datetime(args.year, 7, 1, tzinfo=timezone.utc)
+
+        results[name] = {
+            'transitions': [i.isoformat() for i in table.instants
+                            if start <= i < stop],
+            'errors': errors[:20],
+            'passed': not errors,
+            'build_table': harness.measure(
+                lambda: tz_utils.TransitionTable(tz, table.start, table.stop),
+                max(1, args.repeat // 10)),
+            'next_local_time': harness.measure(
+                lambda: tz_utils.next_local_time(tz, batch_time, middle),
+                args.repeat),
+        }
+
+    results['passed'] = all(i['passed'] for i in results.values())
+    return results
+
+
+def _check_offsets(tz, year: int, start: datetime, stop: datetime) -> List[str]:
+    """Compare the table against the zone itself every hour, and place every local hour."""
+    table = tz_utils.transition_table(tz, year)
+    errors = []
+    instant = start
+
+    while instant < stop:
+        if table.offset_at(instant) != instant.astimezone(tz).utcoffset():
+            errors.append(f'Wrong offset at {instant.isoformat()}')
+
+        # Every instant must round trip through its local time, except the repeated hour,
+        # where the earlier of the two is expected.
+        local = instant.astimezone(tz).replace(tzinfo=None)
+        placed = table.to_utc(local)
+
+        if placed != instant and placed.astimezone(tz).replace(tzinfo=None) != local:
+            errors.append(f'{local.isoformat()} placed at {placed.isoformat()}')
+
+        instant += timedelta(hours=1)
+
+    return errors
+
+
+def _check_batches(tz, batch_time: dt.time, start: datetime, stop: datetime) -> List[str]:
+    """Walk the batch schedule for a year, the way Guild.auto_batch_notify does."""
+    errors = []
+    instant = tz_utils.next_local_time(tz, batch_time, start)
+    batches = 0
+
+    while instant < stop:
+        local = instant.astimezone(tz)
+
+        if local.time() != batch_time:
+            errors.append(f'Batch at {local.isoformat()}')
+
+        following = tz_utils.next_local_time(tz, batch_time, instant)
+
+        # A day is at most an hour (half an hour on Lord Howe Island) off.
+        if abs(following - instant - timedelta(days=1)) > timedelta(hours=1):
+            errors.append(f'{following - instant} between batches at {local.isoformat()}')
+
+        instant = following
+        batches += 1
+
+    days = (stop - start).days
+
+    if abs(batches - days) > 1:
+        errors.append(f'{batches} batches in {days} days')
+
+    return errors
+
+
+def _check_recurrence(tz, year: int) -> List[str]:
+    """Check that recurring tasks keep their wall-clock time through transitions."""
+    errors = []
+
+    for recurrence, count in (('daily', 366), ('weekly', 53), ('monthly', 12)):
+        series_start = datetime(year, 1, 31, 9, tzinfo=tz)
+        occurrences = [dt_utils.occurrence(series_start, recurrence, i) for i in range(count + 1)]
+
+        for occurrence in occurrences[:count]:
+            if occurrence.astimezone(tz).time() != series_start.time():
+                errors.append(f'{recurrence} occurrence at {occurrence.isoformat()}')
+
+        # Finding the next occurrence must agree with walking the series.
+        after = datetime(year, 10, 15, 12, tzinfo=tz)
+        walked = next(i for i in occurrences if i > after)
+        found = dt_utils.next_occurrence(series_start, recurrence, after)
+
+        if found != walked:
+            errors.append(f'{recurrence} next occurrence {found} instead of {walked}')
+
+    return errors
@@ -0,0 +1,257 @@
+"""Lightweight stand-ins for the discord.py and discord-py-slash-command objects the bot uses.
+
+They only implement what the bot touches, so they're cheap to create by the thousand.
+"""
+
+import asyncio
+import itertools
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import discord
+
+# Snowflakes only need to be unique.
+_ids = itertools.count(10 ** 17)
+
+
+def new_id() -> int:
+    """Return a fresh, unique snowflake."""
+    return next(_ids)
+
+
+class FakePermissions:
+    """Grant every permission the bot checks for."""
+
+    send_messages = True
+    administrator = True
+
+
+class FakeResponse:
+    """Stand in for the aiohttp response discord.HTTPException is built from."""
+
+    def __init__(self, status: int, reason: str = 'Service Unavailable'):
+        self.status = status
+        self.reason = reason
+
+
+class FakeRole:
+    """Stand in for discord.Role."""
+
+    def __init__(self, guild: 'FakeGuild', name: str):
+        self.id = new_id()
+        self.guild = guild
+        self.name = name
+        self.color = discord.Color.blue()
+        self.position = 0
+
+    @property
+    def mention(self) -> str:
+        return f'<@&{self.id}>'
+
+    async def delete(self):
+        self.guild.roles.remove(self)
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeRole) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class FakeMember:
+    """Stand in for discord.Member."""
+
+    def __init__(self, guild: 'FakeGuild', name: str, roles: List[FakeRole] = None):
+        self.id = new_id()
+        self.guild = guild
+        self.name = name
+        self.roles = roles if roles is not None else []
+
+    @property
+    def mention(self) -> str:
+        return f'<@{self.id}>'
+
+    async def add_roles(self, *roles: FakeRole):
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles: FakeRole):
+        for role in roles:
+            self.roles.remove(role)
+
+    async def send(self, *args, **kwargs) -> 'FakeMessage':
+        return FakeMessage(None, *args, **kwargs)
+
+    def __str__(self) -> str:
+        return self.name
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeMember) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class FakeMessage:
+    """Stand in for discord.Message."""
+
+    def __init__(self, channel: Optional['FakeTextChannel'], content: str = None,
+                 embed: discord.Embed = None, **kwargs):
+        self.id = new_id()
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.reactions: List[str] = []
+
+    async def add_reaction(self, emoji: str):
+        self.reactions.append(emoji)
+
+    async def clear_reactions(self):
+        self.reactions.clear()
+
+    async def edit(self, content: str = None, embed: discord.Embed = None, **kwargs):
+        self.content = content if content is not None else self.content
+        self.embed = embed if embed is not None else self.embed
+
+    async def delete(self):
+        pass
+
+
+class FakeTextChannel:
+    """Stand in for discord.TextChannel. Keeps every message sent to it."""
+
+    def __init__(self, guild: 'FakeGuild', name: str):
+        self.id = new_id()
+        self.guild = guild
+        self.name = name
+        self.type = discord.ChannelType.text
+        self.sent: List[FakeMessage] = []
+
+    def permissions_for(self, member: FakeMember) -> FakePermissions:
+        return FakePermissions()
+
+    async def send(self, content: str = None, **kwargs) -> FakeMessage:
+        message = FakeMessage(self, content, **kwargs)
+        self.sent.append(message)
+        return message
+
+
+class FakeGuild:
+    """Stand in for discord.Guild."""
+
+    def __init__(self, name: str):
+        self.id = new_id()
+        self.name = name
+        self.roles: List[FakeRole] = []
+        self.members: List[FakeMember] = []
+        self.me = FakeMember(self, 'Ivone')
+        self.text_channels = [FakeTextChannel(self, 'general')]
+        self.system_channel = self.text_channels[0]
+
+    @property
+    def channels(self) -> List[FakeTextChannel]:
+        return self.text_channels
+
+    async def create_role(self, name: str, **kwargs) -> FakeRole:
+        role = FakeRole(self, name)
+        self.roles.append(role)
+        return role
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeSlashContext:
+    """Stand in for discord_slash.SlashContext. Keeps every reply sent through it."""
+
+    def __init__(self, guild: FakeGuild, author: FakeMember, name: str):
+        self.guild = guild
+        self.author = author
+        self.channel = guild.text_channels[0]
+        self.name = self.command = self.invoked_with = name
+        # Invoked just now.
+        self.interaction_id = str(discord.utils.time_snowflake(
+            datetime.now(timezone.utc).replace(tzinfo=None)))
+        self.responded = False
+        self.deferred = False
+        self.sent: List[FakeMessage] = []
+
+    async def defer(self, hidden: bool = False):
+        self.deferred = True
+
+    async def send(self, content: str = '', *, file=None, files=None, **kwargs) -> FakeMessage:
+        # Like discord_slash, acknowledge before sending files as the first reply.
+        if (file or files) and not self.responded and not self.deferred:
+            await self.defer()
+
+        self.responded = True
+        message = FakeMessage(self.channel, content, **kwargs)
+        self.sent.append(message)
+        return message
+
+
+class FakeReaction:
+    """Stand in for discord.Reaction."""
+
+    def __init__(self, message: FakeMessage, emoji: str):
+        self.message = message
+        self.emoji = emoji
+
+
+class FakeRawReactionEvent:
+    """Stand in for discord.RawReactionActionEvent."""
+
+    def __init__(self, user_id: int, message_id: int, emoji: str,
+                 event_type: str = 'REACTION_ADD'):
+        self.user_id = user_id
+        self.message_id = message_id
+        self.emoji = emoji
+        self.event_type = event_type
+
+
+class FakeBot:
+    """Stand in for commands.Bot.
+    Events waited on are answered by responders, which are registered per event name
+    and receive the wait_for check so they can build an answer that passes it.
+    Dispatched events go to listeners, each run in its own task, like discord.py does.
+    """
+
+    def __init__(self, guilds: List[FakeGuild] = None):
+        self.guilds = guilds if guilds is not None else []
+        self.user = FakeMember(None, 'Ivone')
+        self.latency = 0.0
+        self.responders: Dict[str, Callable[[Callable], Any]] = {}
+        self.listeners: Dict[str, List[Callable]] = {}
+
+    def get_guild(self, id_: int) -> Optional[FakeGuild]:
+        return next((i for i in self.guilds if i.id == id_), None)
+
+    def get_channel(self, id_: int) -> Optional[FakeTextChannel]:
+        return next((channel for guild in self.guilds for channel in guild.text_channels
+                     if channel.id == id_), None)
+
+    async def wait_until_ready(self):
+        pass
+
+    async def wait_for(self, event: str, *, timeout: float = None, check: Callable = None):
+        if event not in self.responders:
+            raise asyncio.TimeoutError
+
+        answer = self.responders[event](check)
+
+        if asyncio.iscoroutine(answer):
+            answer = await answer
+
+        return answer
+
+    def add_listener(self, func: Callable, name: str):
+        self.listeners.setdefault(name, []).append(func)
+
+    def remove_listener(self, func: Callable, name: str):
+        self.listeners.get(name, []).remove(func)
+
+    def dispatch(self, event: str, *args):
+        for listener in self.listeners.get(f'on_{event}', []):
+            asyncio.create_task(listener(*args))
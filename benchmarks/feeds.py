@@ -0,0 +1,82 @@
+"""Load test the calendar feed server with concurrent local clients."""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List
+
+import aiohttp
+
+from core.data_management import data_manager
+from core.feed_server import FeedServer
+from core.metrics import metrics
+from . import fleet, harness
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--teams', type=int, default=5, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=100, help='Per team.')
+    parser.add_argument('--clients', type=int, default=50, help='Concurrent clients.')
+    parser.add_argument('--requests', type=int, default=40, help='Per client.')
+    parser.add_argument('--mutation-rate', type=float, default=0.05,
+                        help='Chance that a team changes before each request.')
+    parser.add_argument('--port', type=int, default=9878)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Serve a fleet's feeds locally and poll them the way calendar apps do."""
+    fleet.build_fleet(fleet.FleetConfig(guilds=args.guilds, teams=args.teams,
+                                        tasks=args.tasks, seed=args.seed))
+    teams = [team for guild in data_manager.guilds for team in guild.teams]
+    rng = random.Random(args.seed)
+
+    server = FeedServer()
+    await server.start('127.0.0.1', args.port)
+    base_url = f'http://127.0.0.1:{args.port}/feeds'
+
+    samples = {'200': [], '304': []}
+
+    async def client(session: aiohttp.ClientSession, team_indexes: List[int]):
+        # Like a calendar app, remember the last ETag seen for each feed.
+        etags = {}
+
+        for index in team_indexes:
+            team = teams[index]
+
+            if rng.random() < args.mutation_rate:
+                team.touch()
+
+            headers = {'If-None-Match': etags[index]} if index in etags else {}
+            start = time.perf_counter()
+
+            async with session.get(f'{base_url}/{team.feed_token}.ics',
+                                   headers=headers) as response:
+                await response.read()
+                samples[str(response.status)].append(time.perf_counter() - start)
+                etags[index] = response.headers['ETag']
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            start = time.perf_counter()
+            await asyncio.gather(*(
+                client(session, [rng.randrange(len(teams)) for _ in range(args.requests)])
+                for _ in range(args.clients)))
+            elapsed = time.perf_counter() - start
+
+    finally:
+        await server.stop()
+
+    renders = metrics.counters.get('ivone_feed_renders_total', {})
+    render_time = metrics.histograms['ivone_operation_seconds'][(('operation', 'render_feed'),)]
+    total = sum(len(i) for i in samples.values())
+
+    return {'requests': total,
+            'requests_per_second': total / elapsed,
+            'status_200': harness.summarize(samples['200']) if samples['200'] else None,
+            'status_304': harness.summarize(samples['304']) if samples['304'] else None,
+            'renders': {dict(labels)['result']: count for labels, count in renders.items()},
+            'render_mean_ms': render_time.sum / render_time.count * 1000}
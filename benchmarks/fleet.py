@@ -0,0 +1,104 @@
+"""Generate synthetic fleets of guilds, teams and tasks."""
+
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List
+
+from core import models
+from core.data_management import data_manager
+from utils import dt_utils
+from . import fakes
+
+WORDS = ['review', 'deploy', 'write', 'report', 'meeting', 'budget', 'homework', 'essay',
+         'design', 'call', 'client', 'draft', 'release', 'exam', 'slides', 'invoice']
+
+
+@dataclass
+class FleetConfig:
+    """Describe the shape of a synthetic fleet."""
+
+    guilds: int = 10
+    teams: int = 5  # Per guild.
+    tasks: int = 100  # Per team.
+    tags: int = 20  # Distinct tags per team.
+    members: int = 10  # Per team.
+    # How many days ahead of now tasks are spread over.
+    horizon: int = 60
+    seed: int = 0
+
+
+def build_fleet(config: FleetConfig) -> fakes.FakeBot:
+    """Build a fleet and install it in the data manager.
+    Must be called from a running event loop, since guilds and tasks start background tasks.
+    """
+
+    rng = random.Random(config.seed)
+    bot = fakes.FakeBot()
+    data_manager.guilds = []
+
+    for guild_index in range(config.guilds):
+        add_guild(bot, rng, config, f'guild-{guild_index}')
+
+    data_manager.bind(data_manager.guilds)
+    return bot
+
+
+def add_guild(bot: fakes.FakeBot, rng: random.Random, config: FleetConfig,
+              name: str) -> models.Guild:
+    """Add a guild shaped like the rest of the fleet, as if the bot had just joined it."""
+    disc_guild = fakes.FakeGuild(name)
+    bot.guilds.append(disc_guild)
+    guild = data_manager.get_guild(disc_guild)
+
+    for team_index in range(config.teams):
+        role = fakes.FakeRole(disc_guild, f'team-{team_index}')
+        disc_guild.roles.append(role)
+        team = models.Team(role=role)
+        guild.add_team(team)
+
+        for member_index in range(config.members):
+            disc_guild.members.append(
+                fakes.FakeMember(disc_guild, f'member-{team_index}-{member_index}', [role]))
+
+        tag_pool = [f'{rng.choice(WORDS)}{i}' for i in range(config.tags)]
+
+        for _ in range(config.tasks):
+            team.add_task(random_task(rng, guild, tag_pool, config.horizon))
+
+    return guild
+
+
+def fill_unscheduled(guilds: List[models.Guild], rng: random.Random, config: FleetConfig,
+                     recurring: float = 0.0):
+    """Give every team config.tasks tasks without scheduling their notifications,
+    for measuring stored data, which doesn't need them, at sizes notifications won't fit.
+    """
+
+    for guild in guilds:
+        for team in guild.teams:
+            tag_pool = [f'{rng.choice(WORDS)}{i}' for i in range(config.tags)]
+            team.tasks = [random_task(rng, guild, tag_pool, config.horizon)
+                          for _ in range(config.tasks)]
+
+            for task in team.tasks:
+                task.id = team.new_task_id()
+
+                if rng.random() < recurring:
+                    task.recurrence = rng.choice(list(models.Task.RECURRENCES))
+
+
+def random_task(rng: random.Random, guild: models.Guild, tag_pool: List[str],
+                horizon: int) -> models.Task:
+    """Return a task due sometime within the horizon, in whole minutes."""
+    due_datetime = (dt_utils.now(guild.tz).replace(second=0, microsecond=0)
+                    + timedelta(minutes=rng.randrange(60, horizon * 24 * 60)))
+
+    return models.Task(content=' '.join(rng.choices(WORDS, k=rng.randint(2, 8))),
+                       tags=rng.sample(tag_pool, k=min(len(tag_pool), rng.randint(0, 3))),
+                       due_datetime=due_datetime)
+
+
+def single_team_member(guild: models.Guild, team: models.Team) -> fakes.FakeMember:
+    """Return a guild member who is only in the given team."""
+    return next(i for i in guild.disc_guild_obj.members if i.roles == [team.role])
@@ -0,0 +1,171 @@
+"""Compare the resident memory of discord.py's caches under each gateway mode."""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator
+
+import discord
+
+from core import gateway
+
+MODES = ['full', 'default', 'low_memory']
+# Every mode runs in its own process, so memory one leaves behind isn't counted for another.
+CHILD_FLAG = '--child'
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=200)
+    parser.add_argument('--members', type=int, default=500, help='Per guild.')
+    parser.add_argument('--roles', type=int, default=20, help='Per guild.')
+    parser.add_argument('--channels', type=int, default=10, help='Per guild.')
+    parser.add_argument('--messages', type=int, default=20000,
+                        help='Sent across the fleet while the bot is connected.')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Feed the same synthetic gateway traffic to a client in every mode and measure RSS."""
+    results = {}
+
+    for mode in args.modes:
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, '-m', 'benchmarks.gateway', CHILD_FLAG, mode,
+            str(args.guilds), str(args.members), str(args.roles), str(args.channels),
+            str(args.messages),
+            stdout=asyncio.subprocess.PIPE)
+
+        stdout, _ = await process.communicate()
+        results[mode] = json.loads(stdout)
+
+    if 'default' in results and 'low_memory' in results:
+        saved = results['default']['rss_bytes'] - results['low_memory']['rss_bytes']
+        results['low_memory_saves_bytes'] = saved
+        results['low_memory_saves_ratio'] = saved / max(1, results['default']['rss_bytes'])
+
+    return results
+
+
+def client_options(mode: str) -> Dict[str, Any]:
+    """Return the options a client is created with in a mode."""
+    # What the bot would use if it were granted every privileged intent.
+    if mode == 'full':
+        return {'intents': discord.Intents.all()}
+
+    return gateway.client_options(low_memory=mode == 'low_memory')
+
+
+def measure(mode: str, guilds: int, members: int, roles: int, channels: int,
+            messages: int) -> Dict[str, Any]:
+    """Parse a synthetic fleet's guilds and messages the way the gateway would send them,
+    and return how much resident memory the client's caches grew by.
+    """
+
+    client = discord.Client(**client_options(mode))
+    state = client._connection
+    ids = _snowflakes()
+    state.user = discord.ClientUser(state=state, data=_user(next(ids), 'ivone'))
+
+    # Payloads are built as they're parsed, like they'd arrive, and freed right after.
+    gc.collect()
+    before = _rss_bytes()
+
+    for _ in range(guilds):
+        state._add_guild_from_data(_guild(ids, state.user.id, state.intents, members, roles,
+                                          channels))
+
+    # Messages are only sent to clients subscribed to them.
+    if state.intents.guild_messages:
+        targets = [(guild.id, [i.id for i in guild.text_channels]) for guild in client.guilds]
+
+        for index in range(messages):
+            guild_id, channel_ids = targets[index % guilds]
+            state.parse_message_create(_message(ids, guild_id, channel_ids[index % channels],
+                                                index))
+
+        del targets
+
+    gc.collect()
+
+    return {'rss_bytes': _rss_bytes() - before,
+            'guilds': len(client.guilds),
+            'cached_members': sum(len(i.members) for i in client.guilds),
+            'cached_users': len(client.users),
+            'cached_messages': len(client.cached_messages),
+            'intents': state.intents.value}
+
+
+def _rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+    # Not on Linux. The peak is the closest there is.
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _snowflakes() -> Iterator[int]:
+    snowflake = 700000000000000000
+
+    while True:
+        snowflake += 1
+        yield snowflake
+
+
+def _user(id_: int, name: str) -> Dict[str, Any]:
+    return {'id': str(id_), 'username': name, 'discriminator': f'{id_ % 9000 + 1000}',
+            'avatar': None}
+
+
+def _guild(ids: Iterator[int], self_id: int, intents: discord.Intents, members: int,
+           roles: int, channels: int) -> Dict[str, Any]:
+    guild_id = next(ids)
+    joined_at = datetime.now(timezone.utc).isoformat()
+    role_ids = [next(ids) for _ in range(roles)]
+
+    # @everyone shares the guild's ID.
+    role_payloads = [{'id': str(guild_id), 'name': '@everyone', 'position': 0,
+                      'permissions': '104324673'}]
+    role_payloads += [{'id': str(id_), 'name': f'team-{index}', 'position': index + 1,
+                       'permissions': '0', 'color': id_ % 0xFFFFFF}
+                      for index, id_ in enumerate(role_ids)]
+
+    channel_payloads = [{'id': str(next(ids)), 'type': 0, 'name': f'channel-{index}',
+                         'position': index, 'permission_overwrites': []}
+                        for index in range(channels)]
+
+    # Without the members intent, guilds only come with the bot's own member.
+    member_ids = [next(ids) for _ in range(members)] if intents.members else []
+    member_payloads = [{'user': _user(id_, f'member-{id_}'),
+                        'roles': [str(i) for i in role_ids[id_ % roles:][:2]],
+                        'joined_at': joined_at, 'deaf': False, 'mute': False}
+                       for id_ in member_ids + [self_id]]
+
+    return {'id': str(guild_id), 'name': f'guild-{guild_id}', 'owner_id': str(self_id),
+            'member_count': members, 'roles': role_payloads, 'channels': channel_payloads,
+            'members': member_payloads, 'emojis': [], 'features': []}
+
+
+def _message(ids: Iterator[int], guild_id: int, channel_id: int,
+             index: int) -> Dict[str, Any]:
+    author_id = next(ids)
+
+    return {'id': str(next(ids)), 'channel_id': str(channel_id), 'guild_id': str(guild_id),
+            'author': _user(author_id, f'author-{author_id}'),
+            'member': {'roles': [], 'joined_at': None, 'deaf': False, 'mute': False},
+            'content': f'Message {index} ' + 'lorem ipsum ' * 8,
+            'timestamp': datetime.now(timezone.utc).isoformat(), 'edited_timestamp': None,
+            'tts': False, 'mention_everyone': False, 'mentions': [], 'mention_roles': [],
+            'attachments': [], 'embeds': [], 'pinned': False, 'type': 0}
+
+
+if __name__ == '__main__' and sys.argv[1:2] == [CHILD_FLAG]:
+    mode_, *counts = sys.argv[2:]
+    print(json.dumps(measure(mode_, *map(int, counts))))
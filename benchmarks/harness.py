@@ -0,0 +1,91 @@
+"""Time callables and write the results as JSON."""
+
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def summarize(samples: list) -> Dict[str, float]:
+    """Reduce timing samples, in seconds, to the statistics worth tracking."""
+    ordered = sorted(samples)
+
+    return {'runs': len(ordered),
+            'min_ms': ordered[0] * 1000,
+            'median_ms': statistics.median(ordered) * 1000,
+            'mean_ms': statistics.fmean(ordered) * 1000,
+            'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+            'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            'max_ms': ordered[-1] * 1000}
+
+
+def measure(func: Callable[[], Any], repeat: int = 20) -> Dict[str, float]:
+    """Time a synchronous callable."""
+    samples = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    return summarize(samples)
+
+
+async def measure_async(func: Callable[[], Any], repeat: int = 20) -> Dict[str, float]:
+    """Time a coroutine function."""
+    samples = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - start)
+
+    return summarize(samples)
+
+
+async def drain():
+    """Cancel leftover background tasks so the next scenario starts clean."""
+    current = asyncio.current_task()
+    pending = [i for i in asyncio.all_tasks() if i is not current]
+
+    for task in pending:
+        task.cancel()
+
+    await asyncio.gather(*pending, return_exceptions=True)
+
+
+def git_revision() -> str:
+    """Return the current commit, if available."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def write_results(scenario: str, params: Dict[str, Any], results: Dict[str, Any],
+                  path: str = None) -> str:
+    """Write results to JSON, along with what is needed to compare runs later."""
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, '{}-{}.json'.format(
+            scenario, datetime.now().strftime('%Y%m%d-%H%M%S')))
+
+    with open(path, 'w') as fp:
+        json.dump({'scenario': scenario,
+                   'timestamp': datetime.now().isoformat(timespec='seconds'),
+                   'revision': git_revision(),
+                   'python': platform.python_version(),
+                   'platform': platform.platform(),
+                   'params': params,
+                   'results': results}, fp, indent=2)
+
+    return path
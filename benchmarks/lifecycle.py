@@ -0,0 +1,122 @@
+"""Check that leaving guilds and deleting teams gives back their memory and coroutines."""
+
+import argparse
+import asyncio
+import gc
+import random
+import tempfile
+import tracemalloc
+import weakref
+from typing import Any, Dict, List
+
+from core import lifecycle, models
+from core.data_management import data_manager
+from . import fakes, fleet
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=5, help='Guilds that stay.')
+    parser.add_argument('--churn', type=int, default=5,
+                        help='Guilds joined and left, and teams created and deleted, per cycle.')
+    parser.add_argument('--teams', type=int, default=5, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=50, help='Per team.')
+    parser.add_argument('--cycles', type=int, default=10)
+    parser.add_argument('--memory-tolerance', type=int, default=256 * 1024,
+                        help='How many bytes memory may grow by and still pass.')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Repeatedly join and leave guilds and create and delete teams, then compare
+    coroutine counts and traced memory against a baseline.
+    """
+
+    tracemalloc.start()
+    config = fleet.FleetConfig(guilds=args.guilds, teams=args.teams, tasks=args.tasks,
+                               seed=args.seed)
+    bot = fleet.build_fleet(config)
+    rng = random.Random(args.seed)
+    removed = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        default_archive_dir = lifecycle.ARCHIVE_DIR
+        lifecycle.ARCHIVE_DIR = directory
+
+        try:
+            # Warm up once, so caches filled on first use aren't counted as leaks.
+            await _cycle(bot, rng, config, args.churn, removed)
+            baseline = await _snapshot()
+            peak_tasks = 0
+
+            for _ in range(args.cycles):
+                peak_tasks = max(peak_tasks, await _cycle(bot, rng, config, args.churn, removed))
+
+            after = await _snapshot()
+
+        finally:
+            lifecycle.ARCHIVE_DIR = default_archive_dir
+
+    tracemalloc.stop()
+    alive = sum(1 for ref in removed if ref() is not None)
+    memory_growth = after['memory_bytes'] - baseline['memory_bytes']
+
+    return {'baseline': baseline,
+            'after': after,
+            'peak_coroutines': peak_tasks,
+            'removed_objects': len(removed),
+            'removed_objects_alive': alive,
+            'memory_growth_bytes': memory_growth,
+            'passed': (after['coroutines'] == baseline['coroutines'] and alive == 0
+                       and memory_growth <= args.memory_tolerance)}
+
+
+async def _cycle(bot: fakes.FakeBot, rng: random.Random, config: fleet.FleetConfig,
+                 churn: int, removed: List[weakref.ref]) -> int:
+    """Join and leave guilds and create and delete teams in the ones that stay.
+    Return how many coroutines were running at the busiest point.
+    """
+
+    staying = list(data_manager.guilds)
+    joined = [fleet.add_guild(bot, rng, config, f'churn-{i}') for i in range(churn)]
+    created = []
+
+    for guild in rng.choices(staying, k=churn):
+        role = fakes.FakeRole(guild.disc_guild_obj, 'churn-team')
+        guild.disc_guild_obj.roles.append(role)
+        team = models.Team(role=role)
+        guild.add_team(team)
+
+        for _ in range(config.tasks):
+            team.add_task(fleet.random_task(rng, guild, [], config.horizon))
+
+        created.append(team)
+
+    await _settle()
+    busiest = len(asyncio.all_tasks())
+
+    for guild in joined:
+        bot.guilds.remove(guild.disc_guild_obj)
+        lifecycle.remove_guild(guild.disc_guild_obj)
+        removed.append(weakref.ref(guild))
+
+    for team in created:
+        team.guild.disc_guild_obj.roles.remove(team.role)
+        lifecycle.remove_team(team)
+        removed.append(weakref.ref(team))
+
+    await _settle()
+    return busiest
+
+
+async def _settle():
+    # Let new coroutines start and cancelled ones unwind.
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+async def _snapshot() -> Dict[str, int]:
+    await _settle()
+    gc.collect()
+    return {'coroutines': len(asyncio.all_tasks()),
+            'memory_bytes': tracemalloc.get_traced_memory()[0]}
@@ -0,0 +1,320 @@
+"""Drive the real slash commands with a realistic mix of users, and record or replay it."""
+
+import argparse
+import asyncio
+import contextvars
+import dataclasses
+import json
+import random
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from cogs.configuration import Configuration
+from cogs.tasks import Tasks
+from cogs.teams import Teams
+from core import models
+from core.data_management import data_manager
+from utils import dt_utils, iter_utils
+from utils.dt_utils import DATE_FORMATS
+from . import fakes, fleet, harness, slash
+
+# Map commands to their cog and the method that implements them.
+COMMANDS = {
+    'tasks': (Tasks, '_tasks'),
+    'summary': (Tasks, '_summary'),
+    'due_on': (Tasks, '_due_on'),
+    'tagged_with': (Tasks, '_tagged_with'),
+    'search': (Tasks, '_search'),
+    'new_task': (Tasks, '_new_task'),
+    'edit_task': (Tasks, '_edit_task'),
+    'teams': (Teams, '_teams'),
+    'change_locale': (Configuration, '_change_locale'),
+    'do_receive_announcements': (Configuration, '_do_receive_announcements'),
+}
+
+# Mostly reads, some writes and the odd configuration change.
+DEFAULT_MIX = {'tasks': 25, 'summary': 10, 'due_on': 15, 'tagged_with': 10, 'search': 10,
+               'new_task': 10, 'edit_task': 10, 'teams': 8, 'change_locale': 1,
+               'do_receive_announcements': 1}
+
+# The invocation being run and the team its user means to pick if asked to,
+# for the team selector to answer with.
+_invocation: contextvars.ContextVar[Tuple[fakes.FakeSlashContext, Optional[models.Team]]] = \
+    contextvars.ContextVar('invocation')
+
+
+@dataclasses.dataclass
+class LoadConfig:
+    """Describe the fleet a load runs against, so a recorded trace can rebuild it."""
+
+    guilds: int = 200
+    teams: int = 3
+    tasks: int = 50
+    members: int = 5
+    # Share of each team's members who are in a second team, and so get asked which one.
+    multi_team: float = 0.2
+    seed: int = 0
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=LoadConfig.guilds)
+    parser.add_argument('--teams', type=int, default=LoadConfig.teams, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=LoadConfig.tasks, help='Per team.')
+    parser.add_argument('--members', type=int, default=LoadConfig.members, help='Per team.')
+    parser.add_argument('--multi-team', type=float, default=LoadConfig.multi_team,
+                        help='Share of members in two teams, who go through the team selector.')
+    parser.add_argument('--rate', type=float, default=50.0, help='Commands per second.')
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds.')
+    parser.add_argument('--mix', default=None,
+                        help='Command weights, like "tasks=25,new_task=10".'
+                             ' Defaults to mostly reads.')
+    parser.add_argument('--selection-delay', type=float, default=0.0,
+                        help='Seconds users take to pick a team when asked.')
+    parser.add_argument('--record', help='Write the commands sent to a trace file.')
+    parser.add_argument('--replay', help='Send the commands in a trace file instead.')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='How many times faster than recorded to replay a trace.')
+    parser.add_argument('--seed', type=int, default=LoadConfig.seed)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Send commands at a steady random rate, or as a trace recorded them,
+    and measure how long they take and how far the event loop falls behind.
+    """
+
+    if args.replay:
+        with open(args.replay) as fp:
+            trace = json.load(fp)
+
+        config = LoadConfig(**trace['fleet'])
+    else:
+        trace = None
+        config = LoadConfig(guilds=args.guilds, teams=args.teams, tasks=args.tasks,
+                            members=args.members, multi_team=args.multi_team, seed=args.seed)
+
+    bot = _build(config)
+    bot.responders['raw_reaction_add'] = lambda check: _select_team(check, args.selection_delay)
+    cogs = {cog: cog(bot) for cog, _ in COMMANDS.values()}
+    rng = random.Random(args.seed)
+
+    if trace is not None:
+        schedule = [(entry['at'] / args.speed, entry) for entry in trace['commands']]
+    else:
+        schedule = _generate(rng, args.rate, args.duration, _parse_mix(args.mix))
+
+    # Let every notification start waiting, so it isn't timed along with the first commands.
+    await asyncio.sleep(0)
+
+    results: List[Tuple[str, float, Optional[str]]] = []
+    recorded = []
+    lag = []
+    pending = []
+    sampler = asyncio.create_task(_sample_lag(lag))
+    start = time.perf_counter()
+
+    for at, entry in schedule:
+        delay = start + at - time.perf_counter()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if trace is None:
+            entry = _resolve(rng, entry)
+            recorded.append(dict(entry, at=at))
+
+        pending.append(asyncio.create_task(_invoke(cogs, entry, results)))
+
+    await asyncio.gather(*pending)
+    elapsed = time.perf_counter() - start
+    sampler.cancel()
+
+    if args.record and trace is None:
+        with open(args.record, 'w') as fp:
+            json.dump({'fleet': dataclasses.asdict(config), 'commands': recorded}, fp)
+
+    for guild in data_manager.guilds:
+        guild.close()
+
+    data_manager.guilds = []
+
+    errors: Dict[str, int] = {}
+
+    for _, _, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+
+    by_command: Dict[str, List[float]] = {}
+
+    for command, latency, _ in results:
+        by_command.setdefault(command, []).append(latency)
+
+    return {'fleet': dataclasses.asdict(config),
+            'commands': len(results),
+            'seconds': elapsed,
+            'throughput_per_second': len(results) / elapsed,
+            'latency': harness.summarize([latency for _, latency, _ in results]),
+            'by_command': {command: harness.summarize(latencies)
+                           for command, latencies in sorted(by_command.items())},
+            # Checks failing, like a date without tasks, are part of a realistic mix.
+            'errors': errors,
+            'event_loop_lag': harness.summarize(lag) if lag else None}
+
+
+def _build(config: LoadConfig) -> fakes.FakeBot:
+    """Build a fleet, then put some members in a second team."""
+    rng = random.Random(config.seed)
+    bot = fleet.build_fleet(fleet.FleetConfig(guilds=config.guilds, teams=config.teams,
+                                              tasks=config.tasks, members=config.members,
+                                              seed=config.seed))
+
+    if config.teams > 1:
+        for guild in data_manager.guilds:
+            roles = [team.role for team in guild.teams]
+
+            for member in list(guild.disc_guild_obj.members):
+                if rng.random() < config.multi_team:
+                    member.roles.append(rng.choice([i for i in roles if i not in member.roles]))
+
+    return bot
+
+
+def _parse_mix(mix: Optional[str]) -> Dict[str, float]:
+    if mix is None:
+        return DEFAULT_MIX
+
+    weights = {}
+
+    for item in mix.split(','):
+        command, weight = item.split('=')
+
+        if command not in COMMANDS:
+            raise ValueError(f'Unknown command: {command}')
+
+        weights[command] = float(weight)
+
+    return weights
+
+
+def _generate(rng: random.Random, rate: float, duration: float,
+              mix: Dict[str, float]) -> List[Tuple[float, Dict[str, Any]]]:
+    """Pick when each command is sent and what it is. Who sends it, and its options,
+    are only picked when it's sent, since they depend on what came before.
+    """
+
+    schedule = []
+    at = rng.expovariate(rate)
+
+    while at < duration:
+        command = rng.choices(list(mix), weights=list(mix.values()))[0]
+        schedule.append((at, {'command': command}))
+        at += rng.expovariate(rate)
+
+    return schedule
+
+
+def _resolve(rng: random.Random, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick who sends a command and its options, as indexes and plain values,
+    so the entry can be stored in a trace.
+    """
+
+    guild_index = rng.randrange(len(data_manager.guilds))
+    guild = data_manager.guilds[guild_index]
+    member_index = rng.randrange(len(guild.disc_guild_obj.members))
+    member = guild.disc_guild_obj.members[member_index]
+    teams = guild.get_user_teams(member)
+    team = rng.choice(teams) if teams else None
+    command = entry['command']
+    options: Dict[str, Any] = {}
+
+    date_format = DATE_FORMATS[guild.locale] + '/%Y'
+    now = dt_utils.now(guild.tz)
+    upcoming = [task for task in team.tasks if task.due_datetime > now] if team else []
+
+    if command == 'due_on':
+        due = rng.choice(upcoming).due_datetime if upcoming else now
+        options['date'] = due.strftime(date_format)
+
+    elif command == 'tagged_with':
+        tags = sorted({tag for task in team.tasks for tag in task.tags}) if team else []
+        options['tags'] = rng.choice(tags) if tags else 'none'
+
+    elif command == 'search':
+        words = rng.choice(team.tasks).content.split() if team and team.tasks else ['none']
+        options['query'] = ' '.join(words[:2])
+
+    elif command == 'new_task':
+        options['content'] = ' '.join(rng.choices(fleet.WORDS, k=rng.randint(2, 8)))
+        options['due_date'] = (now + timedelta(days=rng.randint(1, 30))).strftime(date_format)
+
+    elif command == 'edit_task':
+        task = rng.choice(upcoming) if upcoming else None
+
+        options['date'] = (task.due_datetime if task else now).strftime(date_format)
+
+        if task is not None:
+            options.update(task=f'#{task.id}', attribute='content',
+                           new_value=' '.join(rng.choices(fleet.WORDS, k=rng.randint(2, 8))))
+
+    elif command == 'change_locale':
+        options['locale'] = rng.choice(list(DATE_FORMATS))
+
+    elif command == 'do_receive_announcements':
+        options['receive'] = rng.random() < 0.5
+
+    return {'command': command, 'guild': guild_index, 'member': member_index,
+            'team': guild.teams.index(team) if team else None, 'options': options}
+
+
+async def _invoke(cogs: Dict[type, Any], entry: Dict[str, Any],
+                  results: List[Tuple[str, float, Optional[str]]]):
+    guild = data_manager.guilds[entry['guild']]
+    disc_guild = guild.disc_guild_obj
+    ctx = fakes.FakeSlashContext(disc_guild, disc_guild.members[entry['member']],
+                                 entry['command'])
+    cog, name = COMMANDS[entry['command']]
+    team = guild.teams[entry['team']] if entry['team'] is not None else None
+    _invocation.set((ctx, team))
+    error = None
+    start = time.perf_counter()
+
+    try:
+        await slash.invoke(cogs[cog], name, ctx, **entry['options'])
+
+    except Exception as exception:
+        error = type(exception).__name__
+
+    results.append((entry['command'], time.perf_counter() - start, error))
+
+
+async def _select_team(check, delay: float) -> fakes.FakeRawReactionEvent:
+    """React to the team selector the way the user sending the command would."""
+    ctx, team = _invocation.get()
+    message = ctx.sent[-1]
+    teams = data_manager.get_guild(ctx.guild).get_user_teams(ctx.author)
+    emoji = iter_utils.DIGIT_EMOJIS[(teams.index(team) if team in teams else 0) + 1]
+
+    if delay:
+        await asyncio.sleep(random.expovariate(1 / delay))
+
+    # Reactions are added while the user is already being listened to.
+    while emoji not in message.reactions:
+        await asyncio.sleep(0)
+
+    payload = fakes.FakeRawReactionEvent(ctx.author.id, message.id, emoji)
+
+    if not check(payload):
+        raise asyncio.TimeoutError
+
+    return payload
+
+
+async def _sample_lag(samples: List[float], interval: float = 0.01):
+    """Measure how much later than asked for the event loop wakes a sleeper."""
+    loop = asyncio.get_running_loop()
+
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(loop.time() - start - interval)
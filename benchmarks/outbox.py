@@ -0,0 +1,134 @@
+"""Check that outbox messages survive outages and restarts, in order, and time their delivery."""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import discord
+
+from core.outbox import Outbox
+from . import fakes, harness
+
+
+class FlakyChannel(fakes.FakeTextChannel):
+    """Fail sends at random, and all of them during outages."""
+
+    def __init__(self, guild: fakes.FakeGuild, name: str, rng: random.Random,
+                 failure_rate: float, outages: List[Tuple[float, float]]):
+        super().__init__(guild, name)
+        self.rng = rng
+        self.failure_rate = failure_rate
+        self.outages = outages
+        # When each message was delivered.
+        self.delivered_at: List[float] = []
+
+    async def send(self, content: str = None, **kwargs) -> fakes.FakeMessage:
+        now = time.perf_counter()
+
+        if (self.rng.random() < self.failure_rate
+                or any(start <= now < stop for start, stop in self.outages)):
+            raise discord.HTTPException(fakes.FakeResponse(503), 'Service Unavailable')
+
+        self.delivered_at.append(now)
+        return await super().send(content, **kwargs)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--channels', type=int, default=50)
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--failure-rate', type=float, default=0.1,
+                        help='Chance that any send fails.')
+    parser.add_argument('--outage', type=float, default=1.0,
+                        help='Seconds every send fails for, starting a moment into the run.')
+    parser.add_argument('--retry-base', type=float, default=0.05,
+                        help='Seconds. Scaled down from the bot\'s, to keep the run short.')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Queue messages through an outage, restart the outbox halfway, and wait for every
+    message to be delivered.
+    """
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    outages = [(start + 0.2, start + 0.2 + args.outage)]
+    bot = fakes.FakeBot()
+
+    for index in range(args.channels):
+        guild = fakes.FakeGuild(f'guild-{index}')
+        guild.text_channels = [FlakyChannel(guild, 'general', rng, args.failure_rate, outages)]
+        bot.guilds.append(guild)
+
+    channels = [guild.text_channels[0] for guild in bot.guilds]
+    queued_at: Dict[str, float] = {}
+    defaults = (Outbox.PATH, Outbox.RETRY_BASE, Outbox.RETRY_MAX, Outbox.MAX_ATTEMPTS,
+                Outbox.PRIORITIES)
+    restored = 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        Outbox.PATH = os.path.join(directory, 'outbox.json')
+        Outbox.RETRY_BASE = args.retry_base
+        Outbox.RETRY_MAX = args.retry_base * 20
+        # Giving up would count as losing a message, which is what's being checked for.
+        Outbox.MAX_ATTEMPTS = 10 ** 6
+        # Budgets would only make the run longer. The priorities scenario covers them.
+        Outbox.PRIORITIES = {priority: (10 ** 9, 10 ** 9) for priority in Outbox.PRIORITIES}
+
+        try:
+            outbox = Outbox()
+            await outbox.start(bot)
+
+            for index in range(args.messages):
+                channel = channels[index % args.channels]
+                content = f'{channel.id}:{index}'
+                queued_at[content] = time.perf_counter()
+                await outbox.send(channel, content, kind='notification')
+
+                # Restart halfway, in the middle of the outage.
+                if index == args.messages // 2:
+                    await asyncio.sleep(0.3)
+                    await outbox.stop()
+                    restored = len(Outbox.load())
+                    outbox = Outbox()
+                    await outbox.start(bot)
+
+            deadline = time.perf_counter() + args.timeout
+
+            while outbox.depth and time.perf_counter() < deadline:
+                await asyncio.sleep(0.01)
+
+            await outbox.stop()
+
+        finally:
+            (Outbox.PATH, Outbox.RETRY_BASE, Outbox.RETRY_MAX, Outbox.MAX_ATTEMPTS,
+             Outbox.PRIORITIES) = defaults
+
+    delivered = [message.content for channel in channels for message in channel.sent]
+    latencies = [delivered_at - queued_at[message.content]
+                 for channel in channels
+                 for message, delivered_at in zip(channel.sent, channel.delivered_at)]
+
+    # Messages to the same channel must arrive in the order they were queued.
+    out_of_order = sum(1 for channel in channels
+                       for previous, message in zip(channel.sent, channel.sent[1:])
+                       if int(previous.content.split(':')[1])
+                       > int(message.content.split(':')[1]))
+
+    lost = len(set(queued_at) - set(delivered))
+    duplicated = len(delivered) - len(set(delivered))
+
+    return {'queued': len(queued_at),
+            'delivered': len(set(delivered)),
+            'restored_after_restart': restored,
+            'lost': lost,
+            'duplicated': duplicated,
+            'out_of_order': out_of_order,
+            'latency': harness.summarize(latencies) if latencies else None,
+            'passed': not lost and not duplicated and not out_of_order}
@@ -0,0 +1,218 @@
+"""Time replies to commands while the outbox floods a fake Discord with bulk messages."""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import aiohttp
+import discord
+from aiohttp import web
+
+from core.outbox import Outbox
+from . import fakes, harness
+
+
+class FakeDiscord:
+    """Serve message and interaction endpoints over HTTP, answering 429 once the
+    requests in the current second go over the global limit, the way Discord does.
+    """
+
+    def __init__(self, global_limit: int, latency: float):
+        self.global_limit = global_limit
+        # In seconds, for every request.
+        self.latency = latency
+        self.window = 0
+        self.window_requests = 0
+        self.rate_limited = 0
+        self.runner = None
+        self.url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/channels/{channel_id}/messages', self.handle)
+        app.router.add_post('/interactions/{interaction_id}/callback', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.url = 'http://127.0.0.1:{}'.format(self.runner.addresses[0][1])
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def handle(self, request: web.Request) -> web.Response:
+        now = time.monotonic()
+
+        if int(now) != self.window:
+            self.window = int(now)
+            self.window_requests = 0
+
+        self.window_requests += 1
+
+        if self.window_requests > self.global_limit:
+            self.rate_limited += 1
+            return web.json_response({'message': 'You are being rate limited.',
+                                      'retry_after': self.window + 1 - now, 'global': True},
+                                     status=429)
+
+        await asyncio.sleep(self.latency)
+        return web.json_response({'id': str(fakes.new_id())})
+
+
+class FakeHTTPClient:
+    """Send requests the way discord.py's HTTP client does: a global 429 stops
+    every request until it's over, and requests are tried a few times before giving up.
+    """
+
+    TRIES = 5
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session = aiohttp.ClientSession()
+        self.global_over = asyncio.Event()
+        self.global_over.set()
+
+    async def request(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        for _ in range(FakeHTTPClient.TRIES):
+            await self.global_over.wait()
+
+            async with self.session.post(self.url + path, json=payload) as response:
+                data = await response.json()
+
+                if response.status < 300:
+                    return data
+
+                if response.status != 429:
+                    raise discord.HTTPException(response, data)
+
+                if data.get('global'):
+                    self.global_over.clear()
+
+                await asyncio.sleep(data['retry_after'])
+                self.global_over.set()
+
+        raise discord.HTTPException(fakes.FakeResponse(429, 'Too Many Requests'), data)
+
+    async def close(self):
+        await self.session.close()
+
+
+class HTTPTextChannel(fakes.FakeTextChannel):
+    """Send messages through the fake Discord."""
+
+    def __init__(self, guild: fakes.FakeGuild, name: str, http: FakeHTTPClient):
+        super().__init__(guild, name)
+        self.http = http
+
+    async def send(self, content: str = None, **kwargs) -> fakes.FakeMessage:
+        await self.http.request(f'/channels/{self.id}/messages', {'content': content})
+        return await super().send(content, **kwargs)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--channels', type=int, default=100)
+    parser.add_argument('--messages', type=int, default=600,
+                        help='Bulk messages queued at once, split among notifications,'
+                             ' digests and announcements.')
+    parser.add_argument('--reply-rate', type=float, default=10.0,
+                        help='Replies to commands per second.')
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Seconds replies are sent for.')
+    parser.add_argument('--global-limit', type=int, default=50,
+                        help='Requests per second the fake Discord allows.')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Seconds the fake Discord takes to answer a request.')
+    parser.add_argument('--modes', nargs='+', default=['unprioritized', 'prioritized'],
+                        choices=['unprioritized', 'prioritized'])
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Queue a burst of bulk messages, like at midnight, and reply to commands
+    at a steady rate while it drains, with and without priorities.
+    """
+
+    server = FakeDiscord(args.global_limit, args.latency)
+    await server.start()
+    default_path = Outbox.PATH
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            Outbox.PATH = os.path.join(directory, 'outbox.json')
+            return {mode: await _run_mode(args, server, mode) for mode in args.modes}
+
+    finally:
+        Outbox.PATH = default_path
+        await server.stop()
+
+
+async def _run_mode(args: argparse.Namespace, server: FakeDiscord, mode: str) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    http = FakeHTTPClient(server.url)
+    bot = fakes.FakeBot()
+
+    for index in range(args.channels):
+        guild = fakes.FakeGuild(f'guild-{index}')
+        guild.text_channels = [HTTPTextChannel(guild, 'general', http)]
+        bot.guilds.append(guild)
+
+    channels = [guild.text_channels[0] for guild in bot.guilds]
+    defaults = Outbox.PRIORITIES
+    server.rate_limited = 0
+
+    # Without priorities, everything is sent as soon as a worker is free,
+    # and replies don't hold anything back, like before there were any.
+    if mode == 'unprioritized':
+        Outbox.PRIORITIES = {priority: (10 ** 9, 10 ** 9) for priority in defaults}
+
+    try:
+        outbox = Outbox()
+        await outbox.start(bot)
+        start = time.perf_counter()
+
+        for index in range(args.messages):
+            await outbox.send(channels[index % args.channels], f'bulk {index}',
+                              kind=rng.choice(['notification', 'digest', 'announcement']))
+
+        async def reply(index: int) -> float:
+            reply_start = time.perf_counter()
+            path = f'/interactions/{index}/callback'
+
+            if mode == 'prioritized':
+                async with outbox.interactive():
+                    await http.request(path, {'type': 4})
+            else:
+                await http.request(path, {'type': 4})
+
+            return time.perf_counter() - reply_start
+
+        replies: List[asyncio.Task] = []
+
+        for index in range(int(args.duration * args.reply_rate)):
+            replies.append(asyncio.create_task(reply(index)))
+            await asyncio.sleep(rng.expovariate(args.reply_rate))
+
+        results = await asyncio.gather(*replies, return_exceptions=True)
+        latencies = [i for i in results if isinstance(i, float)]
+
+        while outbox.depth:
+            await asyncio.sleep(0.05)
+
+        drained = time.perf_counter() - start
+        await outbox.stop()
+
+    finally:
+        Outbox.PRIORITIES = defaults
+        await http.close()
+
+    return {'replies': len(results),
+            'failed_replies': len(results) - len(latencies),
+            'reply_latency': harness.summarize(latencies) if latencies else None,
+            'bulk_delivered': sum(len(channel.sent) for channel in channels),
+            'bulk_drain_seconds': drained,
+            'rate_limited_requests': server.rate_limited}
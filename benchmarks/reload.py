@@ -0,0 +1,140 @@
+"""Check that reloading data keeps coroutine and batch loop counts constant, and time it."""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import os
+import random
+import tempfile
+import time
+from datetime import timedelta
+from typing import Any, Dict
+
+from core import models, serialization
+from core.data_management import DataManager, data_manager
+from . import fleet, harness
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=20)
+    parser.add_argument('--teams', type=int, default=5, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=100, help='Per team.')
+    parser.add_argument('--changes', type=float, default=0.05,
+                        help='Share of tasks edited, rescheduled, deleted or added'
+                             ' in memory before each reload.')
+    parser.add_argument('--reloads', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Save a fleet, then repeatedly change it in memory and reload it,
+    checking that the stored state comes back without anything running twice.
+    """
+
+    config = fleet.FleetConfig(guilds=args.guilds, teams=args.teams, tasks=args.tasks,
+                               seed=args.seed)
+    bot = fleet.build_fleet(config)
+    rng = random.Random(args.seed)
+    guilds = list(data_manager.guilds)
+
+    # Persistence goes to a scratch file instead of the bot's data directory,
+    # and its logging is kept, but out of the way.
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull):
+        default_paths = DataManager.JSON_PATH, DataManager.SNAPSHOT_PATH
+        DataManager.JSON_PATH = os.path.join(directory, 'guilds.json')
+        DataManager.SNAPSHOT_PATH = os.path.join(directory, 'guilds.snapshot')
+
+        try:
+            data_manager.save_data()
+            stored = _state()
+            baseline = await _snapshot()
+
+            unchanged = []
+            changed = []
+            restored = True
+
+            for _ in range(args.reloads):
+                start = time.perf_counter()
+                await data_manager.load_data(bot)
+                unchanged.append(time.perf_counter() - start)
+
+                _change(rng, args.changes)
+                start = time.perf_counter()
+                await data_manager.load_data(bot)
+                changed.append(time.perf_counter() - start)
+                restored = restored and _state() == stored
+
+            after = await _snapshot()
+
+        finally:
+            DataManager.JSON_PATH, DataManager.SNAPSHOT_PATH = default_paths
+
+    guilds_kept = sum(1 for a, b in zip(guilds, data_manager.guilds) if a is b)
+
+    for guild in data_manager.guilds:
+        guild.close()
+
+    data_manager.guilds = []
+
+    return {'baseline': baseline,
+            'after': after,
+            'reload_unchanged': harness.summarize(unchanged),
+            'reload_changed': harness.summarize(changed),
+            'guilds_kept': guilds_kept,
+            'restored': restored,
+            'passed': (after == baseline and restored and guilds_kept == len(guilds))}
+
+
+def _change(rng: random.Random, share: float):
+    """Edit, reschedule, delete and add tasks in memory only."""
+    for guild in data_manager.guilds:
+        for team in guild.teams:
+            for task in list(team.tasks):
+                if rng.random() >= share:
+                    continue
+
+                change = rng.randrange(4)
+
+                if change == 0:
+                    team.set_task_content(task, task.content + ' (edited)')
+                elif change == 1:
+                    task.reschedule(task.due_datetime + timedelta(days=1))
+                elif change == 2:
+                    team.del_task(task)
+                else:
+                    team.add_task(fleet.random_task(rng, guild, [], 30))
+
+
+def _state() -> Dict[int, Any]:
+    """Return what is stored of the guilds in memory, ignoring task order."""
+    document = serialization.encode_guilds(data_manager.guilds)
+    state = {}
+
+    for record in document['guilds']:
+        for team in record['teams']:
+            # IDs handed out to tasks added in memory stay used on purpose.
+            del team['next_task_id']
+            columns = team.pop('tasks')
+            team['tasks'] = sorted(zip(columns['id'], columns['content'], columns['due'],
+                                       map(tuple, columns['tags'])))
+
+        state[record['id']] = record
+
+    return state
+
+
+async def _snapshot() -> Dict[str, int]:
+    # Let new coroutines start and cancelled ones unwind.
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+    gc.collect()
+    tasks = asyncio.all_tasks()
+
+    return {'coroutines': len(tasks),
+            'batch_loops': sum(1 for task in tasks
+                               if task.get_coro().__qualname__ == 'Loop._loop'),
+            'task_objects': sum(1 for i in gc.get_objects() if isinstance(i, models.Task))}
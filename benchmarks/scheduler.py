@@ -0,0 +1,107 @@
+"""Run months of notifications and daily batches on a simulated clock, and time them."""
+
+import argparse
+import collections
+import random
+import time
+from typing import Any, Dict
+
+from core import models
+from core.data_management import data_manager
+from utils import clock
+from . import fleet
+
+
+class CountingOutbox:
+    """Stand in for the outbox, counting messages instead of sending them,
+    so only the scheduler's own work is timed.
+    """
+
+    def __init__(self):
+        self.sent = collections.Counter()
+
+    async def send(self, channel, content: str = None, *, embed=None, kind: str = 'message'):
+        self.sent[kind] += 1
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=20)
+    parser.add_argument('--teams', type=int, default=5, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=100, help='Per team.')
+    parser.add_argument('--recurring', type=float, default=0.5,
+                        help='Share of tasks that recur, and so keep notifying.')
+    parser.add_argument('--days', type=int, default=90, help='Simulated days.')
+    parser.add_argument('--step', type=float, default=3600.0,
+                        help='Simulated seconds time is advanced by at once.')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build a fleet on a simulated clock, advance it through every day,
+    and count the notifications sent against the CPU time it took.
+    """
+
+    simulated = clock.SimulatedClock()
+    default_clock = clock.get_clock()
+    default_outbox = models.outbox
+    counting = models.outbox = CountingOutbox()
+    clock.set_clock(simulated)
+
+    try:
+        config = fleet.FleetConfig(guilds=args.guilds, teams=args.teams, tasks=args.tasks,
+                                   seed=args.seed)
+        fleet.build_fleet(config)
+        rng = random.Random(args.seed)
+
+        for guild in data_manager.guilds:
+            # Batches wait on the simulated clock, so there's no need to pace the loop.
+            guild.auto_batch_notify.change_interval(seconds=0)
+
+            for team in guild.teams:
+                for task in team.tasks:
+                    if rng.random() < args.recurring:
+                        task.set_recurrence(rng.choice(list(models.Task.RECURRENCES)))
+                        task.schedule()
+
+        # Let every notification start waiting.
+        await simulated.advance(0)
+        tasks_before = sum(len(team.tasks) for guild in data_manager.guilds
+                           for team in guild.teams)
+        sleepers_before = simulated.sleepers
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        steps = int(args.days * 86400 / args.step)
+
+        for _ in range(steps):
+            await simulated.advance(args.step)
+
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+
+        tasks_after = sum(len(team.tasks) for guild in data_manager.guilds
+                          for team in guild.teams)
+        sleepers_after = simulated.sleepers
+
+        for guild in data_manager.guilds:
+            guild.close()
+
+        data_manager.guilds = []
+
+    finally:
+        clock.set_clock(default_clock)
+        models.outbox = default_outbox
+
+    dispatched = sum(counting.sent.values())
+
+    return {'simulated_days': args.days,
+            'tasks_before': tasks_before,
+            'tasks_after': tasks_after,
+            'sleepers_before': sleepers_before,
+            'sleepers_after': sleepers_after,
+            'dispatched': dict(counting.sent),
+            'cpu_seconds': cpu,
+            'wall_seconds': wall,
+            'dispatched_per_cpu_second': dispatched / cpu if cpu else None,
+            'simulated_days_per_wall_second': args.days / wall if wall else None}
@@ -0,0 +1,95 @@
+"""Compare stored data codecs with the string format tasks were stored in before them."""
+
+import argparse
+import dataclasses
+import json
+import random
+from typing import Any, Callable, Dict, List
+
+from core import models, serialization
+from core.data_management import data_manager
+from . import fleet, harness
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='Tasks across the fleet.')
+    parser.add_argument('--teams', type=int, default=10, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=1000, help='Per team.')
+    parser.add_argument('--recurring', type=float, default=0.1,
+                        help='Share of tasks that recur.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Encode and decode fleets of increasing size with every installed codec."""
+    results = {'codecs': list(serialization.CODECS)}
+
+    for size in args.sizes:
+        guilds = _build(args, size)
+        results[str(size)] = _compare(guilds, args.repeat)
+
+        for guild in guilds:
+            guild.close()
+
+        data_manager.guilds = []
+
+    return results
+
+
+def _build(args: argparse.Namespace, size: int) -> List[models.Guild]:
+    """Build a fleet with about as many tasks as asked for."""
+    tasks_per_team = min(args.tasks, size)
+    teams = max(1, size // tasks_per_team)
+    config = fleet.FleetConfig(guilds=max(1, teams // args.teams), teams=min(args.teams, teams),
+                               tasks=tasks_per_team, seed=args.seed)
+
+    fleet.build_fleet(dataclasses.replace(config, tasks=0))
+    fleet.fill_unscheduled(data_manager.guilds, random.Random(args.seed), config,
+                           args.recurring)
+    return data_manager.guilds
+
+
+def _compare(guilds: List[models.Guild], repeat: int) -> Dict[str, Any]:
+    results = {'tasks': sum(len(team.tasks) for guild in guilds for team in guild.teams)}
+
+    legacy = json.dumps([guild.serialize() for guild in guilds]).encode()
+    results['legacy'] = {
+        'bytes': len(legacy),
+        'encode': harness.measure(
+            lambda: json.dumps([guild.serialize() for guild in guilds]).encode(), repeat),
+        'decode': harness.measure(lambda: _decode(guilds, json.loads, legacy), repeat),
+    }
+
+    for name, codec in serialization.CODECS.items():
+        data = codec.dumps(serialization.encode_guilds(guilds))
+        decoded = [[_fields(task) for task in tasks]
+                   for tasks in _decode(guilds, codec.loads, data)]
+
+        results[name] = {
+            'bytes': len(data),
+            'encode': harness.measure(
+                lambda: codec.dumps(serialization.encode_guilds(guilds)), repeat),
+            'decode': harness.measure(lambda: _decode(guilds, codec.loads, data), repeat),
+            'round_trips': decoded == [[_fields(task) for task in team.tasks]
+                                       for guild in guilds for team in guild.teams],
+        }
+
+    return results
+
+
+def _decode(guilds: List[models.Guild], loads: Callable[[bytes], Any],
+            data: bytes) -> List[List[models.Task]]:
+    # Legacy data is upgraded to current records on the way, as it is when loaded.
+    records = serialization.stored_records(loads(data))
+
+    return [serialization.decode_tasks(record['tasks'], guild.tz)
+            for guild, guild_record in zip(guilds, records)
+            for record in guild_record['teams']]
+
+
+def _fields(task: models.Task) -> tuple:
+    return (task.id, task.content, task.tags, task.due_datetime, task.recurrence,
+            task.series_start if task.recurrence else None)
@@ -0,0 +1,22 @@
+"""Invoke cog slash commands the way discord-py-slash-command would."""
+
+import inspect
+from typing import Any
+
+from discord.ext import commands
+
+
+async def invoke(cog: commands.Cog, name: str, ctx, **options) -> Any:
+    """Run a slash command's checks and then its body."""
+    command = getattr(type(cog), name)
+
+    for check in getattr(command, '__commands_checks__', []):
+        result = check(ctx)
+
+        if inspect.isawaitable(result):
+            result = await result
+
+        if not result:
+            raise commands.CheckFailure(f'The check functions for {name} failed.')
+
+    return await command.func(cog, ctx, **options)
@@ -0,0 +1,111 @@
+"""Compare snapshot size, save time and peak memory with the formats data was saved in before."""
+
+import argparse
+import dataclasses
+import json
+import os
+import random
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from core import models, serialization, snapshots
+from core.data_management import data_manager
+from . import fleet, harness
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add this scenario's options to its command line parser."""
+    parser.add_argument('--guilds', type=int, default=100)
+    parser.add_argument('--teams', type=int, default=5, help='Per guild.')
+    parser.add_argument('--tasks', type=int, default=200, help='Per team.')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Save the same fleet in every format, then read it back whole and one guild at a time."""
+    config = fleet.FleetConfig(guilds=args.guilds, teams=args.teams, tasks=args.tasks,
+                               seed=args.seed)
+    fleet.build_fleet(dataclasses.replace(config, tasks=0))
+    fleet.fill_unscheduled(data_manager.guilds, random.Random(args.seed), config, 0.1)
+    guilds = data_manager.guilds
+    codec = serialization.get_codec()
+
+    results = {'tasks': args.guilds * args.teams * args.tasks, 'codec': codec.name,
+               'largest_guild_bytes': max(len(codec.dumps(serialization.encode_guild(i)))
+                                          for i in guilds)}
+
+    with tempfile.TemporaryDirectory() as directory:
+        def path(name: str) -> str:
+            return os.path.join(directory, name)
+
+        # What save_data wrote before codecs and before snapshots.
+        results['legacy_json'] = _compare_save(
+            lambda: _save_legacy(path('guilds.json'), guilds), path('guilds.json'), args.repeat)
+        results['legacy_json']['read_all'] = harness.measure(
+            lambda: _read_file(path('guilds.json'), json.loads), args.repeat)
+
+        results['document'] = _compare_save(
+            lambda: _save_document(path('guilds.doc'), guilds, codec), path('guilds.doc'),
+            args.repeat)
+        results['document']['read_all'] = harness.measure(
+            lambda: _read_file(path('guilds.doc'), codec.loads), args.repeat)
+
+        for compression in snapshots.COMPRESSORS:
+            snapshot_path = path(f'guilds.{compression}.snapshot')
+            result = _compare_save(
+                lambda: snapshots.write(snapshot_path, guilds, codec, compression),
+                snapshot_path, args.repeat)
+
+            result['read_all'] = harness.measure(lambda: snapshots.read(snapshot_path),
+                                                 args.repeat)
+            middle = guilds[len(guilds) // 2].disc_guild_obj.id
+            result['read_one_guild'] = harness.measure(
+                lambda: snapshots.read_record(snapshot_path, middle), args.repeat)
+            result['round_trips'] = (list(snapshots.iter_records(snapshot_path))
+                                     == _plain(serialization.encode_guilds(guilds)['guilds'],
+                                               codec))
+            results[f'snapshot_{compression}'] = result
+
+    for guild in guilds:
+        guild.close()
+
+    data_manager.guilds = []
+    return results
+
+
+def _compare_save(save: Callable[[], Any], path: str, repeat: int) -> Dict[str, Any]:
+    # Memory is traced on a separate run, since tracing slows everything down.
+    tracemalloc.start()
+    save()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'save': harness.measure(save, repeat),
+            'bytes': os.path.getsize(path),
+            'peak_save_memory_bytes': peak}
+
+
+def _save_legacy(path: str, guilds: List[models.Guild]):
+    serialized_guilds = [guild.serialize() for guild in guilds]
+
+    with open(path, 'w') as fp:
+        json.dump(serialized_guilds, fp)
+
+
+def _save_document(path: str, guilds: List[models.Guild], codec: serialization.Codec):
+    data = codec.dumps(serialization.encode_guilds(guilds))
+
+    with open(path, 'wb') as fp:
+        fp.write(data)
+
+
+def _read_file(path: str, loads: Callable[[bytes], Any]) -> Any:
+    with open(path, 'rb') as fp:
+        return loads(fp.read())
+
+
+def _plain(records: List[Dict[str, Any]], codec: serialization.Codec) -> List[Dict[str, Any]]:
+    # Codecs turn tuples into lists and so on, so compare against what they give back.
+    return [codec.loads(codec.dumps(i)) for i in records]
@@ -2,7 +2,6 @@
 
 import asyncio
 import sys
-from datetime import timedelta, timezone
 from typing import Dict
 
 
@@ -12,13 +11,16 @@ from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_option, create_choice
 
 sys.path.append('..')
-from core import constants, checks, models
+from core import constants, checks, invocation, models
 from core.data_management import data_manager
-from utils import iter_utils
+from utils import iter_utils, tz_utils
 
 class Configuration(commands.Cog):
     """Customize how the bot behaves in a guild."""
 
+    # In seconds. How long the user may take between reactions when configuring a control role.
+    CONFIGURE_TIMEOUT = 60
+
     def __init__(self, bot):
         self.bot = bot
 
@@ -45,6 +47,7 @@ class Configuration(commands.Cog):
             )
         ]
     )
+    @invocation.wrap
     async def _change_locale(self, ctx, locale: str):
         """Change the guild locale."""
         guild = data_manager.get_guild(ctx.guild)
@@ -61,24 +64,28 @@ class Configuration(commands.Cog):
         description='Change the server timezone.',
         options=[
             create_option(
-                name='offset',
-                description='Relative to UTC. For example, EST would be "-5".'
-                            ' For non-exact values: -09:30 = "-9.5".',
+                name='timezone',
+                description='A zone name like "America/New_York",'
+                            ' or an offset from UTC like "-5" (no daylight saving).',
                 option_type=3,
                 required=True
             )
         ]
     )
-    async def _change_tz(self, ctx, offset: float):
-        """Change the guild locale."""
-        offset = float(offset)
+    @invocation.wrap
+    async def _change_tz(self, ctx, timezone: str):
+        """Change the guild timezone."""
         guild = data_manager.get_guild(ctx.guild)
-        guild.tz = timezone(timedelta(hours=offset))
+        guild.tz = checks.is_timezone(timezone)
+        offset = guild.utc_offset_hours()
 
         await ctx.send(embed=discord.Embed(
-            title=constants.Emojis.TIMEZONE.value + ' Server timezone set: __UTC {offset}__'
-            .format(offset=f'+{offset}' if offset >= 0 else offset),
-            description='Note: will not adapt to daylight savings and etc. automatically.',
+            title=constants.Emojis.TIMEZONE.value + ' Server timezone set: __{name}__'
+            .format(name=tz_utils.zone_name(guild.tz)),
+            description=('Currently UTC {offset}.'.format(offset=f'{offset:+g}')
+                         + (' Will adapt to daylight saving time automatically.'
+                            if tz_utils.transition_table(guild.tz).instants
+                            else ' Will not adapt to daylight saving time automatically.')),
             color=constants.Colors.DEFAULT.value))
 
     @commands.check(checks.is_admin)
@@ -87,6 +94,7 @@ class Configuration(commands.Cog):
         name='control_roles',
         description='View all control roles in the server.',
     )
+    @invocation.wrap
     async def _control_roles(self, ctx: SlashContext):
         """Show all control roles in a guild and their permissions."""
         guild = data_manager.get_guild(ctx.guild)
@@ -117,11 +125,13 @@ class Configuration(commands.Cog):
             )
         ]
     )
+    @invocation.wrap
     async def _edit_control_role(self, ctx: SlashContext, role: discord.Role):
         """Edit what users with a control role have permission to do."""
         guild = data_manager.get_guild(ctx.guild)
         control_role = checks.is_role_tied_to_control_role(guild, role)
-        control_role.perms = await Configuration.configure_perms(self.bot, ctx, role.name)
+        control_role.perms = await Configuration.configure_perms(self.bot, ctx, role.name,
+                                                                 control_role.perms)
 
     @commands.check(checks.is_admin)
     @cog_ext.cog_slash(
@@ -135,6 +145,7 @@ class Configuration(commands.Cog):
                 required=True
             )
         ])
+    @invocation.wrap
     async def _do_receive_announcements(self, ctx: SlashContext, receive: bool):
         """Set whether the guild wants to receive official announcements or not."""
         guild = data_manager.get_guild(ctx.guild)
@@ -163,15 +174,18 @@ class Configuration(commands.Cog):
             ),
         ]
     )
+    @invocation.wrap
     async def _new_control_role(self, ctx: SlashContext, name: str):
         """Create a new control role."""
+        # Only create the role once it's been configured, so a timeout leaves nothing behind.
+        perms = await Configuration.configure_perms(self.bot, ctx, name)
+
         role = await discord.Guild.create_role(ctx.guild,
                                                name=name,
                                                color=models.ControlRole.DEFAULT_COLOR)
 
         guild = data_manager.get_guild(ctx.guild)
-        control_role = models.ControlRole(guild, role)
-        control_role.perms = await Configuration.configure_perms(self.bot, ctx, name)
+        models.ControlRole(guild, role, perms)
 
     @commands.check(checks.is_admin)
     @cog_ext.cog_slash(
@@ -186,6 +200,7 @@ class Configuration(commands.Cog):
             ),
         ]
     )
+    @invocation.wrap
     async def _set_channel(self, ctx, channel: discord.TextChannel):
         """Set the guild target channel."""
         if isinstance(channel, discord.CategoryChannel):
@@ -199,50 +214,88 @@ class Configuration(commands.Cog):
             color=constants.Colors.DEFAULT.value))
 
     @staticmethod
-    async def configure_perms(bot, ctx: SlashContext, name: str) -> Dict[str, bool]:
-        title = f'{constants.Emojis.CONFIG.value} Control role configuration'
-        description = f'Grant the **__{name}__** role permission to **__{{}}__**?'
+    async def configure_perms(bot, ctx: SlashContext, name: str,
+                              perms: Dict[str, bool] = None) -> Dict[str, bool]:
+        """Let the user set every permission of a control role through a single message.
+        Reacting with a permission's number flips it, and removing the reaction flips it back.
+        Nothing is applied until the user confirms.
+        """
+
+        # New control roles start off without any permissions.
+        if perms is None:
+            perms = {permission: False for permission in models.ControlRole.PERMS}
+
+        number_emojis = iter_utils.DIGIT_EMOJIS[1:len(models.ControlRole.PERMS) + 1]
+        confirm_emoji = '✅'
 
         message = await ctx.send(embed=discord.Embed(
-            title=title,
+            title=f'{constants.Emojis.CONFIG.value} Control role configuration: \"__{name}__\"',
+            description='React with a number to flip that permission,'
+                        f' then confirm with {confirm_emoji}.\n\n'
+                        + iter_utils.iter_to_numbered_list(
+                            [f'{permission}: {perms[permission]}'
+                             for permission in models.ControlRole.PERMS]),
             color=constants.Colors.DEFAULT.value))
 
-        # Map emoji reactions to logical values for user input.
-        emojis = {'✅': True, '❎': False}
+        # Raw events don't depend on the message or the user being cached.
+        def check(payload: discord.RawReactionActionEvent) -> bool:
+            return (payload.user_id == ctx.author.id and payload.message_id == message.id
+                    and str(payload.emoji) in number_emojis + [confirm_emoji])
 
-        def check(reaction_: discord.Reaction, user_: discord.Member) -> bool:
-            return (user_ == ctx.author and reaction_.emoji in emojis
-                    and reaction_.message.id == message.id)
+        # A single listener queues reactions for as long as the message is open,
+        # so quick ones are neither missed nor applied out of order.
+        reactions: asyncio.Queue = asyncio.Queue()
 
-        perms = {}
+        async def on_reaction(payload: discord.RawReactionActionEvent):
+            if check(payload):
+                reactions.put_nowait(payload)
 
-        for permission in models.ControlRole.PERMS:
-            # Prompt user to set control role permission.
-            await message.edit(embed=discord.Embed(title=title,
-                                                   description=description.format(permission),
-                                                   color=constants.Colors.DEFAULT.value))
+        # Listen before presenting the options so early reactions aren't missed.
+        bot.add_listener(on_reaction, 'on_raw_reaction_add')
+        bot.add_listener(on_reaction, 'on_raw_reaction_remove')
+        flipped = set()
 
-            # Present the options.
-            for emoji in emojis:
-                await message.add_reaction(emoji)
+        try:
+            await asyncio.gather(*(message.add_reaction(emoji)
+                                   for emoji in number_emojis + [confirm_emoji]))
 
-            # Wait for user input.
-            try:
-                reaction, _ = await bot.wait_for('reaction_add', timeout=60, check=check)
-                perms[permission] = emojis[reaction.emoji]
+            while True:
+                try:
+                    payload = await asyncio.wait_for(reactions.get(),
+                                                     timeout=Configuration.CONFIGURE_TIMEOUT)
 
-            except asyncio.TimeoutError:
-                await message.delete()
-                raise asyncio.TimeoutError
+                except asyncio.TimeoutError:
+                    await message.delete()
+                    raise
 
-            await message.clear_reactions()
+                emoji = str(payload.emoji)
+                added = payload.event_type == 'REACTION_ADD'
+
+                if emoji == confirm_emoji:
+                    if added:
+                        break
+
+                elif added:
+                    flipped.add(models.ControlRole.PERMS[number_emojis.index(emoji)])
+
+                else:
+                    flipped.discard(models.ControlRole.PERMS[number_emojis.index(emoji)])
+
+        finally:
+            bot.remove_listener(on_reaction, 'on_raw_reaction_add')
+            bot.remove_listener(on_reaction, 'on_raw_reaction_remove')
+
+        perms = {permission: value != (permission in flipped)
+                 for permission, value in perms.items()}
 
         # Send confirmation and return.
-        await message.edit(embed=discord.Embed(
-            title=f'{constants.Emojis.CONFIG.value} Control role configured: \"__{name}__\"',
-            description=f'Members who are granted this role will be able to:'
-                        f'\n{iter_utils.format_dict(perms)}',
-            color=constants.Colors.DEFAULT.value))
+        await asyncio.gather(
+            message.edit(embed=discord.Embed(
+                title=f'{constants.Emojis.CONFIG.value} Control role configured: \"__{name}__\"',
+                description=f'Members who are granted this role will be able to:'
+                            f'\n{iter_utils.format_dict(perms)}',
+                color=constants.Colors.DEFAULT.value)),
+            message.clear_reactions())
 
         return perms
 
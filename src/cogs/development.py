@@ -1,5 +1,6 @@
 """Developer-only commands."""
 
+import io
 import sys
 
 import discord
@@ -7,8 +8,10 @@ from discord.ext import commands
 from discord.ext.commands import Context
 
 sys.path.append('..')
-from core import constants, checks
+from core import constants, checks, profiling
 from core.data_management import data_manager
+from core.metrics import metrics
+from core.outbox import outbox
 
 
 class Development(commands.Cog):
@@ -22,8 +25,12 @@ class Development(commands.Cog):
                     '`{p}devchangelog` (`{p}dch`)\n'
                     '`{p}devclose` (`{p}dc`)\n'
                     '`{p}devdeleteexpired` (`{p}dde`)\n'
+                    '`{p}devheap [start|stop]` (`{p}dhp`)\n'
                     '`{p}devhelp` (`{p}dh`)\n'
                     '`{p}devload` (`{p}dl`)\n'
+                    '`{p}devmetrics` (`{p}dm`)\n'
+                    '`{p}devobjects` (`{p}do`)\n'
+                    '`{p}devprofile [seconds|stop]` (`{p}dp`)\n'
                     '`{p}devsave` (`{p}ds`)\n'
                     '`{p}devtest` (`{p}dt`)'
         .format(p=constants.PREFIX),
@@ -68,6 +75,7 @@ class Development(commands.Cog):
     async def devclose(self, ctx: Context):
         """Close the bot."""
         await ctx.send('Closing...')
+        await outbox.stop()
         await self.bot.close()
 
     @commands.command(aliases=['dde'])
@@ -76,6 +84,23 @@ class Development(commands.Cog):
         await data_manager.delete_expired_tasks()
         await ctx.send(Development.CMD_EXECUTED)
 
+    @commands.command(aliases=['dhp'])
+    async def devheap(self, ctx: Context, action: str = None):
+        """Start tracing memory allocations, report what's holding memory
+        and what grew since the last report, or stop tracing.
+        """
+
+        if action == 'start':
+            profiling.heap.start()
+            await ctx.send('Tracing allocations. Use it again to see where memory goes.')
+
+        elif action == 'stop':
+            profiling.heap.stop()
+            await ctx.send(Development.CMD_EXECUTED)
+
+        else:
+            await Development.send_report(ctx, 'heap', profiling.heap.snapshot())
+
     @commands.command(aliases=['dh'])
     async def devhelp(self, ctx: Context):
         """Show every developer command."""
@@ -86,10 +111,51 @@ class Development(commands.Cog):
 
     @commands.command(aliases=['dl'])
     async def devload(self, ctx: Context):
-        """Trigger data loading."""
+        """Load data again, applying only what changed in storage."""
         await data_manager.load_data(self.bot)
         await ctx.send(Development.CMD_EXECUTED)
 
+    @commands.command(aliases=['dm'])
+    async def devmetrics(self, ctx: Context):
+        """Show a summary of the runtime metrics."""
+        summary = metrics.summary()
+
+        # Fall back to an attachment when the summary doesn't fit in a message.
+        if len(summary) > 1900:
+            await ctx.send(file=discord.File(io.BytesIO(summary.encode()), 'metrics.txt'))
+        else:
+            await ctx.send(f'```\n{summary}\n```')
+
+    @commands.command(aliases=['do'])
+    async def devobjects(self, ctx: Context):
+        """Count live guilds, teams and tasks and pending coroutines."""
+        await Development.send_report(ctx, 'objects', profiling.count_objects())
+
+    @commands.command(aliases=['dp'])
+    async def devprofile(self, ctx: Context, seconds: str = None):
+        """Profile the bot for a number of seconds, or stop profiling early."""
+        if seconds == 'stop':
+            profiling.profiler.stop()
+            return
+
+        if profiling.profiler.running:
+            await ctx.send('A profile is already running.')
+            return
+
+        try:
+            window = float(seconds) if seconds else profiling.Profiler.DEFAULT_WINDOW
+        except ValueError:
+            window = None
+
+        # Also rules out "nan".
+        if window is None or not window > 0:
+            await ctx.send(f'Usage: `{constants.PREFIX}devprofile [seconds | stop]`')
+            return
+
+        window = min(window, profiling.Profiler.MAX_WINDOW)
+        await ctx.send(f'Profiling for {window:g} seconds.')
+        await Development.send_report(ctx, 'profile', await profiling.profiler.profile(window))
+
     @commands.command(aliases=['ds'])
     async def devsave(self, ctx: Context):
         """Trigger data saving."""
@@ -103,6 +169,17 @@ class Development(commands.Cog):
         await guild.announce('target_channel')
         await ctx.send(Development.CMD_EXECUTED)
 
+    @staticmethod
+    async def send_report(ctx: Context, kind: str, report: str):
+        """Store a report and send it, as an attachment if it doesn't fit in a message."""
+        path = profiling.write_report(kind, report)
+        note = f'Saved to {path}.' if path else 'Could not save it.'
+
+        if len(report) > 1900:
+            await ctx.send(note, file=discord.File(io.BytesIO(report.encode()), f'{kind}.txt'))
+        else:
+            await ctx.send(f'```\n{report}\n```{note}')
+
 
 def setup(bot: commands.Bot):
     """Add the cog to the bot."""
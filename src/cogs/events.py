@@ -10,9 +10,11 @@ from discord.ext import commands
 from discord_slash import SlashContext
 
 sys.path.append('..')
-from core import constants, checks
+from core import constants, checks, lifecycle, models
 from core.data_management import data_manager
-from utils import dt_utils, iter_utils
+from core.metrics import metrics
+from core.outbox import outbox
+from utils import dt_utils, iter_utils, tz_utils
 from utils.dt_utils import DATE_FORMATS, TIME_FORMATS
 
 
@@ -25,6 +27,8 @@ class Events(commands.Cog):
     @commands.Cog.listener()
     async def on_slash_command_error(self, ctx: SlashContext, error: commands.CommandError):
         """Handle failed checks."""
+        metrics.inc('ivone_command_errors_total', command=ctx.name, error=type(error).__name__)
+
         if isinstance(error, checks.DateHasAlreadyPassedError):
             await ctx.send(embed=discord.Embed(
                 title=f'{constants.Emojis.ERROR.value} This date has already passed.',
@@ -48,6 +52,26 @@ class Events(commands.Cog):
                 title=f'{constants.Emojis.ERROR.value} Invalid role.',
                 color=constants.Colors.ERROR.value))
 
+        elif isinstance(error, checks.InvalidRecurrenceError):
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.ERROR.value} __{error.value}__ isn\'t a recurrence.',
+                description='Use one of: {}.'.format(
+                    ', '.join(f'"{i}"' for i in [*models.Task.RECURRENCES, 'never'])),
+                color=constants.Colors.ERROR.value))
+
+        elif isinstance(error, checks.InvalidTimezoneError):
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.ERROR.value} __{error.name}__ isn\'t a timezone.',
+                description='Use a zone name like "America/New_York",'
+                            ' or an offset from UTC like "-5".',
+                color=constants.Colors.ERROR.value))
+
+        elif isinstance(error, checks.InvalidImportError):
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.ERROR.value} No tasks were imported.',
+                description='\n'.join(f'• {i}' for i in error.errors),
+                color=constants.Colors.ERROR.value))
+
         elif isinstance(error, checks.NoActiveTasksError):
             await ctx.send(embed=discord.Embed(
                 title=f'{constants.Emojis.SUCCESS.value} There are no active tasks.',
@@ -71,12 +95,48 @@ class Events(commands.Cog):
                 color=color
             ).set_footer(text=error.team.role.name.upper()))
 
+        elif isinstance(error, checks.NoTasksMatchingError):
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.SEARCH.value} There aren\'t any tasks matching'
+                      f' __{error.query}__.',
+                color=error.team.role.color
+            ).set_footer(text=error.team.role.name.upper()))
+
         elif isinstance(error, checks.NoTasksTaggedWithError):
             await ctx.send(embed=discord.Embed(
                 title=f'{constants.Emojis.TAGS.value} There aren\'t any tasks tagged'
                       f' with __{iter_utils.format_iter(error.tags)}__',
                 color=error.team.role.color))
 
+        elif isinstance(error, checks.TaskChangedError):
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.ERROR.value} Task __{error.reference}__ was changed'
+                      f' or deleted since you last saw it.',
+                description='Nothing was changed. Check the task list again and retry,'
+                            ' or refer to the task by its ID, like `#a3`.',
+                color=constants.Colors.ERROR.value
+            ).set_footer(text=error.team.role.name.upper()))
+
+        elif isinstance(error, checks.TaskListNotShownError):
+            date = dt_utils.format_date(error.date, error.team.guild.tz,
+                                        error.team.guild.locale)
+
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.ERROR.value} Indexes refer to the task list'
+                      f' you were last shown.',
+                description=f'List the tasks due on that date again with `/{ctx.name} {date}`,'
+                            f' or refer to the task by its ID, like `#a3`.',
+                color=constants.Colors.ERROR.value
+            ).set_footer(text=error.team.role.name.upper()))
+
+        elif isinstance(error, checks.TaskNotFoundError):
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.ERROR.value} There is no task __{error.reference}__.',
+                description='Refer to tasks by their ID, like `#a3`,'
+                            ' or by their index on the task list.',
+                color=constants.Colors.ERROR.value
+            ).set_footer(text=error.team.role.name.upper()))
+
         elif isinstance(error, checks.UserDoesNotHavePermission):
             await ctx.send(embed=discord.Embed(
                 title=f'{constants.Emojis.ERROR.value} You don\'t have permission'
@@ -89,6 +149,12 @@ class Events(commands.Cog):
                       f' within the server to do that.',
                 color=constants.Colors.ERROR.value))
 
+        elif isinstance(error, checks.UserIsNotInTheTeamError):
+            await ctx.send(embed=discord.Embed(
+                title=f'{constants.Emojis.ERROR.value} You aren\'t in __{error.team.role}__.',
+                description=f'Join it with `/team {error.team.role}`.',
+                color=constants.Colors.ERROR.value))
+
         elif isinstance(error, checks.UserIsNotInATeamError):
             await ctx.send(embed=discord.Embed(
                 title=f'{constants.Emojis.ERROR.value} You need to be in a team to do that.',
@@ -107,9 +173,11 @@ class Events(commands.Cog):
               .format(time=datetime.strftime(datetime.now(), '%H:%M'),
                       guild=disc_guild_obj))
 
+        await data_manager.wait_until_bound()
         guild = data_manager.get_guild(disc_guild_obj)
 
-        await guild.target_channel.send(
+        await outbox.send(
+            guild.target_channel, kind='welcome',
             embed=discord.Embed(
                 title=f':grinning: Hello, __{guild.disc_guild_obj.name}__!',
                 description='• **Ivone** is a task management bot for teams using Discord.'
@@ -122,9 +190,9 @@ class Events(commands.Cog):
         # Warn the guild about their current (probably default) timezone and locale.
         example_date = dt.date(year=1970, month=12, day=1)
         example_time = dt.time(hour=12, minute=0)
-        tz_offset = guild.tz.utcoffset(None).total_seconds() / 3600
 
-        await guild.target_channel.send(
+        await outbox.send(
+            guild.target_channel, kind='welcome',
             embed=discord.Embed(
                 title=f'{constants.Emojis.WARNING.value} Warning: check timezone and locale',
                 description=f'Right now, this server\'s locale is set to {guild.locale}.'
@@ -133,18 +201,29 @@ class Events(commands.Cog):
                             f' {example_time.strftime(TIME_FORMATS[guild.locale])},'
                             f' for example.'
                             f'\nAlso, the timezone is set to'
-                            f' UTC {"+" if tz_offset > 0 else ""}{tz_offset}.'
+                            f' {tz_utils.zone_name(guild.tz)}.'
                             f'\nTo change these settings, use `/change_timezone`'
                             f' and `/change_locale`.',
                 color=constants.Colors.ERROR.value))
 
+    @commands.Cog.listener()
+    async def on_guild_remove(self, disc_guild_obj: discord.Guild):
+        """Tear down everything kept about a guild the bot left."""
+        print('>> {time}: Ivone has left {guild}'
+              .format(time=datetime.strftime(datetime.now(), '%H:%M'),
+                      guild=disc_guild_obj))
+
+        await data_manager.wait_until_bound()
+        lifecycle.remove_guild(disc_guild_obj)
+
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role: discord.Role):
         """Delete data that relied on a role that no longer exists."""
+        await data_manager.wait_until_bound()
         guild = data_manager.get_guild(role.guild)
 
         if team := guild.get_team(role):
-            guild.teams.remove(team)
+            lifecycle.remove_team(team)
 
         elif control_role := guild.get_control_role(role):
             guild.control_roles.remove(control_role)
@@ -156,9 +235,24 @@ class Events(commands.Cog):
             type=discord.ActivityType.listening, name='/help'))
 
         if not data_manager.HAS_LOADED_DATA:
-            await data_manager.load_data(self.bot)
+            metrics.end_phase('connect')
+
+            try:
+                with metrics.phase('load_data'):
+                    await data_manager.load_data(self.bot)
+
+            # Running without the stored data would save over it, so stop instead.
+            except Exception:
+                print('Stopping, since stored data could not be loaded.')
+                await self.bot.close()
+                raise
+
             data_manager.HAS_LOADED_DATA = True
             data_manager.autosave.start()
+            # Messages left undelivered last time go out once their channels are known.
+            await outbox.start(self.bot)
+            metrics.lag_monitor.start()
+            await metrics.start_server()
 
 
 def setup(bot: commands.Bot):
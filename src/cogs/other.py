@@ -9,8 +9,9 @@ from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_option
 
 sys.path.append('..')
-from core import constants
+from core import constants, invocation
 from core.hidden import FEEDBACK_CHANNEL_ID
+from core.outbox import outbox
 
 
 class Other(commands.Cog):
@@ -31,10 +32,11 @@ class Other(commands.Cog):
             )
         ]
     )
+    @invocation.wrap
     async def _feedback(self, ctx: SlashContext, text: str):
         """Send user feedback to the Ivone developer."""
         feedback = f'**{ctx.author}** ({ctx.author.id}) sent in **{ctx.guild}**: {text}'
-        await self.bot.get_channel(FEEDBACK_CHANNEL_ID).send(feedback)
+        await outbox.send(self.bot.get_channel(FEEDBACK_CHANNEL_ID), feedback, kind='feedback')
 
         await ctx.send(embed=discord.Embed(
             title=f'{constants.Emojis.SPEECH.value} Thank you for the feedback, __{ctx.author}__!',
@@ -44,6 +46,7 @@ class Other(commands.Cog):
         name='help',
         description='Get help on how to use the bot.',
     )
+    @invocation.wrap
     async def _help(self, ctx: SlashContext):
         """Send a PM to a user with every public command."""
         embed = discord.Embed(
@@ -65,9 +68,14 @@ class Other(commands.Cog):
                   '\n`/summary`: View all your tasks in a summed up manner.'
                   '\n`/due_on`: View tasks due on a certain date.'
                   '\n`/tagged_with`: View tasks tagged with every tag selected.'
-                  '\n`/new_task`: Create a new task.'
+                  '\n`/search`: Find tasks by what they are about.'
+                  '\n`/new_task`: Create a new task, optionally repeating daily,'
+                  ' weekly or monthly.'
                   '\n`/edit_task`: Edit a task.'
                   '\n`/delete_tasks`: Delete one or more tasks.'
+                  '\n`/import_tasks`: Create tasks in bulk from a CSV or iCalendar file.'
+                  '\n`/export_tasks`: Download all your tasks as a file.'
+                  '\n`/calendar_feed`: Subscribe to your tasks from a calendar app.'
                   '\n⠀',
             inline=False)
 
@@ -113,6 +121,7 @@ class Other(commands.Cog):
         name='info',
         description='View some information about the bot.',
     )
+    @invocation.wrap
     async def _info(self, ctx: SlashContext):
         """Show some information about the bot."""
         await ctx.send(embed=discord.Embed(
@@ -135,6 +144,7 @@ class Other(commands.Cog):
         name='ping',
         description='View the bot\'s latency.',
     )
+    @invocation.wrap
     async def _ping(self, ctx: SlashContext):
         """Show the bot's latency."""
         await ctx.send(embed=discord.Embed(
@@ -145,6 +155,7 @@ class Other(commands.Cog):
         name='version',
         description='View the bot\'s latest version number and changelog.',
     )
+    @invocation.wrap
     async def _version(self, ctx: SlashContext):
         """Show the latest version number and changelog."""
         await ctx.send(embed=constants.CHANGELOG)
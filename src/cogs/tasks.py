@@ -1,5 +1,6 @@
 """Create, delete and show tasks in a team."""
 
+import datetime as dt
 import sys
 from datetime import datetime, timedelta
 
@@ -9,8 +10,10 @@ from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_option, create_choice
 
 sys.path.append('..')
-from core import constants, checks, models
+from core import constants, checks, invocation, models, transfer
 from core.data_management import data_manager
+from core.feed_server import FeedServer
+from core.response_cache import response_cache
 from utils import dt_utils, iter_utils
 from utils.dt_utils import DATE_FORMATS, TIME_FORMATS
 
@@ -19,6 +22,33 @@ class Tasks(commands.Cog):
     """Create, delete and show tasks in a team."""
 
     DEFAULT_DUE_TIME = '23:59'
+    # How many search results fit in a page.
+    SEARCH_PAGE_SIZE = 10
+    # How far back in the channel to look for a file to import.
+    IMPORT_HISTORY_LIMIT = 20
+    FILE_FORMAT_OPTION = create_option(
+        name='file_format',
+        description='Defaults to the file\'s extension, or CSV.',
+        option_type=3,
+        required=False,
+        choices=[
+            create_choice(
+                value='csv',
+                name='CSV'
+            ),
+            create_choice(
+                value='ics',
+                name='iCalendar'
+            )
+        ]
+    )
+    # Lets users in several teams skip the interactive team selection.
+    TEAM_OPTION = create_option(
+        name='team_role',
+        description='The team you are acting as a member of. Defaults to your last selection.',
+        option_type=8,
+        required=False
+    )
 
     def __init__(self, bot):
         self.bot = bot
@@ -36,15 +66,18 @@ class Tasks(commands.Cog):
             ),
             create_option(
                 name='indexes',
-                description='The tasks\' indexes on the task list'
-                            ' (separate indexes with a semicolon).',
+                description='The tasks\' IDs, like #a3, or indexes on the task list'
+                            ' (separate them with a semicolon).',
                 option_type=3,
                 required=False
-            )
+            ),
+            TEAM_OPTION
         ]
     )
-    async def _delete_tasks(self, ctx: SlashContext, date: str, indexes: str = None):
-        """Delete tasks by their due date and index."""
+    @invocation.wrap
+    async def _delete_tasks(self, ctx: SlashContext, date: str, indexes: str = None,
+                            team_role: discord.Role = None):
+        """Delete tasks by their ID, or by their due date and index."""
         # Get the necessary information and check it.
         guild = data_manager.get_guild(ctx.guild)
         checks.does_user_have_permission(guild, ctx.author, 'delete tasks')
@@ -52,27 +85,29 @@ class Tasks(commands.Cog):
         date = dt_utils.string_to_date(date, guild.tz, DATE_FORMATS[guild.locale] + '/%Y')
         checks.has_date_passed(date, guild.tz)
 
-        team = await guild.get_user_team(self.bot, ctx)
-        tasks = checks.are_there_tasks_due_on_date(team, date)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
 
         if not indexes:
             # Show every task due on the date, sorted by index.
+            tasks = checks.are_there_tasks_due_on_date(team, date)
+            team.remember_listing(ctx.author.id, date, tasks)
+
             embed = discord.Embed(
                 title=f'{constants.Emojis.DELETE.value} Which tasks do you wish to delete?',
-                description='Use `/delete_tasks {} [indexes]`.\n'
+                description='Use `/delete_tasks {} [IDs or indexes]`.\n'
                 .format(dt_utils.format_date(date, guild.tz, guild.locale)),
                 color=team.role.color)
 
             embed.description += models.Team.format_tasks_due_on_date(tasks, guild.locale)
 
         else:
-            # Delete the tasks.
-            indexes = [int(i) for i in indexes.split(';')]
-            tasks_selected = []
+            # Make sure every task is still there as the user saw it before deleting any.
+            tasks_selected = list(dict.fromkeys(
+                checks.does_task_exist(team, ctx.author, date, i) for i in indexes.split(';')))
 
-            for index in indexes:
-                tasks_selected.append(tasks[index - 1])
-                team.del_task(tasks_selected[-1])
+            for task in tasks_selected:
+                team.del_task(task)
 
             embed = discord.Embed(
                 title=constants.Emojis.DELETE.value + ' __{}__ task(s) due on'
@@ -94,13 +129,17 @@ class Tasks(commands.Cog):
                 description='Defaults to today or tomorrow, depending on time of day.',
                 option_type=3,
                 required=False
-            )
+            ),
+            TEAM_OPTION
         ]
     )
-    async def _due_on(self, ctx: SlashContext, date: str = None):
+    @invocation.wrap
+    async def _due_on(self, ctx: SlashContext, date: str = None,
+                      team_role: discord.Role = None):
         """Show every task due on a date by due time."""
-        team = await data_manager.get_guild(ctx.guild).get_user_team(self.bot, ctx)
-        tasks_by_date = models.Team.arrange_by_due_date(team.tasks)
+        guild = data_manager.get_guild(ctx.guild)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
 
         if date:
             # Parse date.
@@ -110,13 +149,22 @@ class Tasks(commands.Cog):
 
         else:
             # Default date to today or tomorrow, depending on time of day.
-            now = datetime.now(team.guild.tz)
+            now = dt_utils.now(team.guild.tz)
             date = now.date()
 
             if now.time() >= models.Guild.BATCH_TIME:
                 date += timedelta(days=1)
 
-        if date not in tasks_by_date:
+        embed = response_cache.get_or_render(team, 'due_on', (date,),
+                                             lambda: Tasks.render_due_on(team, date))
+        await ctx.send(embed=embed)
+
+    @staticmethod
+    def render_due_on(team: models.Team, date: dt.date) -> discord.Embed:
+        """Render /due_on for a team."""
+        tasks = models.Team.tasks_due_on(team.tasks, date)
+
+        if not tasks:
             raise checks.NoTasksDueOnDateError(team, date, was_expected=True)
 
         # Format and send message.
@@ -125,22 +173,21 @@ class Tasks(commands.Cog):
             .format(dt_utils.date_to_relative_name(date, team.guild.tz, team.guild.locale)),
             color=team.role.color)
 
-        for task in tasks_by_date[date]:
-            formatted_time = date.strftime(task.due_datetime.strftime
-                                           (TIME_FORMATS[team.guild.locale]))
-
+        for task in tasks:
             embed.add_field(
-                name=f'• {formatted_time}:',
-                value=('\n⠀ **{content}**'
+                name=f'• {dt_utils.format_time(task.due_datetime, team.guild.locale)}:',
+                value=('\n⠀ `#{id}` **{content}**{recurrence}'
                        '\n⠀ {tags}'
                        '\n'
                        ).format(
+                    id=task.id,
                     content=task.content,
+                    recurrence=f' {constants.Emojis.REPEAT.value}' if task.recurrence else '',
                     tags=iter_utils.format_iter(task.tags)
                     if task.tags else models.Task.NO_TAGS_TEXT))
 
         embed.set_footer(text=team.role.name.upper())
-        await ctx.send(embed=embed)
+        return embed
 
     @commands.check(checks.is_user_in_a_team)
     @cog_ext.cog_slash(
@@ -154,9 +201,9 @@ class Tasks(commands.Cog):
                 required=True
             ),
             create_option(
-                name='task_index',
-                description='The task index on the task list.',
-                option_type=4,
+                name='task',
+                description='The task\'s ID, like #a3, or its index on the task list.',
+                option_type=3,
                 required=False
             ),
             create_option(
@@ -180,6 +227,10 @@ class Tasks(commands.Cog):
                     create_choice(
                         value='tags',
                         name='Tags'
+                    ),
+                    create_choice(
+                        value='recurrence',
+                        name='Recurrence'
                     )
                 ]
             ),
@@ -189,11 +240,14 @@ class Tasks(commands.Cog):
                             ' you are editing.',
                 option_type=3,
                 required=False
-            )
+            ),
+            TEAM_OPTION
         ]
     )
-    async def _edit_task(self, ctx: SlashContext, date: str, task_index: int = None,
-                         attribute: str = None, new_value: str = None):
+    @invocation.wrap
+    async def _edit_task(self, ctx: SlashContext, date: str, task: str = None,
+                         attribute: str = None, new_value: str = None,
+                         team_role: discord.Role = None):
         """Edit a single attribute in a task."""
         # Get the necessary information and check it.
         guild = data_manager.get_guild(ctx.guild)
@@ -202,14 +256,17 @@ class Tasks(commands.Cog):
         date = dt_utils.string_to_date(date, guild.tz, DATE_FORMATS[guild.locale] + '/%Y')
         checks.has_date_passed(date, guild.tz)
 
-        team = await guild.get_user_team(self.bot, ctx)
-        tasks = checks.are_there_tasks_due_on_date(team, date)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
 
-        if not task_index:
+        if not task:
             # Show every task due on the selected date.
+            tasks = checks.are_there_tasks_due_on_date(team, date)
+            team.remember_listing(ctx.author.id, date, tasks)
+
             embed = discord.Embed(
                 title=f'{constants.Emojis.EDIT.value} Which task do you wish to edit?',
-                description='Use `/edit_task {} [index]`.\n'
+                description='Use `/edit_task {} [ID or index]`.\n'
                 .format(dt_utils.format_date(date, guild.tz, guild.locale)),
                 color=team.role.color)
 
@@ -217,23 +274,23 @@ class Tasks(commands.Cog):
 
         else:
             # Show every attribute of the selected task.
-            task = tasks[int(task_index) - 1]
+            task = checks.does_task_exist(team, ctx.author, date, task)
 
             if not attribute:
                 embed = discord.Embed(
                     title=f'{constants.Emojis.EDIT.value} Which attribute of this task'
                           f' do you wish to edit?',
-                    description=('Use `/edit_task {date} {task_index} [attribute] [new value]`.'
+                    description=('Use `/edit_task {date} #{task_id} [attribute] [new value]`.'
                                  '\n\n{task}')
                     .format(date=dt_utils.format_date(date, guild.tz, guild.locale),
-                            task_index=task_index,
+                            task_id=task.id,
                             task=task.to_formatted_string()),
                     color=team.role.color)
 
             else:
                 # Edit the task.
                 if attribute == 'content':
-                    task.content = new_value
+                    team.set_task_content(task, new_value)
 
                 elif attribute == 'due date':
                     new_due_date = dt_utils.string_to_date(
@@ -253,7 +310,7 @@ class Tasks(commands.Cog):
                         new_due_datetime = new_due_datetime.replace(hour=23, minute=59)
                         checks.has_datetime_passed(new_due_datetime, guild.tz)
 
-                    task.due_datetime = new_due_datetime
+                    task.reschedule(new_due_datetime)
 
                 elif attribute == 'due time':
                     new_due_time = datetime.strptime(new_value, TIME_FORMATS[guild.locale])
@@ -262,10 +319,17 @@ class Tasks(commands.Cog):
                         hour=new_due_time.hour, minute=new_due_time.minute)
 
                     checks.has_datetime_passed(new_due_datetime, guild.tz)
-                    task.due_datetime = new_due_datetime
+                    task.reschedule(new_due_datetime)
 
                 elif attribute == 'tags':
                     task.tags = team.parse_tags(new_value)
+                    task.touch()
+
+                elif attribute == 'recurrence':
+                    task.set_recurrence(checks.is_recurrence(new_value))
+
+                # The user has seen their own change, so editing the task again by index is fine.
+                team.update_listing(ctx.author.id, task)
 
                 embed = discord.Embed(
                     title=f'{constants.Emojis.EDIT.value} Task edited successfully:',
@@ -275,6 +339,126 @@ class Tasks(commands.Cog):
         embed.set_footer(text=team.role.name.upper())
         await ctx.send(embed=embed)
 
+    @commands.check(checks.is_user_in_a_team)
+    @cog_ext.cog_slash(
+        name='calendar_feed',
+        description='Get a link to subscribe to your tasks from a calendar app.',
+        options=[
+            create_option(
+                name='reset',
+                description='Replace the link, so whoever has the old one stops seeing tasks.',
+                option_type=5,
+                required=False
+            ),
+            TEAM_OPTION
+        ]
+    )
+    @invocation.wrap(hidden=True)
+    async def _calendar_feed(self, ctx: SlashContext, reset: bool = False,
+                             team_role: discord.Role = None):
+        """Privately send the URL of a team's calendar feed."""
+        guild = data_manager.get_guild(ctx.guild)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
+
+        if FeedServer.PORT is None:
+            await ctx.send('Calendar feeds aren\'t enabled for this bot.', hidden=True)
+            return
+
+        if reset:
+            checks.does_user_have_permission(guild, ctx.author, 'create/edit tasks')
+            team.reset_feed_token()
+
+        # Anyone with the link can see the team's tasks, so only show it to the user.
+        await ctx.send(f'{constants.Emojis.DATE.value} Subscribe to **{team.role.name}**\'s'
+                       f' tasks from your calendar app with this link:'
+                       f'\n<{FeedServer.feed_url(team)}>', hidden=True)
+
+    @commands.check(checks.is_user_in_a_team)
+    @cog_ext.cog_slash(
+        name='export_tasks',
+        description='Download all your tasks as a file.',
+        options=[FILE_FORMAT_OPTION, TEAM_OPTION]
+    )
+    @invocation.wrap
+    async def _export_tasks(self, ctx: SlashContext, file_format: str = 'csv',
+                            team_role: discord.Role = None):
+        """Send a team's tasks as a CSV or iCalendar attachment."""
+        guild = data_manager.get_guild(ctx.guild)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
+        checks.does_team_have_tasks(team)
+
+        with transfer.export_tasks(team, file_format) as fp:
+            await ctx.send(
+                embed=discord.Embed(
+                    title=f'{constants.Emojis.TASKS.value} __{len(team.tasks)}__ task(s)'
+                          f' exported.',
+                    description='Import them anywhere with `/import_tasks`.',
+                    color=team.role.color
+                ).set_footer(text=team.role.name.upper()),
+                file=discord.File(fp, filename=f'{team.role.name}.{file_format}'))
+
+    @commands.check(checks.is_user_in_a_team)
+    @cog_ext.cog_slash(
+        name='import_tasks',
+        description='Create tasks in bulk from a CSV or iCalendar file.',
+        options=[
+            create_option(
+                name='url',
+                description='Link to a file sent on Discord.'
+                            ' Defaults to the last file you sent here.',
+                option_type=3,
+                required=False
+            ),
+            FILE_FORMAT_OPTION,
+            TEAM_OPTION
+        ]
+    )
+    @invocation.wrap
+    async def _import_tasks(self, ctx: SlashContext, url: str = None, file_format: str = None,
+                            team_role: discord.Role = None):
+        """Create every task in a file at once, or none if any of them is invalid.
+        CSV files need a header with the columns content, due_date, due_time, tags and repeat.
+        """
+
+        guild = data_manager.get_guild(ctx.guild)
+        checks.does_user_have_permission(guild, ctx.author, 'create/edit tasks')
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
+
+        if url is None:
+            # Slash commands can't take files, so use the last one the user sent.
+            async for message in ctx.channel.history(limit=Tasks.IMPORT_HISTORY_LIMIT):
+                if message.author == ctx.author and message.attachments:
+                    url = message.attachments[0].url
+                    break
+
+            else:
+                raise checks.InvalidImportError(
+                    ['Send the file in this channel first, or use the `url` option.'])
+
+        if file_format is None:
+            file_format = 'ics' if url.split('?')[0].lower().endswith('.ics') else 'csv'
+
+        # Downloading might take longer than Discord waits for a reply.
+        await ctx.defer()
+
+        with await transfer.download(url) as fp:
+            tasks = transfer.import_tasks(team, fp, file_format, Tasks.DEFAULT_DUE_TIME)
+
+        embed = discord.Embed(
+            title=f'{constants.Emojis.CREATE.value} __{len(tasks)}__ task(s) imported.',
+            color=team.role.color
+        ).set_footer(text=team.role.name.upper())
+
+        team.tasks_to_embed(tasks[:Tasks.SEARCH_PAGE_SIZE], guild.tz, guild.locale, embed)
+
+        if len(tasks) > Tasks.SEARCH_PAGE_SIZE:
+            embed.description = 'To view all of them, use `/tasks`.'
+
+        await ctx.send(embed=embed)
+
     @commands.check(checks.is_user_in_a_team)
     @cog_ext.cog_slash(
         name='new_task',
@@ -304,11 +488,34 @@ class Tasks(commands.Cog):
                             ' (separate tags with a semicolon).',
                 option_type=3,
                 required=False
-            )
+            ),
+            create_option(
+                name='repeat',
+                description='How often this task repeats. Defaults to never.',
+                option_type=3,
+                required=False,
+                choices=[
+                    create_choice(
+                        value='daily',
+                        name='Daily'
+                    ),
+                    create_choice(
+                        value='weekly',
+                        name='Weekly'
+                    ),
+                    create_choice(
+                        value='monthly',
+                        name='Monthly'
+                    )
+                ]
+            ),
+            TEAM_OPTION
         ]
     )
+    @invocation.wrap
     async def _new_task(self, ctx: SlashContext, content: str, due_date: str,
-                        due_time: str = None, tags: str = None):
+                        due_time: str = None, tags: str = None, repeat: str = None,
+                        team_role: discord.Role = None):
         """Create a new task."""
         guild = data_manager.get_guild(ctx.guild)
         checks.does_user_have_permission(guild, ctx.author, 'create/edit tasks')
@@ -326,11 +533,12 @@ class Tasks(commands.Cog):
         checks.has_datetime_passed(due_datetime, guild.tz)
 
         # Parse tags.
-        team = await guild.get_user_team(self.bot, ctx)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
         tags = team.parse_tags(tags) if tags is not None else []
 
         # Create the task and add it to the team.
-        new_task = models.Task(content, tags, due_datetime)
+        new_task = models.Task(content, tags, due_datetime, recurrence=repeat)
         team.add_task(new_task)
 
         # Send confirmation.
@@ -340,7 +548,7 @@ class Tasks(commands.Cog):
             .format(
                 due_date=dt_utils.date_to_relative_name(new_task.due_datetime.date(),
                                                         guild.tz, guild.locale),
-                due_time=new_task.due_datetime.strftime(TIME_FORMATS[guild.locale])),
+                due_time=dt_utils.format_time(new_task.due_datetime, guild.locale)),
             description=f'{new_task.content}\n',
             color=team.role.color
         ).set_footer(text=team.role.name.upper())
@@ -350,18 +558,98 @@ class Tasks(commands.Cog):
                 name=f'{constants.Emojis.TAGS.value} Tags:',
                 value=f'{iter_utils.format_iter(new_task.tags)}')
 
+        if repeat:
+            embed.add_field(
+                name=f'{constants.Emojis.REPEAT.value} Repeats:',
+                value=repeat)
+
+        await ctx.send(embed=embed)
+
+    @commands.check(checks.is_user_in_a_team)
+    @cog_ext.cog_slash(
+        name='search',
+        description='Find tasks by what they are about.',
+        options=[
+            create_option(
+                name='query',
+                description='Words in the tasks you are looking for.',
+                option_type=3,
+                required=True
+            ),
+            create_option(
+                name='page',
+                description='Which page of results to show. Defaults to the first.',
+                option_type=4,
+                required=False
+            ),
+            TEAM_OPTION
+        ]
+    )
+    @invocation.wrap
+    async def _search(self, ctx: SlashContext, query: str, page: int = 1,
+                      team_role: discord.Role = None):
+        """Show the tasks best matching a query, a page at a time."""
+        guild = data_manager.get_guild(ctx.guild)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
+        matching_tasks = checks.are_there_tasks_matching(team, query)
+
+        # Clamp the page to the ones available.
+        pages = -(-len(matching_tasks) // Tasks.SEARCH_PAGE_SIZE)
+        page = min(max(page, 1), pages)
+        start = (page - 1) * Tasks.SEARCH_PAGE_SIZE
+
+        description = ''
+
+        for index, task in enumerate(matching_tasks[start:start + Tasks.SEARCH_PAGE_SIZE]):
+            description += ('\n**{index}.** `#{id}` {content}'
+                            '\n⠀ {due_date} {due_time}{recurrence}'
+                            '\n⠀ {tags}'
+                            '\n').format(
+                index=start + index + 1,
+                id=task.id,
+                content=task.content,
+                due_date=dt_utils.date_to_relative_name(task.due_datetime.date(),
+                                                        guild.tz, guild.locale),
+                due_time=dt_utils.format_time(task.due_datetime, guild.locale),
+                recurrence=f' {constants.Emojis.REPEAT.value} {task.recurrence}'
+                if task.recurrence else '',
+                tags=iter_utils.format_iter(task.tags)
+                if task.tags else models.Task.NO_TAGS_TEXT)
+
+        if page < pages:
+            description += f'\nFor more results, use `/search {query} {page + 1}`.'
+
+        embed = discord.Embed(
+            title=f'{constants.Emojis.SEARCH.value} {len(matching_tasks)} task(s)'
+                  f' matching __{query}__ (page {page}/{pages}):',
+            description=description,
+            color=team.role.color
+        ).set_footer(text=team.role.name.upper())
+
         await ctx.send(embed=embed)
 
     @commands.check(checks.is_user_in_a_team)
     @cog_ext.cog_slash(
         name='summary',
         description='View all your tasks in a summed up manner.',
+        options=[TEAM_OPTION]
     )
-    async def _summary(self, ctx: SlashContext):
+    @invocation.wrap
+    async def _summary(self, ctx: SlashContext, team_role: discord.Role = None):
         """Show by due date how many tasks there are in a team and their tags."""
-        team = await data_manager.get_guild(ctx.guild).get_user_team(self.bot, ctx)
+        guild = data_manager.get_guild(ctx.guild)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
         checks.does_team_have_tasks(team)
 
+        embed = response_cache.get_or_render(team, 'summary', (),
+                                             lambda: Tasks.render_summary(team))
+        await ctx.send(embed=embed)
+
+    @staticmethod
+    def render_summary(team: models.Team) -> discord.Embed:
+        """Render /summary for a team."""
         tasks_by_due_date = models.Team.arrange_by_due_date(team.tasks)
         description = ''
 
@@ -385,7 +673,7 @@ class Tasks(commands.Cog):
             color=team.role.color
         ).set_footer(text=team.role.name.upper())
 
-        await ctx.send(embed=embed)
+        return embed
 
     @commands.check(checks.is_user_in_a_team)
     @cog_ext.cog_slash(
@@ -397,12 +685,23 @@ class Tasks(commands.Cog):
                 description='Separate tags with a semicolon.',
                 option_type=3,
                 required=True
-            )
+            ),
+            TEAM_OPTION
         ]
     )
-    async def _tagged_with(self, ctx: SlashContext, tags: str):
+    @invocation.wrap
+    async def _tagged_with(self, ctx: SlashContext, tags: str, team_role: discord.Role = None):
         """Show all tasks tagged with every tag selected, sorted by due date."""
-        team = await data_manager.get_guild(ctx.guild).get_user_team(self.bot, ctx)
+        guild = data_manager.get_guild(ctx.guild)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
+        embed = response_cache.get_or_render(team, 'tagged_with', (tags,),
+                                             lambda: Tasks.render_tagged_with(team, tags))
+        await ctx.send(embed=embed)
+
+    @staticmethod
+    def render_tagged_with(team: models.Team, tags: str) -> discord.Embed:
+        """Render /tagged_with for a team."""
         tags = team.parse_tags(tags)
         matching_tasks = checks.are_there_tasks_tagged_with(team.tasks, tags)
 
@@ -414,18 +713,28 @@ class Tasks(commands.Cog):
         team.tasks_to_embed(matching_tasks, team.guild.tz, team.guild.locale, embed)
 
         embed.set_footer(text=team.role.name.upper())
-        await ctx.send(embed=embed)
+        return embed
 
     @commands.check(checks.is_user_in_a_team)
     @cog_ext.cog_slash(
         name='tasks',
         description='View all your tasks.',
+        options=[TEAM_OPTION]
     )
-    async def _tasks(self, ctx: SlashContext):
+    @invocation.wrap
+    async def _tasks(self, ctx: SlashContext, team_role: discord.Role = None):
         """Show every task in a team and all of their attributes."""
-        team = await data_manager.get_guild(ctx.guild).get_user_team(self.bot, ctx)
+        guild = data_manager.get_guild(ctx.guild)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
         checks.does_team_have_tasks(team)
 
+        embed = response_cache.get_or_render(team, 'tasks', (), lambda: Tasks.render_tasks(team))
+        await ctx.send(embed=embed)
+
+    @staticmethod
+    def render_tasks(team: models.Team) -> discord.Embed:
+        """Render /tasks for a team."""
         embed = discord.Embed(
             title=f'{constants.Emojis.TASKS.value} Your tasks:',
             description='To filter, use `/due_on` or `/tagged_with`.'
@@ -434,7 +743,7 @@ class Tasks(commands.Cog):
         ).set_footer(text=team.role.name.upper())
 
         team.tasks_to_embed(team.tasks, team.guild.tz, team.guild.locale, embed)
-        await ctx.send(embed=embed)
+        return embed
 
 
 def setup(bot: commands.Bot):
@@ -8,7 +8,7 @@ from discord_slash import cog_ext, SlashContext
 from discord_slash.utils.manage_commands import create_option
 
 sys.path.append('..')
-from core import constants, checks, models
+from core import constants, checks, invocation, models
 from core.data_management import data_manager
 from utils import iter_utils
 
@@ -39,6 +39,7 @@ class Teams(commands.Cog):
             )
         ]
     )
+    @invocation.wrap
     async def _delete_team(self, ctx: SlashContext, team_role: discord.Role,
                            confirmation: str = None):
         """Delete a team.
@@ -100,13 +101,22 @@ class Teams(commands.Cog):
                 option_type=5,
                 required=True
             ),
+            create_option(
+                name='team_role',
+                description='The team you are acting as a member of.'
+                            ' Defaults to your last selection.',
+                option_type=8,
+                required=False
+            ),
         ]
     )
+    @invocation.wrap
     async def _edit_notifications(self, ctx: SlashContext, batch: bool, early: bool,
-                                  early_time: int, exact: bool):
+                                  early_time: int, exact: bool, team_role: discord.Role = None):
         """Edit when the bot should send task notifications to a team."""
         guild = data_manager.get_guild(ctx.guild)
-        team = await guild.get_user_team(self.bot, ctx)
+        team = await guild.get_user_team(
+            self.bot, ctx, checks.does_user_belong_to_team(guild, ctx.author, team_role))
 
         team.notify.update({'batch': batch, 'early': early,
                             'early_time': early_time, 'exact': exact})
@@ -134,6 +144,7 @@ class Teams(commands.Cog):
             )
         ]
     )
+    @invocation.wrap
     async def _new_team(self, ctx: SlashContext, name: str):
         """Create a new team in the guild."""
         guild = data_manager.get_guild(ctx.guild)
@@ -168,6 +179,7 @@ class Teams(commands.Cog):
             )
         ]
     )
+    @invocation.wrap
     async def _team(self, ctx: SlashContext, team_role: discord.Role):
         """Join or leave a team."""
         guild = data_manager.get_guild(ctx.guild)
@@ -192,6 +204,7 @@ class Teams(commands.Cog):
         name='teams',
         description='View every team in the server.',
     )
+    @invocation.wrap
     async def _teams(self, ctx: SlashContext):
         """Show every team in the guild."""
         guild = data_manager.get_guild(ctx.guild)
@@ -7,12 +7,15 @@ from discord.ext import commands
 from discord_slash import SlashCommand
 
 sys.path.append('..')
-from . import constants, hidden
+from . import command_sync, constants, gateway, hidden
+from .metrics import metrics
 from utils import dt_utils
 
 # Set up the bot.
-bot = commands.Bot(command_prefix=constants.PREFIX)
-slash = SlashCommand(bot, sync_commands=True)
+bot = commands.Bot(command_prefix=constants.PREFIX, **gateway.client_options())
+# Registering every command on every boot is slow and rate-limited,
+# so command_sync only does it when they change.
+slash = SlashCommand(bot, sync_commands=False)
 bot.remove_command('help')
 
 # Load cogs.
@@ -21,3 +24,6 @@ for filename in os.listdir('src/cogs'):
         bot.load_extension(f'cogs.{filename[:-3]}')
         print(f'Loaded cog: {filename}')
 print()
+metrics.end_phase('load_cogs')
+
+bot.loop.create_task(command_sync.sync_commands(bot, slash))
@@ -2,8 +2,8 @@
 
 import datetime as dt
 import sys
-from datetime import datetime, timezone
-from typing import List
+from datetime import datetime, timezone, tzinfo
+from typing import List, Optional
 
 import discord
 from discord.ext import commands
@@ -11,18 +11,23 @@ from discord.ext.commands import Context
 from discord_slash import SlashContext
 
 sys.path.append('..')
-from . import hidden, models
+from . import hidden, invocation, models
 from .data_management import data_manager
+from utils import dt_utils, tz_utils
 
 
 def are_there_tasks_due_on_date(team: models.Team, date: dt.date) -> List[models.Task]:
-    """Check if there are any tasks due on a certain date and return it if so."""
-    try:
-        return models.Team.arrange_by_due_date(team.tasks)[date]
+    """Check if there are any tasks due on a certain date and return it if so.
+    Recurring tasks count if any of their occurrences is due on it.
+    """
+
+    tasks = models.Team.tasks_due_on(team.tasks, date)
 
-    except KeyError:
+    if not tasks:
         raise NoTasksDueOnDateError(team, date, was_expected=False)
 
+    return tasks
+
 
 def are_there_tasks_tagged_with(tasks, tags) -> List[str]:
     """Check if any of the tasks given are tagged with every given tag
@@ -41,6 +46,17 @@ def are_there_tasks_tagged_with(tasks, tags) -> List[str]:
     return matching_tasks
 
 
+def are_there_tasks_matching(team: models.Team, query: str) -> List[models.Task]:
+    """Check if any of a team's tasks match a search query and return them if so."""
+    matching_tasks = team.search_tasks(query)
+
+    if not matching_tasks:
+        raise NoTasksMatchingError(team, query)
+
+    return matching_tasks
+
+
+@invocation.timed_check
 def does_guild_have_control_roles(ctx: SlashContext) -> bool:
     """Check if there are any control roles in a guild."""
     if data_manager.get_guild(ctx.guild).control_roles:
@@ -48,6 +64,7 @@ def does_guild_have_control_roles(ctx: SlashContext) -> bool:
     raise GuildHasNoControlRolesError()
 
 
+@invocation.timed_check
 def does_guild_have_teams(ctx: SlashContext) -> bool:
     """Check if there are any teams in a guild."""
     if data_manager.get_guild(ctx.guild).teams:
@@ -55,6 +72,52 @@ def does_guild_have_teams(ctx: SlashContext) -> bool:
     raise GuildHasNoTeamsError()
 
 
+def does_task_exist(team: models.Team, user: discord.Member, date: dt.date,
+                    reference: str) -> models.Task:
+    """Check if a reference is to a task and return it if so.
+    References are either a task's ID, like "#a3", or its index on the last list
+    of tasks due on a date the user was shown. Tasks picked by index must not have changed
+    since then, so that tasks added, deleted or edited by others in the meantime
+    don't make the user act on a different task than the one they saw.
+    Indexes are never guessed without a recent list to go by.
+    """
+
+    reference = reference.strip()
+
+    if reference.startswith('#'):
+        task = team.get_task(reference[1:].lower())
+
+        if task is None:
+            raise TaskNotFoundError(team, reference)
+
+        return task
+
+    try:
+        index = int(reference)
+
+    except ValueError:
+        raise TaskNotFoundError(team, reference)
+
+    listing = team.get_listing(user.id, date)
+
+    if listing is None:
+        raise TaskListNotShownError(team, date)
+
+    version, entries = listing
+
+    if not 0 < index <= len(entries):
+        raise TaskNotFoundError(team, reference)
+
+    task_id, task_version = entries[index - 1]
+    task = team.get_task(task_id)
+
+    # Unless the team is unchanged, make sure the task itself is.
+    if task is None or (team.version != version and task.version != task_version):
+        raise TaskChangedError(team, reference)
+
+    return task
+
+
 def does_team_have_tasks(team: models.Team) -> bool:
     """Check if a team has any active tasks."""
     if team.tasks:
@@ -62,6 +125,23 @@ def does_team_have_tasks(team: models.Team) -> bool:
     raise NoActiveTasksError(team)
 
 
+def does_user_belong_to_team(guild: models.Guild, user: discord.Member,
+                             role: Optional[discord.Role]) -> Optional[models.Team]:
+    """Check if a user belongs to the team tied to a role, if one was given,
+    and return it if so.
+    """
+
+    if role is None:
+        return None
+
+    team = is_role_tied_to_team(guild, role)
+
+    if team in guild.get_user_teams(user):
+        return team
+
+    raise UserIsNotInTheTeamError(team)
+
+
 def does_user_have_permission(guild: models.Guild, user: discord.Member, action: str) -> bool:
     """Check if a user has permissions within a guild
     to make the bot perform an action.
@@ -86,18 +166,41 @@ def does_user_have_permission(guild: models.Guild, user: discord.Member, action:
 
 def has_date_passed(date: dt.date, tz: timezone) -> bool:
     """Check if a date has already passed."""
-    if date >= datetime.now(tz).date():
+    if date >= dt_utils.now(tz).date():
         return True
     raise DateHasAlreadyPassedError
 
 
 def has_datetime_passed(datetime_: datetime, tz: timezone) -> bool:
     """Check if a datetime has already passed."""
-    if datetime_ >= datetime.now(tz):
+    if datetime_ >= dt_utils.now(tz):
         return True
     raise DateHasAlreadyPassedError
 
 
+def is_recurrence(value: str) -> Optional[str]:
+    """Check if a string names a recurrence, or "never" for none, and return it if so."""
+    recurrence = value.lower()
+
+    if recurrence == 'never':
+        return None
+
+    if recurrence in models.Task.RECURRENCES:
+        return recurrence
+
+    raise InvalidRecurrenceError(value)
+
+
+def is_timezone(name: str) -> tzinfo:
+    """Check if a string names a timezone and return it if so."""
+    try:
+        return tz_utils.get_zone(name)
+
+    except ValueError:
+        raise InvalidTimezoneError(name)
+
+
+@invocation.timed_check
 def is_admin(ctx: SlashContext) -> bool:
     """Check if a user has administrator rights."""
     if ctx.channel.permissions_for(ctx.author).administrator:
@@ -126,6 +229,7 @@ def is_role_tied_to_team(guild: models.Guild, role: discord.Role) -> models.Team
     raise InvalidRoleError()
 
 
+@invocation.timed_check
 def is_user_in_a_team(ctx: SlashContext) -> bool:
     """Check if a user is in a team."""
     if data_manager.get_guild(ctx.guild).get_user_teams(ctx.author):
@@ -161,6 +265,30 @@ class InvalidRoleError(commands.CommandError):
         super().__init__()
 
 
+class InvalidImportError(commands.CommandError):
+    """Raise error when a file of tasks can't be imported, listing every reason why."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__()
+
+
+class InvalidRecurrenceError(commands.CommandError):
+    """Raise error when a recurrence is neither a known one nor "never"."""
+
+    def __init__(self, value: str):
+        self.value = value
+        super().__init__()
+
+
+class InvalidTimezoneError(commands.CommandError):
+    """Raise error when a timezone is neither a known zone name nor an offset from UTC."""
+
+    def __init__(self, name: str):
+        self.name = name
+        super().__init__()
+
+
 class NoActiveTasksError(commands.CommandError):
     """Raise error when there are no active tasks in a team."""
 
@@ -179,6 +307,15 @@ class NoTasksDueOnDateError(commands.CommandError):
         super().__init__()
 
 
+class NoTasksMatchingError(commands.CommandError):
+    """Raise error when no tasks match a search query."""
+
+    def __init__(self, team: models.Team, query: str):
+        self.team = team
+        self.query = query
+        super().__init__()
+
+
 class NoTasksTaggedWithError(commands.CommandError):
     """Raise error when no tasks tagged with the selected tags could be found."""
 
@@ -188,6 +325,33 @@ class NoTasksTaggedWithError(commands.CommandError):
         super().__init__()
 
 
+class TaskChangedError(commands.CommandError):
+    """Raise error when a task picked by index was changed or deleted after the user saw it."""
+
+    def __init__(self, team: models.Team, reference: str):
+        self.team = team
+        self.reference = reference
+        super().__init__()
+
+
+class TaskListNotShownError(commands.CommandError):
+    """Raise error when a task is picked by index without a recent list to pick from."""
+
+    def __init__(self, team: models.Team, date: dt.date):
+        self.team = team
+        self.date = date
+        super().__init__()
+
+
+class TaskNotFoundError(commands.CommandError):
+    """Raise error when a reference to a task doesn't match any."""
+
+    def __init__(self, team: models.Team, reference: str):
+        self.team = team
+        self.reference = reference
+        super().__init__()
+
+
 class UserDoesNotHavePermission(commands.CommandError):
     """Raise error when a control role prohibits a user
     from performing an action.
@@ -205,6 +369,14 @@ class UserIsNotAnAdminError(commands.CommandError):
         super().__init__()
 
 
+class UserIsNotInTheTeamError(commands.CommandError):
+    """Raise error when a user acts as a member of a team they aren't in."""
+
+    def __init__(self, team: models.Team):
+        self.team = team
+        super().__init__()
+
+
 class UserIsNotInATeamError(commands.CommandError):
     """Raise error when a user isn't in a team."""
 
@@ -0,0 +1,107 @@
+"""Register slash commands with Discord only when they change."""
+
+import hashlib
+import json
+import sys
+from typing import Any, Dict, Optional, Set, Tuple
+
+from discord.ext import commands
+from discord_slash import SlashCommand, error
+from discord_slash.utils import manage_commands
+
+sys.path.append('..')
+from .metrics import metrics
+
+# Path to the JSON file that stores the last manifest registered with Discord.
+# Delete it to force every command to be registered again.
+MANIFEST_PATH = 'data/commands.json'
+
+
+def build_manifest(slash: SlashCommand) -> Dict[str, Dict[str, Any]]:
+    """Describe every slash command the way Discord sees it."""
+    return {name: {'description': command.description,
+                   'options': command.options or [],
+                   'guild_ids': sorted(command.allowed_guild_ids or [])}
+            for name, command in slash.commands.items()}
+
+
+def hash_manifest(manifest: Dict[str, Dict[str, Any]]) -> str:
+    """Return a digest that changes whenever any command does."""
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+
+
+def registrations(manifest: Dict[str, Dict[str, Any]]) -> Set[Tuple[Optional[int], str]]:
+    """Return the guild ID, or None for global commands, and name of every registration
+    a manifest calls for.
+    """
+
+    return {(guild_id, name) for name, command in manifest.items()
+            for guild_id in command['guild_ids'] or [None]}
+
+
+def load_cached_manifest() -> Dict[str, Any]:
+    """Return the last manifest registered with Discord, or an empty one."""
+    try:
+        with open(MANIFEST_PATH, 'r') as fp:
+            return json.load(fp)
+
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'hash': None, 'commands': {}}
+
+
+async def sync_commands(bot: commands.Bot, slash: SlashCommand):
+    """Upsert changed commands and remove the ones registered where they no longer belong,
+    skipping it all if nothing changed.
+    """
+
+    await bot.wait_until_ready()
+
+    with metrics.phase('sync_commands'):
+        manifest = build_manifest(slash)
+        digest = hash_manifest(manifest)
+        cached = load_cached_manifest()
+
+        if cached['hash'] == digest:
+            print('Slash commands are up to date.')
+            return
+
+        changed = [name for name, command in manifest.items()
+                   if cached['commands'].get(name) != command]
+        wanted = registrations(manifest)
+
+        if cached['hash'] is None:
+            # Without a record of what was registered before, anything may have been left
+            # behind, globally or in any guild.
+            scopes = {None} | {guild.id for guild in bot.guilds} | {i for i, _ in wanted}
+        else:
+            # Commands removed, or no longer scoped to some guilds, are left where they were.
+            scopes = {i for i, _ in registrations(cached['commands']) - wanted}
+
+        # Upserting by name overwrites an existing command in place.
+        for name in changed:
+            for guild_id in manifest[name]['guild_ids'] or [None]:
+                await manage_commands.add_slash_command(
+                    bot.user.id, bot.http.token, guild_id, name,
+                    manifest[name]['description'], manifest[name]['options'])
+
+        removed = 0
+
+        for guild_id in scopes:
+            try:
+                registered = await manage_commands.get_all_commands(bot.user.id, bot.http.token,
+                                                                    guild_id)
+
+            # Guilds that didn't grant the bot the applications.commands scope can't have any.
+            except error.RequestFailure:
+                continue
+
+            for command in registered:
+                if (guild_id, command['name']) not in wanted:
+                    await manage_commands.remove_slash_command(
+                        bot.user.id, bot.http.token, guild_id, command['id'])
+                    removed += 1
+
+        with open(MANIFEST_PATH, 'w') as fp:
+            json.dump({'hash': digest, 'commands': manifest}, fp)
+
+        print(f'Slash commands synced: {len(changed)} upserted, {removed} removed.')
@@ -47,6 +47,8 @@ class Emojis(enum.Enum):
     DELETE = ':wastebasket:'
 
     DATE = ':calendar_spiral:'
+    REPEAT = ':repeat:'
+    SEARCH = ':mag_right:'
     TAGS = ':label:'
     TASKS = ':bookmark:'
 
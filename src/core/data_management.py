@@ -1,14 +1,18 @@
 """Manage data generated by the bot."""
 
-import json
+import asyncio
+import concurrent.futures
+import os
 import sys
+from typing import Any, List, Optional
 
 import discord
 from discord.ext import tasks as disc_tasks
 from discord.ext import commands
 
 sys.path.append('..')
-from . import models
+from . import models, serialization, snapshots
+from .metrics import metrics
 
 # Java-esque implementation that I'm not too happy with.
 # Tried to use static methods and functions outside a class
@@ -20,11 +24,18 @@ class DataManager:
     HAS_LOADED_DATA = False
     # In seconds.
     AUTOSAVE_INTERVAL = 3600
-    # Path to the JSON file that stores the seralized data.
+    # Path to the snapshot that stores the serialized data.
+    SNAPSHOT_PATH = 'data/guilds.snapshot'
+    # Path to the JSON file data was stored in before snapshots. Still read if it's newer.
+    # Other codecs store it next to it, under their own extension.
     JSON_PATH = 'data/guilds.json'
 
     def __init__(self):
         self.guilds = []
+        # Records being read ahead of time, while the bot logs in.
+        self._preloaded_records: Optional[concurrent.futures.Future] = None
+        # Set once stored data is bound to Discord objects and commands may use it.
+        self._bound = asyncio.Event()
 
     def get_guild(self, disc_guild_obj: discord.Guild) -> 'models.Guild':
         """Get the Guild object associated with a given Discord guild."""
@@ -48,30 +59,81 @@ class DataManager:
                 team.delete_expired()
 
     def save_data(self):
-        """Save data from memory to JSON."""
-        serialized_guilds = [guild.serialize() for guild in self.guilds]
+        """Save data from memory to storage."""
+        snapshots.write(DataManager.SNAPSHOT_PATH, self.guilds)
+        print(f'Data saved: {self.guilds}')
 
-        with open(DataManager.JSON_PATH, 'w') as fp:
-            json.dump(serialized_guilds, fp)
+    def read_data(self) -> Optional[Any]:
+        """Read and decode stored data into plain records, without touching Discord objects.
+        Safe to run in a thread.
+        """
 
-        print(f'Data saved: {serialized_guilds}')
+        with metrics.phase('read_data'):
+            # Data saved in an older format or with a different codec is still read.
+            paths = serialization.stored_paths(DataManager.JSON_PATH)
+
+            if os.path.exists(DataManager.SNAPSHOT_PATH):
+                paths.append(DataManager.SNAPSHOT_PATH)
+
+            if not paths:
+                return None
+
+            path = max(paths, key=os.path.getmtime)
+
+            if path == DataManager.SNAPSHOT_PATH:
+                return snapshots.read(path)
+
+            with open(path, 'rb') as fp:
+                return serialization.codec_for_path(path).loads(fp.read())
+
+    def preload_data(self):
+        """Start reading stored data in a thread, so it overlaps with logging in."""
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self._preloaded_records = executor.submit(self.read_data)
+        executor.shutdown(wait=False)
 
     async def load_data(self, bot: commands.Bot):
-        """Load data from JSON to memory."""
-        await bot.wait_until_ready()
+        """Load data from storage to memory. Loading again only applies what changed
+        in storage, so guilds, teams and tasks that are still stored keep running.
+        """
 
         try:
-            with open(DataManager.JSON_PATH, 'rb') as fp:
-                serialized_guilds = json.load(fp)
+            if self._preloaded_records is not None:
+                # Read ahead of time only once, whether that worked or not.
+                preloaded, self._preloaded_records = self._preloaded_records, None
+                serialized_guilds = await asyncio.wrap_future(preloaded)
+
+            else:
+                serialized_guilds = await asyncio.get_running_loop().run_in_executor(
+                    None, self.read_data)
+
+            # Binding records needs the guilds, roles and channels the gateway sends on login.
+            await bot.wait_until_ready()
+
+            if serialized_guilds is not None:
+                self.bind(serialization.reconcile_guilds(bot, self.guilds, serialized_guilds))
+
+                print(f'Data loaded: {self.guilds}')
+
+            else:
+                self.bind(self.guilds)
 
-        except FileNotFoundError:
-            return
+        except Exception as error:
+            print(f'Could not load data: {error!r}')
+            # Never leave commands waiting on data that isn't coming.
+            self._bound.set()
+            raise
 
-        self.guilds = list(filter(lambda x: x is not None,
-                                  [models.Guild.deserialize(bot, guild)
-                                   for guild in serialized_guilds]))
+    def bind(self, guilds: List['models.Guild']):
+        """Install guilds bound to Discord objects and let commands use them."""
+        self.guilds = guilds
+        self._bound.set()
 
-        print(f'Data loaded: {self.guilds}')
+    async def wait_until_bound(self):
+        """Wait until stored data is bound to Discord objects.
+        Until then, get_guild would hand out empty guilds.
+        """
 
+        await self._bound.wait()
 
 data_manager = DataManager()
@@ -0,0 +1,127 @@
+"""Serve every team's tasks as an iCalendar feed for calendar apps to subscribe to."""
+
+import io
+import secrets
+import sys
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+sys.path.append('..')
+from . import hidden, models, transfer
+from .data_management import data_manager
+from .metrics import metrics
+
+# Versions restart at zero with the bot, so ETags also carry this to tell runs apart.
+BOOT_ID = secrets.token_hex(4)
+
+
+class FeedServer:
+    """Serve team feeds at /feeds/{token}.ics, regenerating them only when their team changes."""
+
+    # Set FEED_SERVER_PORT in hidden.py to enable the server.
+    HOST = getattr(hidden, 'FEED_SERVER_HOST', '0.0.0.0')
+    PORT: Optional[int] = getattr(hidden, 'FEED_SERVER_PORT', None)
+    # Where users reach the server, which is usually behind a reverse proxy.
+    BASE_URL = getattr(hidden, 'FEED_BASE_URL', f'http://localhost:{PORT}')
+    # Calendar apps are told to check back this often, in seconds.
+    MAX_AGE = 300
+
+    def __init__(self):
+        self._runner = None
+        # Map feed tokens to the team version a feed was rendered at, its ETag and its body.
+        self._cache: Dict[str, Tuple[int, str, bytes]] = {}
+
+    @staticmethod
+    def feed_url(team: models.Team) -> str:
+        """Return the URL of a team's feed."""
+        return f'{FeedServer.BASE_URL}/feeds/{team.feed_token}.ics'
+
+    def get_team(self, token: str) -> Optional[models.Team]:
+        """Return the team a feed token belongs to, if it still exists."""
+        team = models.Team.get_by_feed_token(token)
+        return team if team is not None and self._is_live(team) else None
+
+    def discard_team(self, team: models.Team):
+        """Forget a team's cached feed."""
+        self._cache.pop(team.feed_token, None)
+
+    @staticmethod
+    def _is_live(team: models.Team) -> bool:
+        return team.guild is not None and team in team.guild.teams
+
+    def render(self, token: str, team: models.Team) -> Tuple[str, bytes]:
+        """Return a team's feed and its ETag, rendering it only if the team changed."""
+        cached = self._cache.get(token)
+
+        if cached is not None and cached[0] == team.version:
+            metrics.inc('ivone_feed_renders_total', result='cached')
+            return cached[1], cached[2]
+
+        with metrics.timer('ivone_operation_seconds', operation='render_feed'):
+            text = io.StringIO()
+            transfer.write_ics(team, text)
+            body = text.getvalue().encode()
+
+        etag = f'"{BOOT_ID}-{team.version}"'
+        self._cache[token] = (team.version, etag, body)
+        metrics.inc('ivone_feed_renders_total', result='rendered')
+        return etag, body
+
+    async def _handle_feed(self, request: web.Request) -> web.Response:
+        token = request.match_info['token']
+        team = self.get_team(token)
+
+        if team is None:
+            # Drop whatever was cached for revoked tokens.
+            self._cache.pop(token, None)
+            raise web.HTTPNotFound()
+
+        etag, body = self.render(token, team)
+        headers = {'ETag': etag, 'Cache-Control': f'max-age={FeedServer.MAX_AGE}'}
+
+        if etag in request.headers.get('If-None-Match', ''):
+            metrics.inc('ivone_feed_requests_total', status='304')
+            return web.Response(status=304, headers=headers)
+
+        metrics.inc('ivone_feed_requests_total', status='200')
+        return web.Response(body=body, headers=headers, content_type='text/calendar',
+                            charset='utf-8')
+
+    def make_app(self) -> web.Application:
+        """Return the web application serving the feeds."""
+        app = web.Application()
+        app.router.add_get('/feeds/{token}.ics', self._handle_feed)
+        return app
+
+    async def start(self, host: str = None, port: int = None):
+        """Serve feeds, if a port is configured."""
+        port = port if port is not None else FeedServer.PORT
+
+        if self._runner is not None or port is None:
+            return
+
+        # Feeds are built from stored data.
+        await data_manager.wait_until_bound()
+
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+
+        try:
+            await web.TCPSite(self._runner, host or FeedServer.HOST, port).start()
+
+        # Feeds are optional; don't keep the bot from running because of them.
+        except OSError as error:
+            print(f'Could not serve calendar feeds: {error}')
+            return
+
+        print(f'Calendar feeds served at {FeedServer.BASE_URL}/feeds/')
+
+    async def stop(self):
+        """Stop serving feeds."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+feed_server = FeedServer()
@@ -0,0 +1,36 @@
+"""Decide what the bot subscribes to and caches from the Discord gateway."""
+
+import sys
+from typing import Any, Dict
+
+import discord
+
+sys.path.append('..')
+from . import hidden
+
+# Set LOW_MEMORY = True in hidden.py to only receive and cache what the bot uses.
+LOW_MEMORY = getattr(hidden, 'LOW_MEMORY', False)
+
+
+def intents(low_memory: bool = LOW_MEMORY) -> discord.Intents:
+    """Return the gateway events to subscribe to."""
+    if not low_memory:
+        return discord.Intents.default()
+
+    # Roles and channels come with guild events, and slash commands carry the author's roles.
+    # Reactions drive the team selector and control role configuration.
+    # Direct messages are kept for developer commands.
+    return discord.Intents(guilds=True, guild_reactions=True, dm_messages=True)
+
+
+def client_options(low_memory: bool = LOW_MEMORY) -> Dict[str, Any]:
+    """Return the keyword arguments the bot's client is created with."""
+    if not low_memory:
+        return {'intents': intents(low_memory)}
+
+    # Nothing reads members or messages from the cache, so keep neither.
+    # The bot's own member is always cached regardless.
+    return {'intents': intents(low_memory),
+            'member_cache_flags': discord.MemberCacheFlags.none(),
+            'chunk_guilds_at_startup': False,
+            'max_messages': None}
@@ -0,0 +1,133 @@
+"""Wrap slash command checks and bodies with behavior shared by every command."""
+
+import asyncio
+import functools
+import sys
+import time
+from typing import Callable
+
+import discord
+from discord_slash import SlashContext
+
+sys.path.append('..')
+from .data_management import data_manager
+from .metrics import metrics
+from .outbox import outbox
+from utils import dt_utils
+
+# In seconds. Discord gives up on interactions that aren't answered within three,
+# so commands that haven't replied this long after being invoked are acknowledged,
+# and their reply is sent once it's ready.
+DEFER_AFTER = 2.0
+
+
+def age(ctx: SlashContext) -> float:
+    """Return how many seconds ago a command was invoked, going by its interaction's ID.
+    That includes the time spent receiving it and running its checks.
+    """
+
+    created = ((int(ctx.interaction_id) >> 22) + discord.utils.DISCORD_EPOCH) / 1000
+    # The host's clock may be behind Discord's.
+    return max(0.0, time.time() - created)
+
+
+def timed_check(predicate: Callable[[SlashContext], bool]) -> Callable[[SlashContext], bool]:
+    """Add the time a check takes to the total the command spent on checks.
+    Checks also wait for stored data to be loaded, since they read it.
+    """
+
+    @functools.wraps(predicate)
+    async def wrapper(ctx: SlashContext) -> bool:
+        start = time.perf_counter()
+
+        try:
+            await data_manager.wait_until_bound()
+            return predicate(ctx)
+        finally:
+            ctx.checks_duration = (getattr(ctx, 'checks_duration', 0.0)
+                                   + time.perf_counter() - start)
+
+    return wrapper
+
+
+def wrap(func: Callable = None, *, hidden: bool = False) -> Callable:
+    """Wrap a slash command body.
+    Must be applied below cog_slash, so the command registers the wrapper.
+    Commands that reply only to the user should be wrapped with hidden set,
+    so an automatic acknowledgement doesn't make their reply public.
+    """
+
+    if func is None:
+        return functools.partial(wrap, hidden=hidden)
+
+    @functools.wraps(func)
+    async def wrapper(self, ctx: SlashContext, *args, **kwargs):
+        command = ctx.name
+        send = ctx.send
+        defer = ctx.defer
+        send_duration = 0.0
+        # Keeps an acknowledgement from going out while a reply is being sent, or the other
+        # way around. Discord only takes one initial response.
+        responding = asyncio.Lock()
+        # Set while a reply is being sent, holding the lock.
+        sending = False
+
+        async def timed_send(*send_args, **send_kwargs):
+            nonlocal send_duration, sending
+            send_start = time.perf_counter()
+
+            try:
+                async with responding, outbox.interactive():
+                    sending = True
+                    return await send(*send_args, **send_kwargs)
+            finally:
+                sending = False
+                send_duration += time.perf_counter() - send_start
+
+        async def guarded_defer(*defer_args, **defer_kwargs):
+            # The library defers on its own before sending files as the first reply,
+            # from within the send that already holds the lock.
+            if sending:
+                return await defer(*defer_args, **defer_kwargs)
+
+            async with responding:
+                if not ctx.deferred and not ctx.responded:
+                    async with outbox.interactive():
+                        await defer(*defer_args, **defer_kwargs)
+
+        async def defer_if_slow():
+            await asyncio.sleep(max(0.0, DEFER_AFTER - age(ctx)))
+
+            async with responding:
+                if ctx.deferred or ctx.responded:
+                    return
+
+                async with outbox.interactive():
+                    await defer(hidden=hidden)
+
+            metrics.inc('ivone_command_deferrals_total', command=command)
+
+        # Time replies separately from the rest of the body,
+        # and hold bulk messages back while they're sent.
+        ctx.send = timed_send
+        ctx.defer = guarded_defer
+        start = time.perf_counter()
+        deferrer = asyncio.create_task(defer_if_slow())
+
+        try:
+            await data_manager.wait_until_bound()
+
+            with dt_utils.now_snapshot():
+                return await func(self, ctx, *args, **kwargs)
+
+        finally:
+            deferrer.cancel()
+            total = time.perf_counter() - start
+            metrics.observe('ivone_command_seconds', getattr(ctx, 'checks_duration', 0.0),
+                            command=command, phase='checks')
+            metrics.observe('ivone_command_seconds', total - send_duration,
+                            command=command, phase='body')
+            metrics.observe('ivone_command_seconds', send_duration,
+                            command=command, phase='send')
+
+    return wrapper
@@ -0,0 +1,87 @@
+"""Tear down the state of guilds the bot leaves and teams whose roles are deleted."""
+
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+import discord
+
+sys.path.append('..')
+from . import models
+from .data_management import data_manager
+from .feed_server import feed_server
+from .metrics import metrics
+from .response_cache import response_cache
+
+# Where the data of removed guilds and teams is kept, in case they're ever wanted back.
+ARCHIVE_DIR = 'data/archive'
+
+
+def archive(kind: str, id_: int, serialize: Callable[[], Dict[str, Any]]) -> Optional[str]:
+    """Write what a function serializes to the archive and return where it went."""
+    path = os.path.join(ARCHIVE_DIR, '{}-{}-{}.json'.format(
+        kind, id_, datetime.now().strftime('%Y%m%d-%H%M%S')))
+
+    # Failing to archive must never keep state from being torn down.
+    # Serializing can fail too, e.g. on a guild whose channels are all gone.
+    try:
+        data = serialize()
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+        with open(path, 'w') as fp:
+            json.dump(data, fp)
+
+    except Exception as error:
+        print(f'Could not archive {kind} {id_}: {error!r}')
+        return None
+
+    return path
+
+
+def remove_guild(disc_guild_obj: discord.Guild) -> Optional['models.Guild']:
+    """Archive a guild the bot left, stop everything it runs and forget it."""
+    guild = next((i for i in data_manager.guilds if i.disc_guild_obj == disc_guild_obj), None)
+
+    if guild is None:
+        return None
+
+    archive('guild', disc_guild_obj.id, guild.serialize)
+    data_manager.guilds.remove(guild)
+    close_guild(guild)
+    metrics.inc('ivone_teardowns_total', kind='guild')
+    return guild
+
+
+def remove_team(team: 'models.Team'):
+    """Archive a team whose role was deleted, stop its notifications and forget it."""
+    archive('team', team.role.id, lambda: {'guild_id': team.guild.disc_guild_obj.id,
+                                           **team.serialize()})
+    team.guild.teams.remove(team)
+    close_team(team)
+    metrics.inc('ivone_teardowns_total', kind='team')
+
+
+def close_guild(guild: 'models.Guild'):
+    """Stop everything a guild that's gone runs and drop what's cached about its teams."""
+    for team in guild.teams:
+        _forget_team(team)
+
+    guild.close()
+
+
+def close_team(team: 'models.Team'):
+    """Stop the notifications of a team that's gone and drop what's kept about it.
+    The team must already be out of its guild's teams.
+    """
+
+    team.guild.forget_team_selections(team)
+    _forget_team(team)
+    team.close()
+
+
+def _forget_team(team: 'models.Team'):
+    # Drop what other components cached about the team, instead of waiting for it to age out.
+    response_cache.discard_team(team)
+    feed_server.discard_team(team)
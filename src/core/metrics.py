@@ -0,0 +1,262 @@
+"""Collect runtime metrics and expose them to developers."""
+
+import asyncio
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+from aiohttp import web
+from discord.ext import tasks as disc_tasks
+
+from . import hidden
+
+# Label sets are stored as sorted tuples of (name, value) pairs so they can be used as keys.
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Count observations into cumulative buckets, the way Prometheus does."""
+
+    # In seconds.
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                       1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # The last slot counts observations above every bucket (+Inf).
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        """Record a single observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+
+        return float('inf')
+
+
+class Metrics:
+    """Store counters, gauges and histograms and serve them to developers."""
+
+    # Only listen locally by default; put a reverse proxy in front of it if it must be reachable.
+    SERVER_HOST = getattr(hidden, 'METRICS_HOST', '127.0.0.1')
+    # Set METRICS_PORT to None in hidden.py to disable the server.
+    SERVER_PORT: Optional[int] = getattr(hidden, 'METRICS_PORT', 9877)
+    # In seconds.
+    LAG_SAMPLE_INTERVAL = 1
+
+    HELP = {
+        'ivone_command_seconds': 'Slash command latency, split into checks, body and send.',
+        'ivone_command_errors_total': 'Slash commands that raised an error.',
+        'ivone_command_deferrals_total': 'Slash commands acknowledged before replying, as they'
+                                         ' took too long.',
+        'ivone_operation_seconds': 'Latency of internal operations.',
+        'ivone_event_loop_lag_seconds': 'How long a ready callback waits to be run.',
+        'ivone_notification_delay_seconds': 'How late scheduled notifications fire.',
+        'ivone_pending_notifications': 'Notifications currently waiting to fire.',
+        'ivone_startup_phase_seconds': 'How long each startup phase took.',
+        'ivone_feed_requests_total': 'Calendar feed requests, by response status.',
+        'ivone_feed_renders_total': 'Calendar feeds served, rendered anew or from cache.',
+        'ivone_response_cache_total': 'Task view lookups in the response cache, by result.',
+        'ivone_response_cache_evictions_total': 'Task views evicted from the response cache.',
+        'ivone_response_cache_bytes': 'Approximate size of the response cache.',
+        'ivone_teardowns_total': 'Guilds left and teams deleted whose state was torn down.',
+        'ivone_outbox_depth': 'Messages waiting in the outbox to be delivered.',
+        'ivone_outbox_messages_total': 'Outbox send attempts, by message kind and result.',
+        'ivone_outbox_latency_seconds': 'Time from queueing an outbox message to delivering it.',
+        'ivone_outbox_throttled_total': 'Outbox sends held back by their priority\'s budget.',
+        'ivone_outbox_reply_wait_seconds': 'How long replies to commands waited for their budget.',
+        'ivone_outbox_hold_expired_total': 'Outbox sends let through while replying to commands,'
+                                           ' as they had been held back too long.',
+    }
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._runner = None
+        # When the last startup phase ended. Starts counting as soon as the bot is imported.
+        self._phase_end = time.perf_counter()
+
+    @staticmethod
+    def _labels(labels: Dict[str, str]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Increase a counter."""
+        series = self.counters.setdefault(name, {})
+        key = Metrics._labels(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        """Set a gauge to a value."""
+        self.gauges.setdefault(name, {})[Metrics._labels(labels)] = value
+
+    def add(self, name: str, amount: float, **labels):
+        """Move a gauge up or down."""
+        series = self.gauges.setdefault(name, {})
+        key = Metrics._labels(labels)
+        series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        """Record an observation in a histogram."""
+        series = self.histograms.setdefault(name, {})
+        key = Metrics._labels(labels)
+
+        if key not in series:
+            series[key] = Histogram()
+
+        series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Time the enclosed block into a histogram."""
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def in_progress(self, name: str, **labels) -> Iterator[None]:
+        """Count the enclosed block in a gauge while it runs."""
+        self.add(name, 1, **labels)
+
+        try:
+            yield
+        finally:
+            self.add(name, -1, **labels)
+
+    def _record_phase(self, name: str, duration: float):
+        self.set('ivone_startup_phase_seconds', duration, phase=name)
+        print(f'Startup phase "{name}" took {duration:.2f}s')
+
+    def end_phase(self, name: str):
+        """Record a sequential startup phase,
+        which lasted from the end of the previous one until now.
+        """
+
+        now = time.perf_counter()
+        self._record_phase(name, now - self._phase_end)
+        self._phase_end = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the enclosed block as a startup phase. It may overlap with others."""
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self._record_phase(name, time.perf_counter() - start)
+
+    @disc_tasks.loop(seconds=LAG_SAMPLE_INTERVAL)
+    async def lag_monitor(self):
+        """Sample how long the event loop takes to get back to a ready callback."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.sleep(0)
+        self.observe('ivone_event_loop_lag_seconds', loop.time() - start)
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+
+        def format_labels(labels: Labels, extra: Labels = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{key}="{value}"' for key, value in pairs) + '}'
+
+        for type_, metrics in (('counter', self.counters), ('gauge', self.gauges)):
+            for name, series in sorted(metrics.items()):
+                lines.append(f'# HELP {name} {Metrics.HELP.get(name, name)}')
+                lines.append(f'# TYPE {name} {type_}')
+
+                for labels, value in series.items():
+                    lines.append(f'{name}{format_labels(labels)} {value}')
+
+        for name, series in sorted(self.histograms.items()):
+            lines.append(f'# HELP {name} {Metrics.HELP.get(name, name)}')
+            lines.append(f'# TYPE {name} histogram')
+
+            for labels, histogram in series.items():
+                cumulative = 0
+
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else bound
+                    lines.append(f'{name}_bucket{format_labels(labels, (("le", le),))}'
+                                 f' {cumulative}')
+
+                lines.append(f'{name}_sum{format_labels(labels)} {histogram.sum}')
+                lines.append(f'{name}_count{format_labels(labels)} {histogram.count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self) -> str:
+        """Return a short, human-readable view of every metric."""
+        lines = []
+
+        for name, series in sorted(self.histograms.items()):
+            lines.append(name)
+
+            for labels, histogram in sorted(series.items()):
+                label_text = ', '.join(f'{key}={value}' for key, value in labels) or '-'
+                lines.append(f'  {label_text}: n={histogram.count}'
+                             f' avg={histogram.sum / histogram.count * 1000:.1f}ms'
+                             f' p50<={histogram.quantile(0.5) * 1000:g}ms'
+                             f' p99<={histogram.quantile(0.99) * 1000:g}ms')
+
+        for name, series in sorted({**self.counters, **self.gauges}.items()):
+            lines.append(name)
+
+            for labels, value in sorted(series.items()):
+                label_text = ', '.join(f'{key}={value}' for key, value in labels) or '-'
+                lines.append(f'  {label_text}: {value:g}')
+
+        return '\n'.join(lines) if lines else 'No metrics recorded yet.'
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.to_prometheus(), content_type='text/plain')
+
+    async def start_server(self):
+        """Serve metrics over HTTP for a local Prometheus scraper, if a port is configured."""
+        if self._runner is not None or Metrics.SERVER_PORT is None:
+            return
+
+        app = web.Application()
+        app.router.add_get('/metrics', self._handle_metrics)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+
+        try:
+            await web.TCPSite(self._runner, Metrics.SERVER_HOST, Metrics.SERVER_PORT).start()
+
+        # Metrics are optional; don't keep the bot from running because of them.
+        except OSError as error:
+            print(f'Could not serve metrics: {error}')
+            return
+
+        print(f'Metrics served at http://{Metrics.SERVER_HOST}:{Metrics.SERVER_PORT}/metrics')
+
+
+metrics = Metrics()
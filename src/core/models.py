@@ -2,10 +2,14 @@
 
 import asyncio
 import datetime
+import secrets
 import datetime as dt
+import string
 import sys
-from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional
+import time
+import traceback
+from datetime import datetime, timezone, timedelta, tzinfo
+from typing import Any, Dict, List, Optional, Tuple
 
 import discord
 import unidecode
@@ -14,8 +18,10 @@ from discord.ext import commands
 from discord_slash import SlashContext
 
 sys.path.append('..')
-from . import constants
-from utils import iter_utils, dt_utils
+from . import constants, search
+from .metrics import metrics
+from .outbox import outbox
+from utils import clock, iter_utils, dt_utils, tz_utils
 
 class Guild:
     """Represent a Discord guild."""
@@ -24,6 +30,8 @@ class Guild:
     AUTO_BATCH_INTERVAL = 1
     # In 24h format.
     BATCH_TIME = dt.time(hour=6)
+    # In seconds. How long a member's team selection is reused before they're asked again.
+    TEAM_SELECTION_TTL = 900
 
     def __init__(self,
                  disc_guild_obj: discord.Guild,
@@ -32,7 +40,8 @@ class Guild:
                  teams: List['Team'] = None,
                  control_roles: List['ControlRole'] = None,
                  locale: str = None,
-                 tz_offset: int = None):
+                 tz_offset: int = None,
+                 tz_name: str = None):
         # Associate a Discord Guild object with this guild.
         self.disc_guild_obj = disc_guild_obj
 
@@ -55,10 +64,17 @@ class Guild:
             locale = 'en-US'
         self.locale = locale
 
-        # Guild admins have to manually adjust this for daylight savings and etc.
-        if not tz_offset:
-            tz_offset = -5  # EST
-        self._tz = timezone(timedelta(hours=tz_offset))
+        # Zone names, like "America/New_York", follow daylight saving time on their own.
+        # Bare offsets are kept for guilds that set one before zone names were supported.
+        if not tz_name:
+            tz_name = tz_utils.offset_name(tz_offset if tz_offset else -5)  # EST
+        self._tz = tz_utils.get_zone(tz_name)
+
+        # Set to make the batch loop work out when its next run is again.
+        self._reschedule = asyncio.Event()
+
+        # Map member IDs to the team they last selected and when they did so.
+        self._team_selections: Dict[int, Tuple['Team', float]] = {}
 
         # Start background tasks.
         self.auto_batch_notify.start()
@@ -82,9 +98,9 @@ class Guild:
         return self._tz
 
     @tz.setter
-    def tz(self, tz: timezone):
+    def tz(self, tz: tzinfo):
         self._tz = tz
-        self.auto_batch_notify.restart()
+        self._reschedule.set()
 
         for team in self.teams:
             team.update_tz(tz)
@@ -99,24 +115,64 @@ class Guild:
         return next((i for i in self.teams if i.role == role), None)
 
     async def del_team(self, team: 'Team'):
-        """Delete a team."""
+        """Delete a team and its role, tearing it down like any team whose role is gone."""
+        # The lifecycle module imports this one.
+        from . import lifecycle
+
+        lifecycle.remove_team(team)
         await team.role.delete()
-        self.teams.remove(team)
 
-    async def get_user_team(self, bot: commands.Bot, ctx: SlashContext) -> 'Team':
-        """Return every the team a user is in."""
-        user_teams = self.get_user_teams(ctx.author)
+    def forget_team_selections(self, team: 'Team'):
+        """Forget every member's selection of a team that's gone."""
+        for member_id in [key for key, value in self._team_selections.items()
+                          if value[0] is team]:
+            del self._team_selections[member_id]
 
-        if len(user_teams) == 1:
-            return user_teams[0]
+    def close(self):
+        """Stop every background task the guild and its teams run."""
+        self.auto_batch_notify.cancel()
 
-        # User is in more than one team and will have to choose.
-        team = await Guild.team_selector(bot, ctx, user_teams)
-        return team
+        for team in self.teams:
+            team.close()
+
+        self._team_selections.clear()
+
+    async def get_user_team(self, bot: commands.Bot, ctx: SlashContext,
+                            team: 'Team' = None) -> 'Team':
+        """Return the team a user is acting as a member of.
+        A team given through a command option is used as is and remembered.
+        """
+
+        with metrics.timer('ivone_operation_seconds', operation='get_user_team'):
+            if team is not None:
+                self._team_selections[ctx.author.id] = (team, time.monotonic())
+                return team
+
+            user_teams = self.get_user_teams(ctx.author)
+
+            if len(user_teams) == 1:
+                return user_teams[0]
+
+            # Reuse the user's last selection while it's recent and still valid.
+            if ctx.author.id in self._team_selections:
+                team, selected_at = self._team_selections[ctx.author.id]
+
+                if (team in user_teams
+                        and time.monotonic() - selected_at < Guild.TEAM_SELECTION_TTL):
+                    return team
+
+            # User is in more than one team and will have to choose.
+            team = await Guild.team_selector(bot, ctx, user_teams)
+
+            if team is not None:
+                self._team_selections[ctx.author.id] = (team, time.monotonic())
+
+            return team
 
     def get_user_teams(self, user: discord.Member) -> List['Team']:
         """Return all teams a guild member is in."""
-        return [i for i in self.teams if i.role in user.roles]
+        user_roles = set(user.roles)
+        return [i for i in self.teams if i.role in user_roles]
 
     @staticmethod
     async def team_selector(bot: commands.Bot, ctx: SlashContext, teams) -> Optional['Team']:
@@ -126,19 +182,27 @@ class Guild:
 
         message = await ctx.send(embed=discord.Embed(
             title=f'{constants.Emojis.TEAMS.value} Select one of your teams first:',
-            description=f'{iter_utils.iter_to_numbered_list([team.role for team in teams])}',
+            description=f'{iter_utils.iter_to_numbered_list([team.role for team in teams])}'
+                        f'\nTip: pass the team option to skip this step.',
             color=constants.Colors.DEFAULT.value))
 
-        # Use emojis as buttons that correspond to every team they're in.
-        for index, team in enumerate(teams):
-            await message.add_reaction(iter_utils.DIGIT_EMOJIS[index + 1])
+        # Raw events don't need the message or the member to be cached.
+        def check(payload_: discord.RawReactionActionEvent):
+            return (payload_.user_id == ctx.author.id and payload_.message_id == message.id
+                    and str(payload_.emoji) in iter_utils.DIGIT_EMOJIS)
+
+        # Listen before presenting the options so an early choice isn't missed.
+        selection = asyncio.ensure_future(bot.wait_for('raw_reaction_add', timeout=60.0,
+                                                       check=check))
 
-        def check(reaction_, user_):
-            return user_ == ctx.author and reaction_.emoji in iter_utils.DIGIT_EMOJIS
+        # Use emojis as buttons that correspond to every team they're in.
+        # They're added concurrently, so they may show up out of order.
+        await asyncio.gather(*(message.add_reaction(iter_utils.DIGIT_EMOJIS[index + 1])
+                               for index in range(len(teams))))
 
         try:
-            reaction, _ = await bot.wait_for('reaction_add', timeout=60.0, check=check)
-            team = teams[iter_utils.DIGIT_EMOJIS.index(reaction.emoji) - 1]
+            payload = await selection
+            team = teams[iter_utils.DIGIT_EMOJIS.index(str(payload.emoji)) - 1]
 
         except asyncio.TimeoutError:
             await message.delete()
@@ -157,7 +221,7 @@ class Guild:
         """
 
         if self.receive_announcements:
-            await self.target_channel.send(embed=embed)
+            await outbox.send(self.target_channel, embed=embed, kind='announcement')
 
     def search_for_target_channel(self) -> Optional[discord.TextChannel]:
         """Return a channel the bot has permissions to send messages in."""
@@ -177,30 +241,50 @@ class Guild:
 
     @disc_tasks.loop(seconds=1)
     async def auto_batch_notify(self):
-        """Routinely batch notify and delete expired tasks."""
-        now = datetime.now(self.tz)
+        """Routinely batch notify and delete expired tasks.
+        Sleeps until the next batch, worked out in UTC, so daylight saving time never
+        needs a restart. Timezone changes wake it up to work it out again.
+        """
+
+        # Guilds created during a command would otherwise batch at the time it ran at.
+        dt_utils.forget_snapshot()
+        next_batch = tz_utils.next_local_time(self.tz, Guild.BATCH_TIME, clock.now())
+        self._reschedule.clear()
+
+        try:
+            await clock.wait_for(self._reschedule.wait(),
+                                 timeout=max(0.0, tz_utils.seconds_until(next_batch)))
+            return
 
-        # Check if it's the correct time of day.
-        if now.time().replace(second=0, microsecond=0) == Guild.BATCH_TIME:
-            self.delete_expired()
+        except asyncio.TimeoutError:
+            pass
+
+        self.delete_expired()
+        metrics.observe('ivone_notification_delay_seconds',
+                        -tz_utils.seconds_until(next_batch), kind='batch')
 
-            start = datetime.combine(date=now.date(),
-                                     time=Guild.BATCH_TIME,
-                                     tzinfo=self.tz)
+        # Days are an hour shorter or longer across a transition,
+        # so the batch ends whenever the next one starts rather than 24 hours later.
+        start = next_batch.astimezone(self.tz)
+        stop = tz_utils.next_local_time(
+            self.tz, Guild.BATCH_TIME,
+            next_batch + timedelta(days=Guild.AUTO_BATCH_INTERVAL - 1)).astimezone(self.tz)
 
-            stop = datetime.combine(date=now.date() + timedelta(days=Guild.AUTO_BATCH_INTERVAL),
-                                    time=Guild.BATCH_TIME,
-                                    tzinfo=self.tz)
+        await self.batch_notify(start, stop)
 
-            await self.batch_notify(start, stop)
-            # Wait until the time the next batch notification will take place at.
-            await asyncio.sleep(Guild.AUTO_BATCH_INTERVAL * 24 * 3600)
+    def utc_offset_hours(self) -> float:
+        """Return the guild's current offset from UTC, in hours."""
+        return clock.now(self.tz).utcoffset().total_seconds() / 3600
 
     async def batch_notify(self, start: datetime, stop: datetime):
         """Notify every team of all tasks due on the time period
         between this run and the next.
         """
 
+        with dt_utils.now_snapshot():
+            await self._batch_notify(start, stop)
+
+    async def _batch_notify(self, start: datetime, stop: datetime):
         for team in self.teams:
             # Jump to the next team if this one has opted out of batch notifications.
             if not team.notify['batch']:
@@ -221,7 +305,8 @@ class Guild:
                 color=team.role.color)
 
             team.tasks_to_embed(tasks_in_range, self.tz, self.locale, embed)
-            await self.target_channel.send(f'{team.role.mention}', embed=embed)
+            await outbox.send(self.target_channel, f'{team.role.mention}', embed=embed,
+                              kind='digest')
 
     def delete_expired(self):
         """Delete expired tasks in every team."""
@@ -238,31 +323,8 @@ class Guild:
         return {'id': self.disc_guild_obj.id, 'target_channel_id': self.target_channel.id,
                 'receive_announcements': self.receive_announcements,
                 'teams': serialized_teams, 'control_roles': serialized_control_roles,
-                'locale': self.locale, 'tz_offset': self.tz.utcoffset(None).total_seconds() / 3600}
-
-    @staticmethod
-    def deserialize(bot, dict_: Dict[str, Any]) -> Optional['Guild']:
-        """Translate JSON-parsable to object state."""
-        disc_guild_obj = bot.get_guild(dict_['id'])
-
-        if disc_guild_obj is None:
-            return None
-
-        guild = Guild(disc_guild_obj=disc_guild_obj,
-                      target_channel=discord.utils.get(disc_guild_obj.channels,
-                                                       id=int(dict_['target_channel_id'])),
-                      receive_announcements=dict_['receive_announcements'],
-                      locale=dict_['locale'],
-                      tz_offset=dict_['tz_offset'])
-
-        guild.teams = list(filter(lambda x: x.role is not None,
-                                  [Team.deserialize(guild, team) for team in dict_['teams']]))
-
-        guild.control_roles = list(filter(lambda x: x.role is not None,
-                                          [ControlRole.deserialize(guild, control_role)
-                                           for control_role in dict_['control_roles']]))
-
-        return guild
+                'locale': self.locale, 'tz_name': tz_utils.zone_name(self.tz),
+                'tz_offset': self.utc_offset_hours()}
 
 
 class ControlRole:
@@ -297,7 +359,15 @@ class ControlRole:
 class Team:
     """Represent a team."""
 
-    def __init__(self, role: discord.Role, tasks: List['Task'] = None, notify: dict = None):
+    # Task IDs are numbers written in base 36, to keep them short.
+    TASK_ID_DIGITS = string.digits + string.ascii_lowercase
+    # In seconds. How long a member can pick tasks by index from a list they were shown.
+    LISTING_TTL = 900
+    # Map feed tokens to their teams, so feeds are looked up without going through every guild.
+    _teams_by_feed_token: Dict[str, 'Team'] = {}
+
+    def __init__(self, role: discord.Role, tasks: List['Task'] = None, notify: dict = None,
+                 feed_token: str = None, next_task_id: int = 1):
         # The guild this team belongs to.
         self.guild = None
         # Associate a Discord role object with this team.
@@ -307,37 +377,156 @@ class Team:
             tasks = []
         self.tasks = tasks
 
+        # Index task content for /search.
+        self.index = search.TaskIndex()
+
+        for task in self.tasks:
+            self.index.add(task)
+
+        # Secret part of the team's calendar feed URL.
+        self._feed_token: Optional[str] = None
+        self.feed_token = feed_token if feed_token else secrets.token_urlsafe(16)
+        # Bumped on every change to the team's tasks, so cached views know when they're stale.
+        self.version = 0
+        # IDs are never reused, so a task's ID can't come to mean another task.
+        self.next_task_id = next_task_id
+        # Map member IDs to the date of the last task list they were shown to pick from,
+        # the team version it was shown at, the ID and version of each task on it
+        # and when it was shown.
+        self._listings: Dict[int, Tuple[dt.date, int, List[Tuple[str, int]], float]] = {}
+
         # Set the team's notification settings.
         if notify is None:
             # Early time is measured in minutes.
             notify = {'batch': True, 'early': True, 'early_time': 60, 'exact': True}
         self.notify = notify
 
+    @property
+    def feed_token(self) -> str:
+        """Getter method."""
+        return self._feed_token
+
+    @feed_token.setter
+    def feed_token(self, feed_token: str):
+        self._forget_feed_token()
+        self._feed_token = feed_token
+        Team._teams_by_feed_token[feed_token] = self
+
+    @staticmethod
+    def get_by_feed_token(feed_token: str) -> Optional['Team']:
+        """Return the team a feed token belongs to, if any."""
+        return Team._teams_by_feed_token.get(feed_token)
+
+    def _forget_feed_token(self):
+        if Team._teams_by_feed_token.get(self._feed_token) is self:
+            del Team._teams_by_feed_token[self._feed_token]
+
     def add_task(self, task: 'Task'):
         """Write a new task to memory."""
+        if task.id is None:
+            task.id = self.new_task_id()
+
         task.team = self
         self.tasks.append(task)
+        self.index.add(task)
+        self.touch()
 
     def del_task(self, task: 'Task'):
         """Delete a task from memory."""
         self.tasks.remove(task)
+        self.index.remove(task)
+        task.cancel_notifications()
+        self.touch()
+
+    def set_task_content(self, task: 'Task', content: str):
+        """Change what a task is about, keeping it searchable."""
+        task.content = content
+        self.index.update(task)
+        task.touch()
+
+    def new_task_id(self) -> str:
+        """Return an ID no task in the team has had yet."""
+        number = self.next_task_id
+        self.next_task_id += 1
+        id_ = ''
+
+        while number:
+            number, digit = divmod(number, 36)
+            id_ = Team.TASK_ID_DIGITS[digit] + id_
+
+        return id_
+
+    def get_task(self, task_id: str) -> Optional['Task']:
+        """Return the task with an ID."""
+        return next((i for i in self.tasks if i.id == task_id), None)
+
+    def remember_listing(self, member_id: int, date: dt.date, tasks: List['Task']):
+        """Record the tasks due on a date a member was shown to pick from, in order.
+        Lists that expired are dropped meanwhile, so only recent ones are kept.
+        """
 
-    def get_tasks_in_range(self, start: datetime, stop: datetime) -> List['Task']:
-        """Return every task which is due sometime within a time range."""
-        dates_in_range = [start + timedelta(days=i)
-                          for i in range((stop - start).days)]
+        now = time.monotonic()
 
-        tasks_by_date = Team.arrange_by_due_date(self.tasks)
+        for expired in [key for key, value in self._listings.items()
+                        if now - value[3] >= Team.LISTING_TTL]:
+            del self._listings[expired]
+
+        self._listings[member_id] = (date, self.version,
+                                     [(task.id, task.version) for task in tasks], now)
+
+    def get_listing(self, member_id: int,
+                    date: dt.date) -> Optional[Tuple[int, List[Tuple[str, int]]]]:
+        """Return the team version and tasks of the last list of tasks due on a date
+        a member was shown, if that's the last list they were shown and it hasn't expired.
+        """
+
+        listing = self._listings.get(member_id)
+
+        if (listing is None or listing[0] != date
+                or time.monotonic() - listing[3] >= Team.LISTING_TTL):
+            return None
+
+        return listing[1], listing[2]
+
+    def update_listing(self, member_id: int, task: 'Task'):
+        """Record that a member saw a task on their last list change, because they changed it."""
+        if member_id not in self._listings:
+            return
+
+        date, version, entries, shown_at = self._listings[member_id]
+        self._listings[member_id] = (date, version,
+                                     [(id_, task.version if id_ == task.id else task_version)
+                                      for id_, task_version in entries], shown_at)
+
+    def close(self):
+        """Cancel every notification the team's tasks have pending and revoke its feed."""
+        for task in self.tasks:
+            task.cancel_notifications()
 
-        # Get dates within range that have any tasks due on them.
-        intersection = set(i.date() for i in dates_in_range).intersection(
-            set(tasks_by_date.keys()))
+        self._forget_feed_token()
+        self._listings.clear()
 
-        # Filter out tasks whose due time are out of range.
-        tasks_in_range = [i for date in intersection for i in tasks_by_date[date]
-                          if dates_in_range[0] < i.due_datetime <= dates_in_range[-1]]
+    def touch(self):
+        """Mark the team's tasks as changed."""
+        self.version += 1
 
-        return tasks_in_range
+    def reset_feed_token(self):
+        """Replace the team's calendar feed URL, revoking the old one."""
+        self.feed_token = secrets.token_urlsafe(16)
+
+    def search_tasks(self, query: str) -> List['Task']:
+        """Return tasks whose content matches a query, best matches first."""
+        with metrics.timer('ivone_operation_seconds', operation='search_tasks'):
+            return [task for task, _ in self.index.search(query)]
+
+    def get_tasks_in_range(self, start: datetime, stop: datetime) -> List['Task']:
+        """Return every task which is due sometime within a time range.
+        The range starts after its start and ends on its last whole day.
+        """
+
+        stop = start + timedelta(days=(stop - start).days - 1)
+
+        return [task for task in self.tasks if start < task.first_occurrence_after(start) <= stop]
 
     def parse_tags(self, tags: str) -> List[str]:
         """Parse user-inputted tags."""
@@ -363,21 +552,29 @@ class Team:
     def delete_expired(self):
         """Delete every task due on a past date."""
         tasks_by_date = Team.arrange_by_due_date(self.tasks)
+        now = dt_utils.now(self.guild.tz)
 
         for date in tasks_by_date:
             # If a past date is found, delete every task due on it.
-            if date < datetime.now(self.guild.tz).date():
+            if date < now.date():
                 for task in tasks_by_date[date]:
-                    self.del_task(task)
+                    self.expire_task(task, now)
 
             # In case of the current day, delete tasks by past due time.
-            elif date == datetime.now(self.guild.tz).date():
+            elif date == now.date():
                 for task in tasks_by_date[date]:
-                    if task.due_datetime < datetime.now(self.guild.tz):
-                        self.del_task(task)
+                    if task.due_datetime < now:
+                        self.expire_task(task, now)
+
+    def expire_task(self, task: 'Task', now: datetime):
+        """Delete a task that's past due, or move it on to its next occurrence if it recurs."""
+        if task.recurrence is None:
+            self.del_task(task)
+        else:
+            task.advance(now)
 
     @staticmethod
-    def tasks_to_embed(tasks: List['Task'], tz: timezone, locale: str,
+    def tasks_to_embed(tasks: List['Task'], tz: tzinfo, locale: str,
                        embed: discord.Embed):
         """Format tasks for user viewing in an embed, separating them by date."""
         tasks_by_due_date = Team.arrange_by_due_date(tasks)
@@ -398,21 +595,24 @@ class Team:
 
         output = ''
 
-        for task in tasks:
-            output += ('\n**{index}.** {content}'
-                       '\n⠀ {due_time}'
+        for index, task in enumerate(tasks):
+            output += ('\n**{index}.** `#{id}` {content}'
+                       '\n⠀ {due_time}{recurrence}'
                        '\n⠀ {tags}'
                        '\n').format(
-                index=tasks.index(task) + 1,
+                index=index + 1,
+                id=task.id,
                 content=task.content,
-                due_time=task.due_datetime.strftime(dt_utils.TIME_FORMATS[locale]),
+                due_time=dt_utils.format_time(task.due_datetime, locale),
+                recurrence=f' {constants.Emojis.REPEAT.value} {task.recurrence}'
+                if task.recurrence else '',
                 tags=iter_utils.format_iter(task.tags) if task.tags else Task.NO_TAGS_TEXT)
 
         return output
 
     @staticmethod
     def arrange_by_due_date(tasks: List['Task'] = None) -> Dict[dt.date, List['Task']]:
-        """Arrange tasks by their due date."""
+        """Arrange tasks by their due date. Recurring tasks are listed by their next occurrence."""
         tasks_by_date = {}
 
         for task in sorted(tasks, key=lambda x: x.due_datetime):
@@ -421,25 +621,37 @@ class Team:
 
         return tasks_by_date
 
-    def update_tz(self, tz: timezone):
+    @staticmethod
+    def tasks_due_on(tasks: List['Task'], date: dt.date) -> List['Task']:
+        """Return the tasks due on a date, in the order they're due.
+        Recurring tasks count if any of their occurrences is due on it.
+        """
+
+        occurrences = []
+
+        for task in tasks:
+            # The first occurrence after the day before is the only one that may be due on it.
+            occurrence = task.first_occurrence_after(
+                datetime.combine(date - timedelta(days=1), dt.time.max,
+                                 tzinfo=task.due_datetime.tzinfo))
+
+            if occurrence.date() == date:
+                occurrences.append((occurrence, task))
+
+        return [task for _, task in sorted(occurrences, key=lambda x: x[0])]
+
+    def update_tz(self, tz: tzinfo):
         """Update timezone."""
         for task in self.tasks:
             task.update_tz(tz)
 
+        self.touch()
+
     def serialize(self) -> Dict[str, Any]:
         """Translate object state to JSON-parsable."""
         serialized_tasks = [task.serialize() for task in self.tasks]
-        return {'role_id': self.role.id, 'notify': self.notify, 'tasks': serialized_tasks}
-
-    @staticmethod
-    def deserialize(guild: Guild, dict_: Dict[str, Any]) -> 'Team':
-        """Translate JSON-parsable to object state."""
-        team = Team(role=discord.utils.get(guild.disc_guild_obj.roles, id=int(dict_['role_id'])),
-                    notify=dict_['notify'])
-
-        guild.add_team(team)
-        team.tasks = [Task.deserialize(team, task) for task in dict_['tasks']]
-        return team
+        return {'role_id': self.role.id, 'notify': self.notify, 'tasks': serialized_tasks,
+                'feed_token': self.feed_token, 'next_task_id': self.next_task_id}
 
 
 class Task:
@@ -447,13 +659,25 @@ class Task:
 
     NO_TAGS_TEXT = '[*No Tags*]'
     SERIALIZED_DT_FMT = '%Y/%m/%d %H:%M'
+    RECURRENCES = dt_utils.RECURRENCES
 
-    def __init__(self, content: str, tags: List[str], due_datetime: datetime):
+    def __init__(self, content: str, tags: List[str], due_datetime: datetime,
+                 recurrence: str = None, series_start: datetime = None):
         # The team this task belongs to.
         self._team = None
+        # Short and stable within the team, like "a3". Given by the team when it's added to one.
+        self.id: Optional[str] = None
+        # Bumped on every change, so commands acting on what a user saw can tell it changed.
+        self.version = 0
         self.content = content
         self.tags = tags
+        # For recurring tasks, the next occurrence.
         self.due_datetime = due_datetime
+        self.recurrence = recurrence
+        # Occurrences are counted from here, so monthly ones keep their day of the month.
+        self.series_start = series_start if series_start else due_datetime
+        # Notifications scheduled for the next occurrence.
+        self._notifications: List[asyncio.Task] = []
 
     @property
     def team(self) -> Team:
@@ -463,21 +687,91 @@ class Task:
     @team.setter
     def team(self, team: Team):
         self._team = team
-        asyncio.create_task(self.schedule_early_notification())
-        asyncio.create_task(self.schedule_notification())
+
+        # Skip occurrences missed while the bot was offline.
+        if self.recurrence and self.due_datetime < clock.now(team.guild.tz):
+            self.due_datetime = self.next_occurrence(clock.now(team.guild.tz))
+
+        self.schedule()
+
+    def schedule(self):
+        """Schedule notifications for this task's next occurrence.
+        Notifications scheduled for any other due datetime are dropped when they wake up.
+        """
+
+        self.cancel_notifications()
+        self._notifications = [asyncio.create_task(self.schedule_early_notification()),
+                               asyncio.create_task(self.schedule_notification())]
+
+    def cancel_notifications(self):
+        """Cancel the task's pending notifications, so they stop holding it in memory."""
+        current = asyncio.current_task()
+
+        # A notification moving its task on to the next occurrence reschedules from within.
+        for notification in self._notifications:
+            if notification is not current:
+                notification.cancel()
+
+        self._notifications = []
+
+    def reschedule(self, due_datetime: datetime):
+        """Move the task to a new due datetime, restarting its series if it recurs."""
+        self.due_datetime = self.series_start = due_datetime
+        self.touch()
+        self.schedule()
+
+    def set_recurrence(self, recurrence: Optional[str]):
+        """Make the task recur from its current due datetime, or stop it from recurring."""
+        self.recurrence = recurrence
+        self.series_start = self.due_datetime
+        self.touch()
+
+    def occurrence(self, index: int) -> datetime:
+        """Return a recurring task's nth occurrence, counting from the start of its series."""
+        return dt_utils.occurrence(self.series_start, self.recurrence, index)
+
+    def next_occurrence(self, after: datetime) -> datetime:
+        """Return the first occurrence of a recurring task due after a datetime."""
+        return dt_utils.next_occurrence(self.series_start, self.recurrence, after)
+
+    def first_occurrence_after(self, after: datetime) -> datetime:
+        """Return the task's first occurrence due after a datetime, from its next one on.
+        Tasks which don't recur only ever have their due datetime.
+        """
+
+        if self.recurrence is None or self.due_datetime > after:
+            return self.due_datetime
+
+        return self.next_occurrence(after)
+
+    def advance(self, after: datetime):
+        """Move a recurring task on to its first occurrence after a datetime."""
+        self.due_datetime = self.next_occurrence(after)
+        self.touch()
+        self.schedule()
+
+    def touch(self):
+        """Mark the task as changed, along with its team."""
+        self.version += 1
+
+        if self.team is not None:
+            self.team.touch()
 
     def to_formatted_string(self) -> str:
         """Return a user-readable description of the task."""
-        return ('**Content:** {content}'
+        return ('**ID:** `#{id}`'
+                '\n**Content:** {content}'
                 '\n**Due date:** {due_date}'
                 '\n**Due time:** {due_time}'
+                '\n**Repeats:** {recurrence}'
                 '\n**Tags:** {tags}'
                 ).format(
+            id=self.id,
             content=self.content,
             due_date=dt_utils.format_date(self.due_datetime.date(), self.team.guild.tz,
                                           self.team.guild.locale),
-            due_time=self.due_datetime.strftime(dt_utils.TIME_FORMATS
-                                                [self.team.guild.locale]),
+            due_time=dt_utils.format_time(self.due_datetime, self.team.guild.locale),
+            recurrence=self.recurrence if self.recurrence else 'never',
             tags=iter_utils.format_iter(self.tags)
             if self.tags else Task.NO_TAGS_TEXT)
 
@@ -486,26 +780,37 @@ class Task:
         this task will be due in an x amount of time.
         """
 
+        # Notifications outlive the command that scheduled them, so they read the clock anew.
+        dt_utils.forget_snapshot()
+
         # Don't schedule early notification if the team has opted out of them
         # or if there isn't enough time until this task is due.
         #
         # The first check could be made after waiting for the time left,
         # but that wasn't made by design so that, barring the bot restarting,
         # changing team notification settings will never affect active tasks.
+        #
+        # Time left is measured in UTC, so reminders don't move with daylight saving time.
+        early_seconds = self.team.notify['early_time'] * 60
+
         if (not self.team.notify['early']
-                or self.due_datetime - timedelta(minutes=self.team.notify['early_time'])
-                < datetime.now(self.team.guild.tz)):
+                or tz_utils.seconds_until(self.due_datetime) < early_seconds):
             return
 
-        time_left = ((self.due_datetime - datetime.now(self.team.guild.tz))
-                     - timedelta(minutes=self.team.notify['early_time'])).total_seconds()
+        due_datetime = self.due_datetime
+        time_left = tz_utils.seconds_until(due_datetime) - early_seconds
 
-        await asyncio.sleep(time_left)
+        with metrics.in_progress('ivone_pending_notifications', kind='early'):
+            await clock.sleep(time_left)
 
-        # Cancel notification if task has been deleted.
-        if self not in self.team.tasks:
+        # Cancel notification if task has been deleted or moved.
+        if self not in self.team.tasks or self.due_datetime != due_datetime:
             return
 
+        metrics.observe('ivone_notification_delay_seconds',
+                        early_seconds - tz_utils.seconds_until(self.due_datetime),
+                        kind='early')
+
         await self.notify(title='Reminder: task due by __{due_date}__ __{due_time}__:'
                           .format(due_date=dt_utils
                                   .date_to_relative_name(self.due_datetime.date(),
@@ -515,21 +820,46 @@ class Task:
                           description=f'{self.content}')
 
     async def schedule_notification(self):
-        """Schedule a notification which tells users this task is due."""
+        """Schedule a notification which tells users this task is due.
+        Once it's due, a recurring task moves on to its next occurrence.
+        """
+
+        # Notifications outlive the command that scheduled them, so they read the clock anew.
+        dt_utils.forget_snapshot()
+
         # This check could be made after waiting for the time left,
         # but that wasn't made by design so that, barring the bot restarting,
         # changing team notification settings will never affect active tasks.
-        if self.due_datetime < datetime.now(self.team.guild.tz) or not self.team.notify['exact']:
+        # Recurring tasks still wait, since they need to move on once due.
+        if (tz_utils.seconds_until(self.due_datetime) < 0
+                or (not self.team.notify['exact'] and self.recurrence is None)):
             return
 
-        time_left = (self.due_datetime - datetime.now(self.team.guild.tz)).total_seconds()
-        await asyncio.sleep(time_left)
+        due_datetime = self.due_datetime
+        time_left = tz_utils.seconds_until(due_datetime)
+
+        with metrics.in_progress('ivone_pending_notifications', kind='exact'):
+            await clock.sleep(time_left)
 
-        # Cancel notification if task has been deleted.
-        if self not in self.team.tasks:
+        # Cancel notification if task has been deleted or moved.
+        if self not in self.team.tasks or self.due_datetime != due_datetime:
             return
 
-        await self.notify(title=self.content, description='')
+        try:
+            if self.team.notify['exact']:
+                metrics.observe('ivone_notification_delay_seconds',
+                                -tz_utils.seconds_until(self.due_datetime), kind='exact')
+
+                await self.notify(title=self.content, description='')
+
+        # A notification failing to send doesn't end the series. Being cancelled does,
+        # since the task is then being deleted, torn down or rescheduled.
+        except Exception:
+            traceback.print_exc()
+
+        # Only the next occurrence is ever scheduled.
+        if self.recurrence is not None:
+            self.advance(due_datetime)
 
     async def notify(self, title: str, description: str):
         """Format and send a notification message."""
@@ -544,37 +874,43 @@ class Task:
             embed.description += (f'\n{constants.Emojis.TAGS.value}'
                                   f' {iter_utils.format_iter(self.tags)}')
 
-        channel = self.team.guild.target_channel
-        await channel.send(f'{self.team.role.mention}', embed=embed)
+        if self.recurrence:
+            embed.description += f'\n{constants.Emojis.REPEAT.value} {self.recurrence}'
 
-    def update_tz(self, tz: timezone):
+        await outbox.send(self.team.guild.target_channel, f'{self.team.role.mention}',
+                          embed=embed, kind='notification')
+
+    def update_tz(self, tz: tzinfo):
         """Update timezone."""
         self.due_datetime = self.due_datetime.astimezone(tz)
+        self.series_start = self.series_start.astimezone(tz)
 
-    def serialize(self) -> Dict[str, Any]:
-        """Translate object state to JSON-parsable."""
-        serialized_tz = self.due_datetime.utcoffset().total_seconds() / 3600
-        serialized_dt = self.due_datetime.strftime(Task.SERIALIZED_DT_FMT) + f' {serialized_tz}'
-
-        return {'content': self.content, 'tags': self.tags, 'due_datetime': serialized_dt}
+    @staticmethod
+    def serialize_datetime(datetime_: datetime) -> str:
+        """Translate a timezone-aware datetime to a string."""
+        serialized_tz = datetime_.utcoffset().total_seconds() / 3600
+        return datetime_.strftime(Task.SERIALIZED_DT_FMT) + f' {serialized_tz}'
 
     @staticmethod
-    def deserialize(team, dict_: Dict[str, Any]) -> 'Task':
-        """Translate JSON-parsable to object state."""
+    def deserialize_datetime(string: str, tz: tzinfo) -> datetime:
+        """Translate a string to a datetime in a timezone."""
         # Split due datetime from timezone offset.
-        split_dt = dict_['due_datetime'].rsplit(' ', 1)
+        split_dt = string.rsplit(' ', 1)
         # Deserialize the due datetime.
-        due_datetime = datetime.strptime(split_dt[0], Task.SERIALIZED_DT_FMT)
+        datetime_ = datetime.strptime(split_dt[0], Task.SERIALIZED_DT_FMT)
         # Apply the timezone.
-        due_datetime = due_datetime.replace(tzinfo=timezone(timedelta(hours=float(split_dt[1]))))
+        datetime_ = datetime_.replace(tzinfo=timezone(timedelta(hours=float(split_dt[1]))))
         # Now that it's timezone-aware, convert it to the guild timezone,
         # just in case they differ.
-        due_datetime = due_datetime.astimezone(team.guild.tz)
+        return datetime_.astimezone(tz)
+
+    def serialize(self) -> Dict[str, Any]:
+        """Translate object state to JSON-parsable."""
+        serialized = {'id': self.id, 'content': self.content, 'tags': self.tags,
+                      'due_datetime': Task.serialize_datetime(self.due_datetime)}
 
-        # Create the task and assign it to its team.
-        task = Task(content=dict_['content'],
-                    tags=dict_['tags'],
-                    due_datetime=due_datetime)
+        if self.recurrence:
+            serialized['recurrence'] = self.recurrence
+            serialized['series_start'] = Task.serialize_datetime(self.series_start)
 
-        task.team = team
-        return task
+        return serialized
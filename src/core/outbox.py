@@ -0,0 +1,426 @@
+"""Deliver every message the bot sends on its own, retrying until Discord takes it,
+without letting it get in the way of replies to commands.
+"""
+
+import asyncio
+import collections
+import contextlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import traceback
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+import discord
+
+sys.path.append('..')
+from .metrics import metrics
+
+# A priority's name and a channel's ID.
+QueueKey = Tuple[str, int]
+
+
+class TokenBucket:
+    """Allow a steady rate of sends, with bursts of up to a capacity."""
+
+    def __init__(self, rate: float, capacity: float):
+        # In tokens per second.
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> int:
+        """Return how many tokens could be taken right now."""
+        self._refill()
+        return int(self.tokens)
+
+    def delay(self) -> float:
+        """Return how many seconds until a token can be taken."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+    def take(self) -> bool:
+        """Take a token, if there is one."""
+        self._refill()
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+    async def acquire(self):
+        """Wait for a token and take it."""
+        while not self.take():
+            await asyncio.sleep(self.delay())
+
+
+class OutboxMessage:
+    """Represent a message waiting to be sent to a channel."""
+
+    def __init__(self, channel_id: int, content: str = None, embed: Dict[str, Any] = None,
+                 kind: str = 'message', created: float = None, attempts: int = 0):
+        self.channel_id = channel_id
+        self.content = content
+        # Kept as a dictionary, so it can be stored as is.
+        self.embed = embed
+        # What the message is, like "notification" or "announcement". Used in metrics.
+        self.kind = kind
+        # In seconds since the epoch, so it still means something after a restart.
+        self.created = created if created is not None else time.time()
+        self.attempts = attempts
+
+    @property
+    def priority(self) -> str:
+        """Return the priority the message is sent with."""
+        return self.kind if self.kind in Outbox.PRIORITIES else Outbox.DEFAULT_PRIORITY
+
+    def serialize(self) -> Dict[str, Any]:
+        """Translate object state to JSON-parsable."""
+        return {'channel_id': self.channel_id, 'content': self.content, 'embed': self.embed,
+                'kind': self.kind, 'created': self.created, 'attempts': self.attempts}
+
+    @staticmethod
+    def deserialize(dict_: Dict[str, Any]) -> 'OutboxMessage':
+        """Translate JSON-parsable to object state."""
+        return OutboxMessage(**dict_)
+
+
+class Outbox:
+    """Queue messages per channel and have workers deliver them in order.
+
+    A failed send is retried after a jittered, exponentially growing delay, and
+    the messages after it in the same channel wait for it. Other channels carry on.
+    Undelivered messages are stored, so they're sent after a restart.
+
+    Messages are sent by priority, each within its own budget, and all of them wait
+    while a reply to a command is being sent, up to MAX_HOLD seconds at a time.
+    Order is only kept among messages of the same priority, so a notification
+    can overtake a digest to the same channel.
+    """
+
+    # From most to least urgent, with the rate in messages per second each may be sent at
+    # and how many may be sent in a burst. Discord allows 50 requests per second in all.
+    # The bulk priorities stay well under that together, leaving room for replies.
+    # Replies to interactions don't count towards that limit, so theirs only guards
+    # against runaway loops.
+    PRIORITIES = {
+        'interaction': (500, 500),
+        'notification': (12, 3),
+        'digest': (8, 2),
+        'announcement': (8, 1),
+    }
+    # For message kinds that aren't a priority of their own, like welcome messages.
+    DEFAULT_PRIORITY = 'notification'
+    # Senders wait once this many messages are undelivered.
+    MAX_SIZE = 10000
+    # How many channels are sent to at once.
+    WORKERS = 4
+    # In seconds. Replies hold other messages back for at most this long at a time,
+    # so a steady stream of commands can't starve them.
+    MAX_HOLD = 5
+    # Messages that still fail after this many attempts are given up on.
+    MAX_ATTEMPTS = 8
+    # In seconds. Retries wait a random time up to the base times two to the attempt,
+    # but never longer than the maximum.
+    RETRY_BASE = 2
+    RETRY_MAX = 600
+    # In seconds. Changes are stored at most this long after they happen.
+    SAVE_DELAY = 5
+    PATH = 'data/outbox.json'
+
+    def __init__(self):
+        self._bot = None
+        self._queues: Dict[QueueKey, Deque[OutboxMessage]] = {}
+        # Channels with messages to send that no worker is sending to or waiting to retry,
+        # most urgent first, then in the order they became ready.
+        self._ready: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count()
+        self._ranks = {priority: rank for rank, priority in enumerate(Outbox.PRIORITIES)}
+        self._buckets = {priority: TokenBucket(*budget)
+                         for priority, budget in Outbox.PRIORITIES.items()}
+        # Channels waiting for their priority's budget to allow another message.
+        self._throttled: Dict[str, Deque[QueueKey]] = {
+            priority: collections.deque() for priority in Outbox.PRIORITIES}
+        self._release_handles: Dict[str, asyncio.TimerHandle] = {}
+        # Set while no reply to a command is being sent.
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._interactive = 0
+        self._space = asyncio.Semaphore(Outbox.MAX_SIZE)
+        self._depth = 0
+        self._workers: List[asyncio.Task] = []
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def depth(self) -> int:
+        """Return how many messages are waiting to be delivered."""
+        return self._depth
+
+    async def send(self, channel: discord.abc.Messageable, content: str = None, *,
+                   embed: discord.Embed = None, kind: str = 'message') -> OutboxMessage:
+        """Queue a message to be sent to a channel. Waits while the outbox is full,
+        but not for the message to be delivered.
+        """
+
+        message = OutboxMessage(channel.id, content, embed.to_dict() if embed else None, kind)
+        await self._space.acquire()
+        self._push(message)
+        return message
+
+    @contextlib.asynccontextmanager
+    async def interactive(self) -> AsyncIterator[None]:
+        """Hold every other message back while replying to a command.
+        Replies still have to fit in their own budget.
+        """
+
+        self._interactive += 1
+        self._idle.clear()
+        start = time.perf_counter()
+
+        try:
+            await self._buckets['interaction'].acquire()
+            metrics.observe('ivone_outbox_reply_wait_seconds', time.perf_counter() - start)
+            yield
+
+        finally:
+            self._interactive -= 1
+
+            if not self._interactive:
+                self._idle.set()
+
+    def _push(self, message: OutboxMessage, first: bool = False):
+        key = (message.priority, message.channel_id)
+        queue = self._queues.get(key)
+
+        if queue is None:
+            queue = self._queues[key] = collections.deque()
+            self._make_ready(key)
+
+        if first:
+            queue.appendleft(message)
+        else:
+            queue.append(message)
+
+        self._set_depth(self._depth + 1)
+
+    def _set_depth(self, depth: int):
+        self._depth = depth
+        metrics.set('ivone_outbox_depth', depth)
+        self._schedule_save()
+
+    async def start(self, bot):
+        """Restore undelivered messages and start delivering."""
+        if self._workers:
+            return
+
+        self._bot = bot
+
+        # Restored messages were queued before anything queued since,
+        # so they go first in their channels.
+        for message in reversed(self.load()):
+            await self._space.acquire()
+            self._push(message, first=True)
+
+        self._workers = [asyncio.create_task(self._work()) for _ in range(Outbox.WORKERS)]
+
+    async def stop(self):
+        """Stop delivering and store whatever is left."""
+        for handle in self._release_handles.values():
+            handle.cancel()
+
+        self._release_handles.clear()
+
+        for worker in self._workers:
+            worker.cancel()
+
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self.save()
+
+    def _make_ready(self, key: QueueKey):
+        self._ready.put_nowait((self._ranks[key[0]], next(self._sequence), key))
+
+    def _throttle(self, key: QueueKey):
+        priority = key[0]
+        self._throttled[priority].append(key)
+        metrics.inc('ivone_outbox_throttled_total', priority=priority)
+
+        if priority not in self._release_handles:
+            self._release_handles[priority] = asyncio.get_running_loop().call_later(
+                self._buckets[priority].delay(), self._release, priority)
+
+    def _release(self, priority: str):
+        # Only let through as many channels as the budget allows,
+        # so they don't all come straight back.
+        del self._release_handles[priority]
+        throttled = self._throttled[priority]
+
+        for _ in range(max(1, self._buckets[priority].available())):
+            if not throttled:
+                break
+
+            self._make_ready(throttled.popleft())
+
+        if throttled:
+            self._release_handles[priority] = asyncio.get_running_loop().call_later(
+                self._buckets[priority].delay(), self._release, priority)
+
+    async def _work(self):
+        # When this worker started holding messages back for replies.
+        held_since: Optional[float] = None
+
+        while True:
+            if self._idle.is_set():
+                held_since = None
+            else:
+                held_since = held_since or time.monotonic()
+                await self._wait_until_idle(Outbox.MAX_HOLD - (time.monotonic() - held_since))
+
+            *_, key = await self._ready.get()
+
+            # A reply started while waiting, and something more urgent may be ready by now.
+            if not self._idle.is_set():
+                held_since = held_since or time.monotonic()
+
+                if time.monotonic() - held_since < Outbox.MAX_HOLD:
+                    self._make_ready(key)
+                    continue
+
+                metrics.inc('ivone_outbox_hold_expired_total')
+
+            held_since = None
+
+            if not self._buckets[key[0]].take():
+                self._throttle(key)
+                continue
+
+            queue = self._queues[key]
+            message = queue[0]
+
+            if not await self._deliver(message):
+                # Keep the channel out of the way until it's time to try again.
+                delay = random.uniform(0, min(Outbox.RETRY_MAX,
+                                              Outbox.RETRY_BASE * 2 ** message.attempts))
+                asyncio.get_running_loop().call_later(delay, self._make_ready, key)
+                self._schedule_save()
+                continue
+
+            queue.popleft()
+            self._space.release()
+            self._set_depth(self._depth - 1)
+
+            if queue:
+                # Back of the line, so busy channels don't starve the others.
+                self._make_ready(key)
+            else:
+                del self._queues[key]
+
+    async def _wait_until_idle(self, timeout: float):
+        # Unlike asyncio.wait_for, asyncio.wait never swallows the worker being cancelled
+        # when replies end at the same time.
+        waiter = asyncio.ensure_future(self._idle.wait())
+
+        try:
+            await asyncio.wait([waiter], timeout=max(0.0, timeout))
+
+        finally:
+            waiter.cancel()
+
+    async def _deliver(self, message: OutboxMessage) -> bool:
+        """Try to send a message. Return whether it's done with, sent or not."""
+        channel = self._bot.get_channel(message.channel_id)
+
+        # The channel was deleted, or the bot left its guild.
+        if channel is None:
+            metrics.inc('ivone_outbox_messages_total', kind=message.kind, result='dropped')
+            return True
+
+        try:
+            with metrics.timer('ivone_operation_seconds', operation='outbox_send'):
+                await channel.send(message.content,
+                                   embed=discord.Embed.from_dict(message.embed)
+                                   if message.embed else None)
+
+        except discord.NotFound:
+            metrics.inc('ivone_outbox_messages_total', kind=message.kind, result='dropped')
+            return True
+
+        # Server errors, rate limits, timeouts and missing permissions may all pass.
+        except (discord.HTTPException, aiohttp.ClientError, asyncio.TimeoutError,
+                OSError) as error:
+            message.attempts += 1
+
+            if message.attempts >= Outbox.MAX_ATTEMPTS:
+                print(f'Gave up on a {message.kind} to channel {message.channel_id}'
+                      f' after {message.attempts} attempts: {error}')
+                metrics.inc('ivone_outbox_messages_total', kind=message.kind, result='failed')
+                return True
+
+            metrics.inc('ivone_outbox_messages_total', kind=message.kind, result='retried')
+            return False
+
+        # Anything else is a bug, and retrying won't help. It mustn't stop the worker.
+        except Exception:
+            print(f'Dropped a {message.kind} to channel {message.channel_id}:')
+            traceback.print_exc()
+            metrics.inc('ivone_outbox_messages_total', kind=message.kind, result='failed')
+            return True
+
+        metrics.inc('ivone_outbox_messages_total', kind=message.kind, result='sent')
+        metrics.observe('ivone_outbox_latency_seconds', time.time() - message.created,
+                        kind=message.kind)
+        return True
+
+    def _schedule_save(self):
+        # Only save once for a burst of changes.
+        if self._save_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+
+            except RuntimeError:
+                return
+
+            self._save_handle = loop.call_later(Outbox.SAVE_DELAY, self.save)
+
+    def save(self):
+        """Store every undelivered message."""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+
+        messages = [message.serialize()
+                    for message in itertools.chain.from_iterable(self._queues.values())]
+        temporary_path = f'{Outbox.PATH}.tmp'
+
+        try:
+            with open(temporary_path, 'w') as fp:
+                json.dump(messages, fp)
+
+            os.replace(temporary_path, Outbox.PATH)
+
+        except OSError as error:
+            print(f'Could not store the outbox: {error}')
+
+    @staticmethod
+    def load() -> List[OutboxMessage]:
+        """Read the undelivered messages stored last time."""
+        try:
+            with open(Outbox.PATH) as fp:
+                return [OutboxMessage.deserialize(i) for i in json.load(fp)]
+
+        except FileNotFoundError:
+            return []
+
+
+outbox = Outbox()
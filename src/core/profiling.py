@@ -0,0 +1,172 @@
+"""Profile where a running bot spends its CPU time and memory, for developers."""
+
+import asyncio
+import collections
+import cProfile
+import gc
+import io
+import os
+import pstats
+import sys
+import tracemalloc
+from datetime import datetime
+from typing import Optional
+
+sys.path.append('..')
+from . import models
+from .data_management import data_manager
+
+# Where reports are written, so they outlive the message they were sent in.
+REPORTS_DIR = 'data/reports'
+# How many functions, lines or coroutines each report lists.
+REPORT_LIMIT = 40
+
+
+def write_report(kind: str, report: str) -> Optional[str]:
+    """Write a report to the reports directory and return where it went."""
+    path = os.path.join(REPORTS_DIR, '{}-{}.txt'.format(
+        kind, datetime.now().strftime('%Y%m%d-%H%M%S')))
+
+    try:
+        os.makedirs(REPORTS_DIR, exist_ok=True)
+
+        with open(path, 'w') as fp:
+            fp.write(report)
+
+    except OSError as error:
+        print(f'Could not write the {kind} report: {error}')
+        return None
+
+    return path
+
+
+class Profiler:
+    """Profile every function the bot runs for a window of time, one window at a time."""
+
+    # In seconds.
+    DEFAULT_WINDOW = 30
+    MAX_WINDOW = 600
+
+    def __init__(self):
+        self._profile: Optional[cProfile.Profile] = None
+        self._stop = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        """Return whether a window is being profiled."""
+        return self._profile is not None
+
+    async def profile(self, seconds: float = DEFAULT_WINDOW) -> str:
+        """Profile until the window ends or stop is called, and report the functions
+        that took the most time, along with everything they called.
+        """
+
+        if self.running:
+            raise RuntimeError('A profile is already running.')
+
+        self._profile = cProfile.Profile()
+        self._stop.clear()
+        self._profile.enable()
+
+        try:
+            await asyncio.wait_for(self._stop.wait(),
+                                   timeout=min(seconds, Profiler.MAX_WINDOW))
+
+        except asyncio.TimeoutError:
+            pass
+
+        finally:
+            self._profile.disable()
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        self._profile = None
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_LIMIT)
+        return stream.getvalue()
+
+    def stop(self):
+        """End the window being profiled early."""
+        self._stop.set()
+
+
+class HeapTracker:
+    """Trace memory allocations and compare snapshots of them."""
+
+    # How many frames of each allocation's traceback are kept. More is slower.
+    FRAMES = 5
+
+    def __init__(self):
+        self._previous: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def tracing(self) -> bool:
+        """Return whether allocations are being traced."""
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        """Start tracing allocations. Only allocations made from now on are seen."""
+        if not self.tracing:
+            tracemalloc.start(HeapTracker.FRAMES)
+
+        self._previous = None
+
+    def snapshot(self) -> str:
+        """Take a snapshot and report the lines holding the most memory,
+        or the ones that grew the most since the last snapshot.
+        """
+
+        if not self.tracing:
+            self.start()
+
+        # Don't count the tracer's own memory.
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f'Traced: {current / 1024:.1f} KiB now, {peak / 1024:.1f} KiB at peak.']
+
+        if self._previous is None:
+            lines.append(f'Top {REPORT_LIMIT} lines by memory held:')
+            lines += [str(i) for i in snapshot.statistics('lineno')[:REPORT_LIMIT]]
+        else:
+            lines.append(f'Top {REPORT_LIMIT} lines by growth since the last snapshot:')
+            lines += [str(i) for i
+                      in snapshot.compare_to(self._previous, 'lineno')[:REPORT_LIMIT]]
+
+        self._previous = snapshot
+        return '\n'.join(lines)
+
+    def stop(self):
+        """Stop tracing and forget every snapshot."""
+        tracemalloc.stop()
+        self._previous = None
+
+
+def count_objects() -> str:
+    """Report how many guilds, teams and tasks are alive against how many are in use,
+    and what every pending coroutine is running. Differences point to leaks.
+    """
+
+    gc.collect()
+    alive = collections.Counter(type(i).__name__ for i in gc.get_objects()
+                                if isinstance(i, (models.Guild, models.Team, models.Task,
+                                                  models.ControlRole)))
+    teams = [team for guild in data_manager.guilds for team in guild.teams]
+    in_use = {'Guild': len(data_manager.guilds),
+              'Team': len(teams),
+              'Task': sum(len(team.tasks) for team in teams),
+              'ControlRole': sum(len(guild.control_roles) for guild in data_manager.guilds)}
+
+    lines = ['Objects (alive / in use):']
+    lines += [f'{name}: {alive[name]} / {count}' for name, count in in_use.items()]
+
+    tasks = asyncio.all_tasks()
+    coroutines = collections.Counter(getattr(task.get_coro(), '__qualname__', 'unknown')
+                                     for task in tasks)
+    lines.append(f'\nPending asyncio tasks: {len(tasks)}')
+    lines += [f'{name}: {count}' for name, count in coroutines.most_common(REPORT_LIMIT)]
+
+    return '\n'.join(lines)
+
+
+profiler = Profiler()
+heap = HeapTracker()
@@ -0,0 +1,107 @@
+"""Cache the embeds read-only task views render, until their team changes."""
+
+import collections
+import json
+import sys
+from typing import Callable, Dict, Hashable, Tuple
+
+import discord
+
+sys.path.append('..')
+from . import models
+from .metrics import metrics
+from utils import dt_utils
+
+CacheKey = Tuple[Hashable, ...]
+
+
+class ResponseCache:
+    """Keep rendered embeds in least recently used order, within a memory budget."""
+
+    # In bytes, as measured by the size of the embeds' JSON payloads.
+    MAX_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: 'collections.OrderedDict[CacheKey, Tuple[dict, int]]' = \
+            collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(team: 'models.Team', view: str, args: Tuple[Hashable, ...]) -> CacheKey:
+        """Describe everything a view's embed depends on.
+        Relative dates change at the guild's midnight, so the local day is part of it.
+        """
+
+        guild = team.guild
+        return (team.role.id, view, args, team.version, dt_utils.now(guild.tz).date(),
+                guild.locale, guild.tz, team.role.name, team.role.color.value)
+
+    def get_or_render(self, team: 'models.Team', view: str, args: Tuple[Hashable, ...],
+                      render: Callable[[], discord.Embed]) -> discord.Embed:
+        """Return a cached copy of a view's embed, rendering and caching it if needed.
+        Errors raised while rendering aren't cached.
+        """
+
+        key = ResponseCache.key(team, view, args)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            self._entries.move_to_end(key)
+            metrics.inc('ivone_response_cache_total', result='hit', view=view)
+            # Embeds are mutable, so hand out a fresh one each time.
+            return discord.Embed.from_dict(entry[0])
+
+        metrics.inc('ivone_response_cache_total', result='miss', view=view)
+        embed = render()
+        self._put(key, embed.to_dict())
+        return embed
+
+    def _put(self, key: CacheKey, payload: dict):
+        size = len(json.dumps(payload))
+
+        # Don't let a single huge embed flush everything else.
+        if size > self.max_bytes // 4:
+            return
+
+        self._entries[key] = (payload, size)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            metrics.inc('ivone_response_cache_evictions_total')
+
+        metrics.set('ivone_response_cache_bytes', self.size)
+
+    def discard_team(self, team: 'models.Team'):
+        """Forget every cached embed of a team."""
+        for key in [i for i in self._entries if i[0] == team.role.id]:
+            self.size -= self._entries.pop(key)[1]
+
+        metrics.set('ivone_response_cache_bytes', self.size)
+
+    def clear(self):
+        """Forget every cached embed."""
+        self._entries.clear()
+        self.size = 0
+        metrics.set('ivone_response_cache_bytes', 0)
+
+    def stats(self) -> Dict[str, float]:
+        """Return the cache's size and hit rate."""
+        counts = {}
+
+        for labels, count in metrics.counters.get('ivone_response_cache_total', {}).items():
+            result = dict(labels)['result']
+            counts[result] = counts.get(result, 0) + count
+
+        lookups = sum(counts.values())
+        return {'entries': len(self), 'bytes': self.size,
+                'hits': counts.get('hit', 0), 'misses': counts.get('miss', 0),
+                'hit_rate': counts.get('hit', 0) / lookups if lookups else 0.0}
+
+
+response_cache = ResponseCache()
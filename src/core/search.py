@@ -0,0 +1,102 @@
+"""Index task content for full-text search."""
+
+import collections
+import re
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+
+import unidecode
+
+if TYPE_CHECKING:
+    from .models import Task
+
+# Share of a query's trigrams a task must contain to count as a match.
+# Low enough to forgive a typo or two in short words.
+MIN_SCORE = 0.5
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def normalize(text: str) -> str:
+    """Fold case and accents the same way tags are, so both are searched alike."""
+    return unidecode.unidecode(text.lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Split text into the trigrams of its words.
+    Words are padded, so their beginnings weigh more and short words still have trigrams.
+    """
+
+    grams = set()
+
+    for word in WORD_PATTERN.findall(normalize(text)):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    return grams
+
+
+class TaskIndex:
+    """Map the trigrams in a team's task contents to the tasks containing them."""
+
+    def __init__(self):
+        self._postings: Dict[str, Set['Task']] = collections.defaultdict(set)
+        # The trigrams each task was indexed under, so it can be removed without rescanning.
+        self._grams: Dict['Task', Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def add(self, task: 'Task'):
+        """Index a task by its content."""
+        grams = trigrams(task.content)
+        self._grams[task] = grams
+
+        for gram in grams:
+            self._postings[gram].add(task)
+
+    def remove(self, task: 'Task'):
+        """Stop indexing a task."""
+        for gram in self._grams.pop(task, ()):
+            postings = self._postings[gram]
+            postings.discard(task)
+
+            if not postings:
+                del self._postings[gram]
+
+    def update(self, task: 'Task'):
+        """Reindex a task whose content changed."""
+        self.remove(task)
+        self.add(task)
+
+    def search(self, query: str) -> List[Tuple['Task', float]]:
+        """Return tasks matching a query along with their scores, best matches first.
+        Only the tasks sharing a trigram with the query are ever looked at.
+        """
+
+        query_grams = trigrams(query)
+
+        if not query_grams:
+            return []
+
+        hits = collections.Counter()
+
+        for gram in query_grams:
+            hits.update(self._postings.get(gram, ()))
+
+        normalized_query = normalize(query)
+        results = []
+
+        for task, count in hits.items():
+            score = count / len(query_grams)
+
+            if score < MIN_SCORE:
+                continue
+
+            # Verbatim matches outrank fuzzy ones.
+            if normalized_query in normalize(task.content):
+                score += 1
+
+            results.append((task, score))
+
+        # Break ties by due date, sooner first.
+        results.sort(key=lambda x: (-x[1], x[0].due_datetime))
+        return results
@@ -0,0 +1,381 @@
+"""Encode guilds, teams and tasks for storage, and decode them back.
+
+Stored data is a versioned document. Tasks are stored team by team in columns,
+with due datetimes as Unix timestamps, so encoding never builds a dictionary
+or formats a string per task. Data stored before schema versions existed,
+as a list of Guild.serialize dictionaries, is still read.
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import discord
+
+sys.path.append('..')
+from . import hidden, models
+from utils import clock, tz_utils
+
+# Bump when the layout of stored documents changes, and keep reading older ones.
+SCHEMA_VERSION = 2
+
+
+class Codec:
+    """Turn plain records into bytes and back."""
+
+    def __init__(self, name: str, extension: str, dumps: Callable[[Any], bytes],
+                 loads: Callable[[bytes], Any]):
+        self.name = name
+        # Codecs sharing an extension read each other's files.
+        self.extension = extension
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        return f'Codec({self.name})'
+
+
+CODECS: Dict[str, Codec] = {
+    'json': Codec('json', '.json',
+                  lambda obj: json.dumps(obj, separators=(',', ':')).encode(), json.loads),
+}
+
+# Faster codecs are used when installed.
+try:
+    import orjson
+
+    CODECS['orjson'] = Codec('orjson', '.json', orjson.dumps, orjson.loads)
+
+except ImportError:
+    pass
+
+try:
+    import msgpack
+
+    CODECS['msgpack'] = Codec('msgpack', '.msgpack', msgpack.packb, msgpack.unpackb)
+
+except ImportError:
+    pass
+
+# In order of preference.
+PREFERRED_CODECS = ['orjson', 'msgpack', 'json']
+
+
+def get_codec(name: str = None) -> Codec:
+    """Return a codec by name, or the one set as SERIALIZER in hidden.py,
+    or the fastest one installed.
+    """
+
+    name = name or getattr(hidden, 'SERIALIZER', None)
+
+    if name is not None:
+        if name in CODECS:
+            return CODECS[name]
+
+        print(f'Serializer {name} is not installed. Falling back to the fastest one that is.')
+
+    return next(CODECS[i] for i in PREFERRED_CODECS if i in CODECS)
+
+
+def codec_for_path(path: str) -> Codec:
+    """Return the preferred installed codec that reads files like the given one."""
+    extension = os.path.splitext(path)[1]
+    return next(CODECS[i] for i in PREFERRED_CODECS
+                if i in CODECS and CODECS[i].extension == extension)
+
+
+def codec_for_name(name: str) -> Codec:
+    """Return an installed codec that reads what a codec, installed or not, wrote."""
+    if name in CODECS:
+        return CODECS[name]
+
+    # orjson writes plain JSON.
+    if name == 'orjson':
+        return CODECS['json']
+
+    raise ValueError(f'Data was stored with {name}, which is not installed.')
+
+
+def data_path(base_path: str, codec: Codec) -> str:
+    """Return where a codec stores data, given the path of the JSON file."""
+    return os.path.splitext(base_path)[0] + codec.extension
+
+
+def stored_paths(base_path: str) -> List[str]:
+    """Return every file data could be stored in with the installed codecs, newest first."""
+    paths = {data_path(base_path, codec) for codec in CODECS.values()}
+    existing = [i for i in paths if os.path.exists(i)]
+    return sorted(existing, key=os.path.getmtime, reverse=True)
+
+
+def encode_guilds(guilds: List['models.Guild']) -> Dict[str, Any]:
+    """Return the document storing every guild."""
+    return {'schema': SCHEMA_VERSION, 'guilds': [encode_guild(guild) for guild in guilds]}
+
+
+def encode_guild(guild: 'models.Guild') -> Dict[str, Any]:
+    """Return the record storing a guild, its teams and their tasks."""
+    return {'id': guild.disc_guild_obj.id,
+            'target_channel_id': guild.target_channel.id,
+            'receive_announcements': guild.receive_announcements,
+            'locale': guild.locale,
+            'tz_name': tz_utils.zone_name(guild.tz),
+            'teams': [encode_team(team) for team in guild.teams],
+            'control_roles': [control_role.serialize() for control_role in guild.control_roles]}
+
+
+def encode_team(team: 'models.Team') -> Dict[str, Any]:
+    """Return the record storing a team and its tasks."""
+    return {'role_id': team.role.id, 'notify': team.notify, 'feed_token': team.feed_token,
+            'next_task_id': team.next_task_id, 'tasks': encode_tasks(team.tasks)}
+
+
+def encode_tasks(tasks: List['models.Task']) -> Dict[str, Any]:
+    """Return tasks as columns. Only recurring tasks have their recurrence stored,
+    along with their index.
+    """
+
+    return {'id': [task.id for task in tasks],
+            'content': [task.content for task in tasks],
+            'tags': [task.tags for task in tasks],
+            'due': [int(task.due_datetime.timestamp()) for task in tasks],
+            'recurring': [[index, task.recurrence, int(task.series_start.timestamp())]
+                          for index, task in enumerate(tasks) if task.recurrence]}
+
+
+def reconcile_guilds(bot, guilds: List['models.Guild'], document: Any) -> List['models.Guild']:
+    """Bring guilds in memory in line with a stored document, changing only what differs,
+    and return them. Guilds, teams and tasks are matched by ID, so the ones kept go on
+    with the batch loops and notifications they already run.
+    """
+
+    # Imported here, since lifecycle imports data_management, which imports this module.
+    from . import lifecycle
+
+    live = {guild.disc_guild_obj.id: guild for guild in guilds}
+    reconciled = []
+
+    for record in stored_records(document):
+        if record['id'] in live and bot.get_guild(record['id']) is not None:
+            guild = live.pop(record['id'])
+            reconcile_guild(guild, record)
+        else:
+            guild = decode_guild(bot, record)
+
+        if guild is not None:
+            reconciled.append(guild)
+
+    # Guilds that are no longer stored, or that the bot left, stop running.
+    for guild in live.values():
+        lifecycle.close_guild(guild)
+
+    return reconciled
+
+
+def stored_records(document: Any) -> List[Dict[str, Any]]:
+    """Return the guild records in a document of any schema version, as current ones."""
+    # Stored before schema versions existed.
+    if isinstance(document, list):
+        return [upgrade_record(record) for record in document]
+
+    if document.get('schema', 0) > SCHEMA_VERSION:
+        raise ValueError(f'Data was stored with schema version {document["schema"]},'
+                         f' but only versions up to {SCHEMA_VERSION} can be read.')
+
+    return document['guilds']
+
+
+def upgrade_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a guild stored as a Guild.serialize dictionary as a current record."""
+    tz_name = record.get('tz_name')
+
+    if not tz_name:
+        tz_name = tz_utils.offset_name(record['tz_offset'] if record['tz_offset'] else -5)
+
+    tz = tz_utils.get_zone(tz_name)
+
+    return {'id': record['id'],
+            'target_channel_id': int(record['target_channel_id']),
+            'receive_announcements': record['receive_announcements'],
+            'locale': record['locale'],
+            'tz_name': tz_name,
+            'teams': [{'role_id': int(team['role_id']), 'notify': team['notify'],
+                       'feed_token': team.get('feed_token'),
+                       'next_task_id': team.get('next_task_id', 1),
+                       'tasks': upgrade_tasks(team['tasks'], tz)}
+                      for team in record['teams']],
+            'control_roles': record['control_roles']}
+
+
+def upgrade_tasks(tasks: List[Dict[str, Any]], tz) -> Dict[str, Any]:
+    """Return tasks stored as Task.serialize dictionaries as columns."""
+    def timestamp(string: str) -> int:
+        return int(models.Task.deserialize_datetime(string, tz).timestamp())
+
+    return {'id': [task.get('id') for task in tasks],
+            'content': [task['content'] for task in tasks],
+            'tags': [task['tags'] for task in tasks],
+            'due': [timestamp(task['due_datetime']) for task in tasks],
+            'recurring': [[index, task['recurrence'], timestamp(task['series_start'])]
+                          for index, task in enumerate(tasks) if 'series_start' in task]}
+
+
+def decode_guild(bot, record: Dict[str, Any]) -> Optional['models.Guild']:
+    """Return the guild a record stores, if the bot is still in it."""
+    disc_guild_obj = bot.get_guild(record['id'])
+
+    if disc_guild_obj is None:
+        return None
+
+    guild = models.Guild(disc_guild_obj=disc_guild_obj,
+                         target_channel=discord.utils.get(disc_guild_obj.channels,
+                                                          id=record['target_channel_id']),
+                         receive_announcements=record['receive_announcements'],
+                         locale=record['locale'],
+                         tz_name=record['tz_name'])
+
+    for team_record in record['teams']:
+        decode_team(guild, team_record)
+
+    decode_control_roles(guild, record['control_roles'])
+    return guild
+
+
+def reconcile_guild(guild: 'models.Guild', record: Dict[str, Any]):
+    """Bring a guild in memory in line with the record storing it."""
+    # Imported here, like in reconcile_guilds.
+    from . import lifecycle
+
+    target_channel = discord.utils.get(guild.disc_guild_obj.channels,
+                                       id=record['target_channel_id'])
+
+    if target_channel is not None:
+        guild.target_channel = target_channel
+
+    guild.receive_announcements = record['receive_announcements']
+    guild.locale = record['locale']
+
+    if record['tz_name'] != tz_utils.zone_name(guild.tz):
+        guild.tz = tz_utils.get_zone(record['tz_name'])
+
+    teams = {team.role.id: team for team in guild.teams}
+
+    for team_record in record['teams']:
+        if team_record['role_id'] in teams:
+            reconcile_team(teams.pop(team_record['role_id']), team_record)
+        else:
+            decode_team(guild, team_record)
+
+    for team in teams.values():
+        guild.teams.remove(team)
+        lifecycle.close_team(team)
+
+    decode_control_roles(guild, record['control_roles'])
+
+
+def decode_team(guild: 'models.Guild', record: Dict[str, Any]) -> Optional['models.Team']:
+    """Add the team a record stores to its guild and return it, if its role still exists."""
+    role = discord.utils.get(guild.disc_guild_obj.roles, id=record['role_id'])
+
+    # Drop teams whose roles were deleted while the bot was offline.
+    if role is None:
+        return None
+
+    team = models.Team(role=role, notify=record['notify'], feed_token=record['feed_token'],
+                       next_task_id=record.get('next_task_id', 1))
+    guild.add_team(team)
+
+    for task in decode_tasks(record['tasks'], guild.tz):
+        team.add_task(task)
+
+    return team
+
+
+def reconcile_team(team: 'models.Team', record: Dict[str, Any]):
+    """Bring a team in memory in line with the record storing it. Tasks that are
+    still stored keep their notifications, unless their due datetime changed.
+    """
+
+    team.notify = record['notify']
+
+    # Teams stored before calendar feeds existed keep the token they were given on load.
+    if record['feed_token']:
+        team.feed_token = record['feed_token']
+
+    # IDs handed out since the record was stored are never handed out again.
+    team.next_task_id = max(team.next_task_id, record.get('next_task_id', 1))
+
+    tasks = {task.id: task for task in team.tasks}
+    now = clock.now(team.guild.tz)
+
+    # Tasks stored before IDs existed can't be matched, so they're added anew.
+    for stored in decode_tasks(record['tasks'], team.guild.tz):
+        task = tasks.pop(stored.id, None) if stored.id is not None else None
+
+        if task is None:
+            team.add_task(stored)
+        else:
+            reconcile_task(task, stored, now)
+
+    for task in tasks.values():
+        team.del_task(task)
+
+
+def reconcile_task(task: 'models.Task', stored: 'models.Task', now: datetime):
+    """Bring a task in memory in line with the one stored, rescheduling its notifications
+    only if when it's due changed.
+    """
+
+    # Recurring tasks skip occurrences missed since they were stored, like on load.
+    if stored.recurrence and stored.due_datetime < now:
+        stored.due_datetime = stored.next_occurrence(now)
+
+    if stored.content != task.content:
+        task.team.set_task_content(task, stored.content)
+
+    if stored.tags != task.tags:
+        task.tags = stored.tags
+        task.touch()
+
+    # Stored datetimes are only precise to the second.
+    def schedule(task_: 'models.Task') -> tuple:
+        return (int(task_.due_datetime.timestamp()), task_.recurrence,
+                int(task_.series_start.timestamp()))
+
+    if schedule(stored) != schedule(task):
+        task.due_datetime = stored.due_datetime
+        task.recurrence = stored.recurrence
+        task.series_start = stored.series_start
+        task.touch()
+        task.schedule()
+
+
+def decode_control_roles(guild: 'models.Guild', records: List[Dict[str, Any]]):
+    """Replace a guild's control roles with the ones stored, leaving out deleted roles."""
+    guild.control_roles = []
+    guild.control_roles = list(filter(lambda x: x.role is not None,
+                                      [models.ControlRole.deserialize(guild, control_role)
+                                       for control_role in records]))
+
+
+def decode_tasks(columns: Dict[str, Any], tz) -> List['models.Task']:
+    """Return the tasks stored in columns, due in a timezone. Adding them to a team
+    is up to the caller.
+    """
+
+    fromtimestamp = datetime.fromtimestamp
+    tasks = [models.Task(content, tags, fromtimestamp(due, tz))
+             for content, tags, due in zip(columns['content'], columns['tags'], columns['due'])]
+
+    # Tasks stored before IDs existed get one when they're added to their team.
+    for task, id_ in zip(tasks, columns.get('id', [])):
+        task.id = id_
+
+    for index, recurrence, series_start in columns['recurring']:
+        tasks[index].recurrence = recurrence
+        tasks[index].series_start = fromtimestamp(series_start, tz)
+
+    return tasks
+
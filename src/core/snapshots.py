@@ -0,0 +1,142 @@
+"""Write stored data as compressed snapshots, one frame per guild.
+
+A snapshot starts with MAGIC and is followed by every guild's frame: its record,
+encoded by a serialization codec and then compressed on its own. An index of
+where each frame starts closes the file, followed by the index's length and MAGIC again.
+Guilds are encoded and written one at a time, so saving never holds more than one
+guild's data, and any single guild can be read without decompressing the others.
+"""
+
+import gzip
+import json
+import os
+import struct
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+sys.path.append('..')
+from . import hidden, models, serialization
+
+MAGIC = b'IVONESNP'
+# The index's length in bytes, followed by MAGIC.
+TRAILER = struct.Struct('<Q')
+
+# Map compression names to functions that compress and decompress bytes.
+COMPRESSORS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    'gzip': (lambda data: gzip.compress(data, compresslevel=6), gzip.decompress),
+}
+
+# Zstandard compresses about as well as gzip, several times faster, when installed.
+try:
+    import zstandard
+
+    COMPRESSORS['zstd'] = (zstandard.ZstdCompressor(level=3).compress,
+                           zstandard.ZstdDecompressor().decompress)
+
+except ImportError:
+    pass
+
+# In order of preference.
+PREFERRED_COMPRESSORS = ['zstd', 'gzip']
+
+
+def get_compression(name: str = None) -> str:
+    """Return the name of a compression if it's installed, or the one set as COMPRESSION
+    in hidden.py, or the fastest one installed.
+    """
+
+    name = name or getattr(hidden, 'COMPRESSION', None)
+
+    if name is not None:
+        if name in COMPRESSORS:
+            return name
+
+        print(f'Compression {name} is not installed. Falling back to the fastest one that is.')
+
+    return next(i for i in PREFERRED_COMPRESSORS if i in COMPRESSORS)
+
+
+def write(path: str, guilds: Iterable['models.Guild'], codec: serialization.Codec = None,
+          compression: str = None):
+    """Write a snapshot of every guild, guild by guild.
+    The previous snapshot is only replaced once the new one is complete.
+    """
+
+    codec = codec or serialization.get_codec()
+    compression = get_compression(compression)
+    compress = COMPRESSORS[compression][0]
+    entries = []
+    temporary_path = f'{path}.tmp'
+
+    with open(temporary_path, 'wb') as fp:
+        fp.write(MAGIC)
+
+        for guild in guilds:
+            frame = compress(codec.dumps(serialization.encode_guild(guild)))
+            entries.append([guild.disc_guild_obj.id, fp.tell(), len(frame)])
+            fp.write(frame)
+
+        # The index is always JSON, so it can be read before knowing the codec.
+        index = json.dumps({'schema': serialization.SCHEMA_VERSION, 'codec': codec.name,
+                            'compression': compression, 'guilds': entries}).encode()
+        fp.write(index)
+        fp.write(TRAILER.pack(len(index)))
+        fp.write(MAGIC)
+        fp.flush()
+        os.fsync(fp.fileno())
+
+    os.replace(temporary_path, path)
+
+
+def read_index(fp) -> Dict[str, Any]:
+    """Return the index of an open snapshot."""
+    fp.seek(-(TRAILER.size + len(MAGIC)), os.SEEK_END)
+    (length,) = TRAILER.unpack(fp.read(TRAILER.size))
+
+    if fp.read(len(MAGIC)) != MAGIC:
+        raise ValueError('The snapshot is incomplete.')
+
+    fp.seek(-(length + TRAILER.size + len(MAGIC)), os.SEEK_END)
+    return json.loads(fp.read(length))
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Lazily read every guild record in a snapshot, in the order they were written."""
+    with open(path, 'rb') as fp:
+        index = read_index(fp)
+        loads, decompress = _decoders(index)
+
+        for _, offset, length in index['guilds']:
+            fp.seek(offset)
+            yield loads(decompress(fp.read(length)))
+
+
+def read_record(path: str, guild_id: int) -> Optional[Dict[str, Any]]:
+    """Read a single guild's record from a snapshot, if it has one."""
+    with open(path, 'rb') as fp:
+        index = read_index(fp)
+        entry = next((i for i in index['guilds'] if i[0] == guild_id), None)
+
+        if entry is None:
+            return None
+
+        loads, decompress = _decoders(index)
+        fp.seek(entry[1])
+        return loads(decompress(fp.read(entry[2])))
+
+
+def read(path: str) -> Dict[str, Any]:
+    """Read a snapshot into a document serialization.reconcile_guilds takes."""
+    with open(path, 'rb') as fp:
+        schema = read_index(fp)['schema']
+
+    return {'schema': schema, 'guilds': list(iter_records(path))}
+
+
+def _decoders(index: Dict[str, Any]) -> Tuple[Callable[[bytes], Any], Callable[[bytes], bytes]]:
+    if index['compression'] not in COMPRESSORS:
+        raise ValueError(f'The snapshot is compressed with {index["compression"]},'
+                         f' which is not installed.')
+
+    codec = serialization.codec_for_name(index['codec'])
+    return codec.loads, COMPRESSORS[index['compression']][1]
@@ -0,0 +1,407 @@
+"""Import and export tasks in bulk as CSV or iCalendar files."""
+
+import codecs
+import csv
+import io
+import sys
+import tempfile
+import urllib.parse
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+
+sys.path.append('..')
+from . import checks, models
+from .metrics import metrics
+from utils import clock, dt_utils, tz_utils
+from utils.dt_utils import DATE_FORMATS, TIME_FORMATS
+
+# Files are only downloaded from where Discord serves attachments,
+# so users can't make the bot request anything else, like hosts on its own network.
+ATTACHMENT_HOSTS = {'cdn.discordapp.com', 'media.discordapp.net'}
+# Files bigger than this are rejected while downloading. Matches Discord's attachment limit.
+MAX_FILE_BYTES = 8 * 1024 * 1024
+# Beyond this, files are buffered on disk instead of in memory.
+SPOOL_BYTES = 256 * 1024
+MAX_TASKS = 1000
+# How many invalid rows to list before giving up on listing them.
+MAX_REPORTED_ERRORS = 10
+CHUNK_BYTES = 64 * 1024
+
+CSV_COLUMNS = ['content', 'due_date', 'due_time', 'tags', 'repeat']
+# Map iCalendar recurrence frequencies to task recurrences.
+ICS_FREQUENCIES = {'DAILY': 'daily', 'WEEKLY': 'weekly', 'MONTHLY': 'monthly'}
+ICS_DT_FMT = '%Y%m%dT%H%M%S'
+ICS_DATE_FMT = '%Y%m%d'
+
+
+def is_attachment_url(url: str) -> bool:
+    """Return whether a URL points to a file sent on Discord."""
+    try:
+        parsed = urllib.parse.urlsplit(url)
+        return (parsed.scheme == 'https' and parsed.hostname in ATTACHMENT_HOSTS
+                and parsed.port in (None, 443))
+
+    except ValueError:
+        return False
+
+
+async def download(url: str) -> IO[bytes]:
+    """Stream a file sent on Discord into a temporary file, which spills to disk if it's big."""
+    if not is_attachment_url(url):
+        raise checks.InvalidImportError(['Only files sent on Discord can be imported.'])
+
+    fp = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    size = 0
+
+    try:
+        # Redirects could lead anywhere, so they're treated as failures.
+        async with aiohttp.ClientSession() as session, \
+                session.get(url, allow_redirects=False) as response:
+            if response.status != 200:
+                raise checks.InvalidImportError([f'The file could not be downloaded'
+                                                 f' (HTTP {response.status}).'])
+
+            async for chunk in response.content.iter_chunked(CHUNK_BYTES):
+                size += len(chunk)
+
+                if size > MAX_FILE_BYTES:
+                    raise checks.InvalidImportError([f'The file is bigger than'
+                                                     f' {MAX_FILE_BYTES // (1024 * 1024)} MB.'])
+
+                fp.write(chunk)
+
+    except aiohttp.ClientError:
+        fp.close()
+        raise checks.InvalidImportError(['The file could not be downloaded.'])
+
+    except checks.InvalidImportError:
+        fp.close()
+        raise
+
+    fp.seek(0)
+    return fp
+
+
+def read_csv(fp: IO[bytes]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Lazily read rows from a CSV file along with their line numbers.
+    A header is expected. Columns other than CSV_COLUMNS are ignored.
+    """
+
+    reader = csv.DictReader(codecs.getreader('utf-8-sig')(fp))
+
+    for row in reader:
+        yield reader.line_num, {column: (row.get(column) or '').strip()
+                                for column in CSV_COLUMNS}
+
+
+def read_ics(fp: IO[bytes]) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Lazily read events from an iCalendar file as rows shaped like CSV ones.
+    Only what tasks can represent is read: summary, start, categories and frequency.
+    """
+
+    event = None
+    start_line = 0
+
+    for line_num, name, params, value in _unfolded_ics_lines(fp):
+        if name == 'BEGIN' and value == 'VEVENT':
+            event, start_line = {column: '' for column in CSV_COLUMNS}, line_num
+            # Tells validation to expect iCalendar dates.
+            event['ics'] = 'yes'
+
+        elif event is None:
+            continue
+
+        elif name == 'END' and value == 'VEVENT':
+            yield start_line, event
+            event = None
+
+        elif name == 'SUMMARY':
+            event['content'] = _unescape_ics(value)
+
+        elif name == 'DTSTART':
+            # Times are taken as local to the guild unless they're in UTC or name their zone.
+            event['due_date'] = value
+            event['tzid'] = params.get('TZID', '').strip('"')
+
+        elif name == 'CATEGORIES':
+            event['tags'] = ';'.join(_unescape_ics(i) for i in value.split(','))
+
+        elif name == 'RRULE':
+            rule = dict(i.split('=', 1) for i in value.split(';') if '=' in i)
+            event['repeat'] = ICS_FREQUENCIES.get(rule.get('FREQ'), rule.get('FREQ', ''))
+
+
+def _unfolded_ics_lines(fp: IO[bytes]) -> Iterator[Tuple[int, str, Dict[str, str], str]]:
+    """Join folded iCalendar lines and split them into name, parameters and value."""
+    pending, pending_num = None, 0
+
+    for line_num, line in enumerate(codecs.getreader('utf-8-sig')(fp), start=1):
+        line = line.rstrip('\r\n')
+
+        # Lines starting with whitespace continue the previous one.
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending += line[1:]
+            continue
+
+        if pending:
+            yield (pending_num, *_split_ics_line(pending))
+
+        pending, pending_num = line, line_num
+
+    if pending:
+        yield (pending_num, *_split_ics_line(pending))
+
+
+def _split_ics_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    head, _, value = line.partition(':')
+    name, *params = head.split(';')
+    return (name.upper(),
+            dict(i.split('=', 1) for i in params if '=' in i),
+            value.strip())
+
+
+def _unescape_ics(value: str) -> str:
+    return (value.replace('\\n', ' ').replace('\\N', ' ')
+            .replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\'))
+
+
+def _escape_ics(value: str) -> str:
+    return (value.replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def validate(team: 'models.Team', rows: Iterator[Tuple[int, Dict[str, str]]],
+             default_due_time: str) -> List['models.Task']:
+    """Turn rows into tasks in a single pass, or fail listing every invalid row.
+    Nothing is added to the team.
+    """
+
+    guild = team.guild
+    date_format = DATE_FORMATS[guild.locale] + '/%Y'
+    time_format = TIME_FORMATS[guild.locale]
+    default_time = datetime.strptime(default_due_time, '%H:%M').time()
+    now = dt_utils.now(guild.tz)
+
+    parsed = []
+    errors = []
+
+    for line_num, row in rows:
+        if len(parsed) + len(errors) >= MAX_TASKS:
+            errors.append(f'Only up to {MAX_TASKS} tasks can be imported at once.')
+            break
+
+        try:
+            parsed.append(_parse_row(row, guild.tz, date_format, time_format, default_time, now))
+
+        except ValueError as error:
+            errors.append(f'Line {line_num}: {error}')
+
+    if errors:
+        hidden = len(errors) - MAX_REPORTED_ERRORS
+
+        if hidden > 0:
+            errors = errors[:MAX_REPORTED_ERRORS] + [f'...and {hidden} more.']
+
+        raise checks.InvalidImportError(errors)
+
+    if not parsed:
+        raise checks.InvalidImportError(['The file has no tasks.'])
+
+    # Adapt the spelling of every distinct tag at once rather than once per task.
+    raw_tags = list({tag for _, _, tags, _ in parsed for tag in tags})
+    adapted_tags = dict(zip(raw_tags, team.search_for_tags(raw_tags)))
+
+    return [models.Task(content, [adapted_tags[tag] for tag in tags], due_datetime,
+                        recurrence=recurrence)
+            for content, due_datetime, tags, recurrence in parsed]
+
+
+def _parse_row(row: Dict[str, str], tz: timezone, date_format: str, time_format: str,
+               default_time, now: datetime) -> Tuple[str, datetime, List[str], Optional[str]]:
+    if not row['content']:
+        raise ValueError('the task has no content.')
+
+    if row.get('ics'):
+        due_datetime = _parse_ics_datetime(row['due_date'], tz, default_time, row.get('tzid'))
+
+    else:
+        try:
+            due_date = datetime.strptime(row['due_date'], date_format).date()
+        except ValueError:
+            raise ValueError(f'"{row["due_date"]}" is not a date like'
+                             f' {now.strftime(date_format)}.')
+
+        try:
+            due_time = (datetime.strptime(row['due_time'].upper(), time_format).time()
+                        if row['due_time'] else default_time)
+        except ValueError:
+            raise ValueError(f'"{row["due_time"]}" is not a time like'
+                             f' {now.strftime(time_format)}.')
+
+        due_datetime = datetime.combine(due_date, due_time).replace(tzinfo=tz)
+
+    recurrence = row['repeat'].lower() or None
+
+    if recurrence is not None and recurrence not in models.Task.RECURRENCES:
+        raise ValueError(f'"{row["repeat"]}" is not daily, weekly or monthly.')
+
+    # Recurring tasks move on to their next occurrence instead.
+    if due_datetime < now and recurrence is None:
+        raise ValueError(f'{due_datetime.strftime(date_format)} has already passed.')
+
+    tags = [i.rstrip(' .') for i in row['tags'].split(';') if i.strip()]
+    return row['content'], due_datetime, tags, recurrence
+
+
+def _parse_ics_datetime(value: str, tz: timezone, default_time,
+                        tzid: str = None) -> datetime:
+    try:
+        # All-day events are due by the default due time.
+        if len(value) == len('YYYYMMDD'):
+            return datetime.combine(datetime.strptime(value, ICS_DATE_FMT).date(),
+                                    default_time).replace(tzinfo=tz)
+
+        # Times in UTC end in Z. Those without it are taken as local to the guild.
+        if value.endswith('Z'):
+            return (datetime.strptime(value[:-1], ICS_DT_FMT)
+                    .replace(tzinfo=timezone.utc).astimezone(tz))
+
+        local = datetime.strptime(value, ICS_DT_FMT)
+
+    except ValueError:
+        raise ValueError(f'"{value}" is not an iCalendar date.')
+
+    # Zones the bot doesn't know fall back to the guild's, like times without one.
+    try:
+        zone = tz_utils.get_zone(tzid) if tzid else tz
+    except ValueError:
+        zone = tz
+
+    return local.replace(tzinfo=zone).astimezone(tz)
+
+
+def import_tasks(team: 'models.Team', fp: IO[bytes], file_format: str,
+                 default_due_time: str) -> List['models.Task']:
+    """Validate a whole file and only then add every task in it to the team."""
+    with metrics.timer('ivone_operation_seconds', operation='import_tasks'):
+        rows = read_ics(fp) if file_format == 'ics' else read_csv(fp)
+
+        try:
+            tasks = validate(team, rows, default_due_time)
+        except (UnicodeDecodeError, csv.Error):
+            raise checks.InvalidImportError(['The file is not valid UTF-8 text'
+                                             ' in the selected format.'])
+
+        for task in tasks:
+            team.add_task(task)
+
+        return tasks
+
+
+def export_tasks(team: 'models.Team', file_format: str) -> IO[bytes]:
+    """Write a team's tasks to a temporary file, a task at a time, and rewind it."""
+    fp = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    text = io.TextIOWrapper(fp, encoding='utf-8', newline='')
+
+    with metrics.timer('ivone_operation_seconds', operation='export_tasks'):
+        if file_format == 'ics':
+            write_ics(team, text)
+        else:
+            _write_csv(team, text)
+
+        # Hand the underlying file over without closing it.
+        text.flush()
+        text.detach()
+
+    fp.seek(0)
+    return fp
+
+
+def _write_csv(team: 'models.Team', text: IO[str]):
+    date_format = DATE_FORMATS[team.guild.locale] + '/%Y'
+    time_format = TIME_FORMATS[team.guild.locale]
+    writer = csv.writer(text)
+    writer.writerow(CSV_COLUMNS)
+
+    # Recurring tasks are written from the start of their series, so monthly ones keep their day.
+    for task in team.tasks:
+        writer.writerow([task.content,
+                         task.series_start.strftime(date_format),
+                         task.series_start.strftime(time_format),
+                         ';'.join(task.tags),
+                         task.recurrence or ''])
+
+
+def write_ics(team: 'models.Team', text: IO[str]):
+    """Write a team's tasks as an iCalendar file.
+    Recurring tasks start at a local time in the guild's zone, which is described along
+    with them, so calendars keep their occurrences at the same time of day across
+    daylight saving transitions, like the bot does.
+    """
+
+    # iCalendar lines end in CRLF.
+    text.write('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Ivone//Tasks//EN\r\n')
+    stamp = clock.now(timezone.utc).strftime(ICS_DT_FMT) + 'Z'
+    tz = team.guild.tz
+    tzid = tz_utils.zone_name(tz)
+
+    if any(task.recurrence for task in team.tasks):
+        text.write('\r\n'.join(_vtimezone_lines(tz)) + '\r\n')
+
+    for task in team.tasks:
+        # Tasks take no time. They're events starting when they're due.
+        if task.recurrence:
+            start = (f'DTSTART;TZID={tzid}:'
+                     f'{task.series_start.astimezone(tz).strftime(ICS_DT_FMT)}')
+        else:
+            start = f'DTSTART:{task.series_start.astimezone(timezone.utc).strftime(ICS_DT_FMT)}Z'
+
+        # Task IDs never change or get reused, so calendars update events in place.
+        lines = ['BEGIN:VEVENT',
+                 f'UID:{team.role.id}-{task.id}@ivone',
+                 f'DTSTAMP:{stamp}',
+                 start,
+                 f'SUMMARY:{_escape_ics(task.content)}']
+
+        if task.tags:
+            lines.append('CATEGORIES:' + ','.join(_escape_ics(i) for i in task.tags))
+
+        if task.recurrence:
+            lines.append(f'RRULE:FREQ={task.recurrence.upper()}')
+
+        lines.append('END:VEVENT')
+        text.write('\r\n'.join(lines) + '\r\n')
+
+    text.write('END:VCALENDAR\r\n')
+
+
+def _vtimezone_lines(tz: tzinfo) -> List[str]:
+    """Describe a zone's offsets over the years its transition table covers.
+    Each transition is listed on its own, in the local time it happens at.
+    """
+
+    table = tz_utils.transition_table(tz)
+    lines = ['BEGIN:VTIMEZONE', f'TZID:{tz_utils.zone_name(tz)}',
+             # The offset before the first transition applies to everything before it.
+             *_observance_lines('STANDARD', datetime(1970, 1, 1), table.offsets[0],
+                                table.offsets[0])]
+
+    for instant, before, after in zip(table.instants, table.offsets, table.offsets[1:]):
+        kind = 'DAYLIGHT' if instant.astimezone(tz).dst() else 'STANDARD'
+        lines += _observance_lines(kind, (instant + before).replace(tzinfo=None), before, after)
+
+    return lines + ['END:VTIMEZONE']
+
+
+def _observance_lines(kind: str, start: datetime, offset_from: timedelta,
+                      offset_to: timedelta) -> List[str]:
+    return [f'BEGIN:{kind}', f'DTSTART:{start.strftime(ICS_DT_FMT)}',
+            f'TZOFFSETFROM:{_ics_offset(offset_from)}', f'TZOFFSETTO:{_ics_offset(offset_to)}',
+            f'END:{kind}']
+
+
+def _ics_offset(offset: timedelta) -> str:
+    minutes = int(offset.total_seconds()) // 60
+    return f'{"-" if minutes < 0 else "+"}{abs(minutes) // 60:02}{abs(minutes) % 60:02}'
@@ -12,6 +12,12 @@
 # -------------------------------------------------------------------------------------------------
 
 from core import bot, hidden
+from core.data_management import data_manager
+from core.feed_server import feed_server
 
 if __name__ == '__main__':
+    # Read stored data while the bot logs in, instead of waiting for it to be ready.
+    data_manager.preload_data()
+    # Only serves calendar feeds if hidden.FEED_SERVER_PORT is set.
+    bot.bot.loop.create_task(feed_server.start())
     bot.bot.run(hidden.TOKEN)
\ No newline at end of file
@@ -0,0 +1,141 @@
+"""Tell the time and wait for it, on the system clock or a simulated one.
+
+Everything that schedules work by date and time goes through the current clock,
+so swapping in a SimulatedClock runs days of notifications in moments.
+"""
+
+import asyncio
+import heapq
+import itertools
+from datetime import datetime, timezone, timedelta, tzinfo
+from typing import Any, Awaitable, List, Tuple
+
+
+class SystemClock:
+    """Read the system clock and wait on the event loop."""
+
+    def now(self, tz: tzinfo = timezone.utc) -> datetime:
+        """Return the current datetime in a timezone."""
+        return datetime.now(tz)
+
+    async def sleep(self, seconds: float):
+        """Wait for a number of seconds."""
+        await asyncio.sleep(seconds)
+
+    async def wait_for(self, awaitable: Awaitable, timeout: float) -> Any:
+        """Wait for an awaitable, raising asyncio.TimeoutError if it takes too long."""
+        return await asyncio.wait_for(awaitable, timeout)
+
+
+class SimulatedClock:
+    """Keep a time that only moves when advanced.
+    Sleepers wake up in order as it passes them, and no real time goes by.
+    """
+
+    # How many times the event loop gets to run between sleepers waking up and time moving on,
+    # so whatever they wake up to do, like scheduling the next notification, gets done.
+    SETTLE_YIELDS = 10
+
+    def __init__(self, start: datetime = None):
+        self._now = (start or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        self._sleepers: List[Tuple[datetime, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def now(self, tz: tzinfo = timezone.utc) -> datetime:
+        """Return the simulated datetime in a timezone."""
+        return self._now.astimezone(tz)
+
+    @property
+    def sleepers(self) -> int:
+        """Return how many coroutines are waiting for time to pass."""
+        return sum(1 for *_, future in self._sleepers if not future.done())
+
+    async def sleep(self, seconds: float):
+        """Wait until the simulated time is a number of seconds later than now."""
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._now + timedelta(seconds=seconds),
+                                        next(self._sequence), future))
+        await future
+
+    async def wait_for(self, awaitable: Awaitable, timeout: float) -> Any:
+        """Wait for an awaitable, raising asyncio.TimeoutError if simulated time runs out first."""
+        task = asyncio.ensure_future(awaitable)
+        timer = asyncio.ensure_future(self.sleep(timeout))
+
+        try:
+            await asyncio.wait({task, timer}, return_when=asyncio.FIRST_COMPLETED)
+
+        # Like asyncio.wait_for, stop waiting on the awaitable too.
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        finally:
+            timer.cancel()
+
+        if task.done():
+            return task.result()
+
+        task.cancel()
+        raise asyncio.TimeoutError
+
+    async def advance(self, seconds: float):
+        """Move time forward, waking every sleeper it passes at the time it asked for."""
+        stop = self._now + timedelta(seconds=seconds)
+        # Whatever was started since time last moved gets to start waiting first.
+        await SimulatedClock._settle()
+
+        while self._sleepers and self._sleepers[0][0] <= stop:
+            self._now = max(self._now, self._sleepers[0][0])
+
+            # Wake everyone due at once, then let them run before moving on.
+            while self._sleepers and self._sleepers[0][0] <= self._now:
+                future = heapq.heappop(self._sleepers)[2]
+
+                if not future.done():
+                    future.set_result(None)
+
+            await SimulatedClock._settle()
+
+        self._now = stop
+
+    @staticmethod
+    async def _settle():
+        for _ in range(SimulatedClock.SETTLE_YIELDS):
+            await asyncio.sleep(0)
+
+
+_clock = SystemClock()
+
+
+def get_clock():
+    """Return the clock in use."""
+    return _clock
+
+
+def set_clock(clock):
+    """Use a clock for everything scheduled from now on."""
+    global _clock
+    _clock = clock
+
+
+def now(tz: tzinfo = timezone.utc) -> datetime:
+    """Return the current datetime in a timezone, according to the clock in use."""
+    return _clock.now(tz)
+
+
+async def sleep(seconds: float):
+    """Wait for a number of seconds on the clock in use."""
+    await _clock.sleep(seconds)
+
+
+async def wait_for(awaitable: Awaitable, timeout: float) -> Any:
+    """Wait for an awaitable on the clock in use, raising asyncio.TimeoutError
+    if it takes too long.
+    """
+
+    return await _clock.wait_for(awaitable, timeout)
@@ -1,35 +1,138 @@
 """Store helper functions related to date and time."""
 
+import calendar
+import contextvars
 import datetime as dt
+import functools
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
+from typing import Iterator, Optional
+
+from utils import clock
 
 DATE_FORMATS = {'en-US': '%m/%d', 'other': '%d/%m'}
 # Correspond to 12h + AM/PM and 24h, respectively.
 TIME_FORMATS = {'en-US': '%I:%M %p', 'other': '%H:%M'}
+# By distance in days from today.
+RELATIVE_DATE_NAMES = {-1: 'yesterday', 0: 'today', 1: 'tomorrow'}
+# How many rendered labels to keep. Stale days are never hit again and age out.
+LABEL_CACHE_SIZE = 4096
+# Map recurrence rules to the length of their period in days. Months vary in length.
+RECURRENCES = {'daily': 1, 'weekly': 7, 'monthly': None}
 
+# When set, the moment the current command started at, in UTC.
+# Everything a command renders then agrees on what "now" is, without reading the clock again.
+_now_snapshot: contextvars.ContextVar[Optional[datetime]] = contextvars.ContextVar(
+    'now_snapshot', default=None)
 
-def date_to_relative_name(date: dt.date, tz: timezone, locale: str) -> str:
-    """Return the relative name of a given date, if possible."""
-    today = datetime.now(tz).date()
-    relative_date_names = {today - timedelta(days=1): 'yesterday',
-                           today: 'today',
-                           today + timedelta(days=1): 'tomorrow'}
 
-    if date in relative_date_names:
-        return relative_date_names[date]
+def now(tz: timezone) -> datetime:
+    """Return the current datetime in a timezone, from the snapshot if one is taken."""
+    snapshot = _now_snapshot.get()
+
+    if snapshot is None:
+        return clock.now(tz)
+
+    return snapshot.astimezone(tz)
 
-    return format_date(date, tz, locale)
+
+@contextmanager
+def now_snapshot() -> Iterator[None]:
+    """Freeze "now" for the enclosed block and every task it awaits."""
+    token = _now_snapshot.set(clock.now(timezone.utc))
+
+    try:
+        yield
+    finally:
+        _now_snapshot.reset(token)
+
+
+def forget_snapshot():
+    """Read the clock again from here on in the current task.
+    Tasks started during a command inherit its snapshot, and ones that outlive it must drop it.
+    """
+
+    _now_snapshot.set(None)
+
+
+def date_to_relative_name(date: dt.date, tz: timezone, locale: str) -> str:
+    """Return the relative name of a given date, if possible."""
+    now_ = now(tz)
+    return _relative_name(date, now_.utcoffset(), locale, now_.date())
 
 
 def format_date(date: dt.date, tz: timezone, locale: str) -> str:
     """Format a date into a user-readable and context-aware representation."""
-    if date.year == datetime.now(tz).year:
+    return _formatted_date(date, locale, now(tz).year)
+
+
+def format_time(datetime_: datetime, locale: str) -> str:
+    """Format the time of day of a datetime for user viewing."""
+    return _formatted_time(datetime_.time(), locale)
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _relative_name(date: dt.date, offset: timedelta, locale: str, today: dt.date) -> str:
+    # The offset is part of the key so labels are never shared across timezones,
+    # and the local day is so they roll over at each timezone's midnight.
+    days = (date - today).days
+
+    if days in RELATIVE_DATE_NAMES:
+        return RELATIVE_DATE_NAMES[days]
+
+    return _formatted_date(date, locale, today.year)
+
+
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _formatted_date(date: dt.date, locale: str, current_year: int) -> str:
+    if date.year == current_year:
         return date.strftime(DATE_FORMATS[locale])
 
     # Only show year info if it's different from the current one.
     return date.strftime(DATE_FORMATS[locale] + '/%Y')
 
 
+@functools.lru_cache(maxsize=LABEL_CACHE_SIZE)
+def _formatted_time(time: dt.time, locale: str) -> str:
+    return time.strftime(TIME_FORMATS[locale])
+
+
+def add_months(datetime_: datetime, months: int) -> datetime:
+    """Add months to a datetime, clamping its day to the length of the resulting month."""
+    month_index = datetime_.month - 1 + months
+    year, month = datetime_.year + month_index // 12, month_index % 12 + 1
+    day = min(datetime_.day, calendar.monthrange(year, month)[1])
+    return datetime_.replace(year=year, month=month, day=day)
+
+
+def occurrence(series_start: datetime, recurrence: str, index: int) -> datetime:
+    """Return the nth occurrence of a recurring series, counting from its start."""
+    if recurrence == 'monthly':
+        return add_months(series_start, index)
+
+    return series_start + timedelta(days=index * RECURRENCES[recurrence])
+
+
+def next_occurrence(series_start: datetime, recurrence: str, after: datetime) -> datetime:
+    """Return the first occurrence of a recurring series due after a datetime.
+    Takes the same time no matter how long the series has been running.
+    """
+
+    if after < series_start:
+        return series_start
+
+    # Estimate the index of the last occurrence due by then. It's never too high.
+    if recurrence == 'monthly':
+        index = (after.year - series_start.year) * 12 + after.month - series_start.month
+    else:
+        index = (after - series_start) // timedelta(days=RECURRENCES[recurrence])
+
+    while occurrence(series_start, recurrence, index) <= after:
+        index += 1
+
+    return occurrence(series_start, recurrence, index)
+
+
 def string_to_date(date: str, tz: timezone, fmt) -> dt.date:
     """Convert a string to a date. If year is needed but not specified by the user,
     the current one is used.
@@ -39,6 +142,6 @@ def string_to_date(date: str, tz: timezone, fmt) -> dt.date:
         return datetime.strptime(date, fmt).date()
 
     except ValueError:
-        date += datetime.strftime(datetime.now(tz), '/%Y')
+        date += datetime.strftime(now(tz), '/%Y')
         output = datetime.strptime(date, fmt).date()
         return output
@@ -0,0 +1,197 @@
+"""Store helper functions related to timezones and their daylight saving transitions."""
+
+import bisect
+import datetime as dt
+import functools
+import re
+import zoneinfo
+from datetime import datetime, timezone, timedelta, tzinfo
+from typing import List, Optional
+
+from utils import clock
+
+# Transitions are precomputed this many years ahead of the current one.
+TABLE_YEARS = 5
+# Matches offsets from UTC like "-5", "+5.5", "-09:30" or "UTC-3".
+OFFSET_PATTERN = re.compile(r'^(?:UTC|GMT)?\s*([+-]?)(\d{1,2})(?:([.:])(\d{1,2}))?$',
+                            re.IGNORECASE)
+
+
+def parse_offset(name: str) -> Optional[float]:
+    """Return the offset from UTC, in hours, a string stands for, if it's an offset."""
+    match = OFFSET_PATTERN.match(name.strip())
+
+    if match is None:
+        return None
+
+    sign, hours, separator, fraction = match.groups()
+    offset = int(hours)
+
+    if separator == ':':
+        offset += int(fraction) / 60
+    elif separator == '.':
+        offset += float(f'0.{fraction}')
+
+    return -offset if sign == '-' else offset
+
+
+def offset_name(offset: float) -> str:
+    """Return the canonical name of a fixed offset from UTC."""
+    return f'UTC{offset:+g}'
+
+
+@functools.lru_cache(maxsize=None)
+def get_zone(name: str) -> tzinfo:
+    """Return the timezone for an IANA zone name, like "America/New_York",
+    or an offset from UTC, like "-5". Raise ValueError if it's neither.
+    """
+
+    offset = parse_offset(name)
+
+    if offset is not None:
+        if not -24 < offset < 24:
+            raise ValueError(f'Offset out of range: {name}')
+
+        return timezone(timedelta(hours=offset), offset_name(offset))
+
+    try:
+        return zoneinfo.ZoneInfo(name)
+
+    except (zoneinfo.ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f'Unknown timezone: {name}')
+
+
+def zone_name(tz: tzinfo) -> str:
+    """Return the name a timezone can be retrieved by with get_zone."""
+    if isinstance(tz, zoneinfo.ZoneInfo):
+        return tz.key
+
+    return offset_name(tz.utcoffset(None).total_seconds() / 3600)
+
+
+class TransitionTable:
+    """Hold the instants, in UTC, a zone's offset changes at, along with the new offsets.
+    Lets offsets be found by binary search and local times be placed in UTC unambiguously.
+    """
+
+    def __init__(self, tz: tzinfo, start: datetime, stop: datetime):
+        self.tz = tz
+        self.start = start
+        self.stop = stop
+        self.instants: List[datetime] = []
+        # The offset in effect before each instant, plus the one after the last.
+        self.offsets: List[timedelta] = [_offset_at(tz, start)]
+
+        # Zones change offset at most a few times a year, so step by day
+        # and only look closer where the offset changed.
+        day = start
+
+        while day < stop:
+            next_day = day + timedelta(days=1)
+
+            if _offset_at(tz, next_day) != _offset_at(tz, day):
+                instant = _find_transition(tz, day, next_day)
+                self.instants.append(instant)
+                self.offsets.append(_offset_at(tz, instant))
+
+            day = next_day
+
+    def covers(self, instant: datetime) -> bool:
+        """Return whether an instant is within the table's range."""
+        return self.start <= instant < self.stop
+
+    def offset_at(self, instant: datetime) -> timedelta:
+        """Return the zone's offset from UTC at an instant."""
+        if not self.covers(instant):
+            return _offset_at(self.tz, instant)
+
+        return self.offsets[bisect.bisect_right(self.instants, instant)]
+
+    def next_transition(self, after: datetime) -> Optional[datetime]:
+        """Return the first instant after another one the zone's offset changes at."""
+        index = bisect.bisect_right(self.instants, after)
+        return self.instants[index] if index < len(self.instants) else None
+
+    def to_utc(self, local: datetime) -> datetime:
+        """Place a naive local datetime in UTC.
+        Times skipped by a transition move forward by its length. Repeated ones use the earlier.
+        """
+
+        approximate = local.replace(tzinfo=timezone.utc)
+
+        if not self.covers(approximate):
+            return local.replace(tzinfo=self.tz).astimezone(timezone.utc)
+
+        # Every offset in effect within a day of the local time could apply to it.
+        low = bisect.bisect_right(self.instants, approximate - timedelta(days=1))
+        high = bisect.bisect_right(self.instants, approximate + timedelta(days=1))
+        candidates = set(self.offsets[low:high + 1])
+
+        # Try the larger offset first, which gives the earlier instant for repeated times.
+        for offset in sorted(candidates, reverse=True):
+            instant = (local - offset).replace(tzinfo=timezone.utc)
+
+            if self.offset_at(instant) == offset:
+                return instant
+
+        # The local time was skipped. Use the offset from before the transition.
+        offset = min(candidates)
+        return (local - offset).replace(tzinfo=timezone.utc)
+
+
+def _offset_at(tz: tzinfo, instant: datetime) -> timedelta:
+    return instant.astimezone(tz).utcoffset()
+
+
+def _find_transition(tz: tzinfo, low: datetime, high: datetime) -> datetime:
+    # The first minute the zone's offset is the one it has at high.
+    target = _offset_at(tz, high)
+
+    while high - low > timedelta(minutes=1):
+        middle = low + (high - low) / 2
+
+        if _offset_at(tz, middle) == target:
+            high = middle
+        else:
+            low = middle
+
+    return high.replace(second=0, microsecond=0)
+
+
+@functools.lru_cache(maxsize=None)
+def _table(tz: tzinfo, first_year: int) -> TransitionTable:
+    return TransitionTable(tz,
+                           datetime(first_year, 1, 1, tzinfo=timezone.utc),
+                           datetime(first_year + TABLE_YEARS + 1, 1, 1, tzinfo=timezone.utc))
+
+
+def transition_table(tz: tzinfo, year: int = None) -> TransitionTable:
+    """Return the cached transition table for a zone, starting the year before the given one."""
+    if year is None:
+        year = clock.now(timezone.utc).year
+
+    return _table(tz, year - 1)
+
+
+def next_local_time(tz: tzinfo, time: dt.time, after: datetime) -> datetime:
+    """Return the first instant, in UTC, after another one at which a zone's clocks read a time."""
+    table = transition_table(tz, after.astimezone(timezone.utc).year)
+    local_date = after.astimezone(tz).date()
+
+    # Today or tomorrow, unless a transition gets in the way.
+    for days in range(3):
+        instant = table.to_utc(datetime.combine(local_date + timedelta(days=days), time))
+
+        if instant > after:
+            return instant
+
+    raise ValueError(f'{time} never comes after {after} in {tz}')
+
+
+def seconds_until(datetime_: datetime) -> float:
+    """Return how many seconds are left until an instant, measured in UTC.
+    Subtracting datetimes in the same zone measures wall-clock time instead,
+    which is an hour off across a transition.
+    """
+
+    return (datetime_.astimezone(timezone.utc) - clock.now(timezone.utc)).total_seconds()
@@ -0,0 +1,66 @@
+"""Make the bot's packages and the benchmarks' fakes importable, and share fixtures."""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The bot's packages live in /src and are imported as top-level packages.
+for path in (ROOT_PATH, os.path.join(ROOT_PATH, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from utils import clock
+
+
+class RecordingOutbox:
+    """Stand in for the outbox, keeping every message instead of sending it."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, channel, content: str = None, *, embed=None, kind: str = 'message'):
+        self.sent.append((kind, content, embed))
+
+
+@pytest.fixture
+def simulated_clock(monkeypatch) -> clock.SimulatedClock:
+    """Run everything scheduled by date and time on a simulated clock."""
+    simulated = clock.SimulatedClock(datetime(2024, 3, 4, 15, tzinfo=timezone.utc))
+    monkeypatch.setattr(clock, '_clock', simulated)
+    return simulated
+
+
+@pytest.fixture
+def recording_outbox(monkeypatch) -> RecordingOutbox:
+    """Keep the messages models send instead of sending them."""
+    from core import models
+
+    recording = RecordingOutbox()
+    monkeypatch.setattr(models, 'outbox', recording)
+    return recording
+
+
+@pytest.fixture
+def build_team():
+    """Build teams, each in a new guild unless given one. Guilds start tasks, so build
+    them from within a running event loop.
+    """
+
+    from benchmarks import fakes
+    from core import models
+
+    def build(guild: models.Guild = None, name: str = 'team') -> models.Team:
+        if guild is None:
+            guild = models.Guild(fakes.FakeGuild('guild'))
+
+        role = fakes.FakeRole(guild.disc_guild_obj, name)
+        guild.disc_guild_obj.roles.append(role)
+        team = models.Team(role=role)
+        guild.add_team(team)
+        return team
+
+    return build
@@ -0,0 +1,44 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks import fakes
+from core import checks, models
+
+
+def test_indexes_need_a_recent_list_to_pick_from(simulated_clock, recording_outbox, monkeypatch,
+                                                 build_team):
+    now = [1000.0]
+    monkeypatch.setattr(models.time, 'monotonic', lambda: now[0])
+
+    async def scenario():
+        team = build_team()
+        member = fakes.FakeMember(team.role.guild, 'member')
+        due_datetime = datetime(2024, 3, 6, 17, tzinfo=timezone.utc).astimezone(team.guild.tz)
+        task = models.Task('write report', [], due_datetime)
+        team.add_task(task)
+        date = task.due_datetime.date()
+
+        # Nothing was listed, so the index isn't guessed.
+        with pytest.raises(checks.TaskListNotShownError):
+            checks.does_task_exist(team, member, date, '1')
+
+        team.remember_listing(member.id, date, [task])
+        assert checks.does_task_exist(team, member, date, '1') is task
+
+        now[0] += models.Team.LISTING_TTL
+
+        with pytest.raises(checks.TaskListNotShownError):
+            checks.does_task_exist(team, member, date, '1')
+
+        # IDs don't depend on a list.
+        assert checks.does_task_exist(team, member, date, f'#{task.id}') is task
+
+        # Expired lists are dropped as others are shown.
+        team.remember_listing(member.id + 1, date, [task])
+        assert list(team._listings) == [member.id + 1]
+
+        team.guild.close()
+
+    asyncio.run(scenario())
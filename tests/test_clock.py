@@ -0,0 +1,26 @@
+import asyncio
+
+from utils import clock
+
+
+def test_cancelling_wait_for_cancels_what_it_waits_on(simulated_clock):
+    async def scenario():
+        event = asyncio.Event()
+        waiter = asyncio.create_task(clock.wait_for(event.wait(), timeout=60))
+        await simulated_clock.advance(0)
+        waiter.cancel()
+        await simulated_clock.advance(0)
+
+        assert set(asyncio.all_tasks()) == {asyncio.current_task()}
+
+    asyncio.run(scenario())
+
+
+def test_wait_for_times_out_on_simulated_time(simulated_clock):
+    async def scenario():
+        waiter = asyncio.create_task(clock.wait_for(asyncio.Event().wait(), timeout=60))
+        await simulated_clock.advance(60)
+
+        assert isinstance(waiter.exception(), asyncio.TimeoutError)
+
+    asyncio.run(scenario())
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import types
+
+from benchmarks import fakes
+from core import command_sync
+
+
+class FakeDiscordCommands:
+    """Keep registered commands the way Discord does, by scope."""
+
+    def __init__(self, registered: dict):
+        self.registered = registered
+        self.ids = iter(range(1000, 2000))
+
+    async def add_slash_command(self, bot_id, token, guild_id, name, description, options):
+        self.registered.setdefault(guild_id, {})[name] = next(self.ids)
+
+    async def get_all_commands(self, bot_id, token, guild_id=None):
+        return [{'name': name, 'id': id_}
+                for name, id_ in self.registered.get(guild_id, {}).items()]
+
+    async def remove_slash_command(self, bot_id, token, guild_id, command_id):
+        commands = self.registered[guild_id]
+        del commands[next(name for name, id_ in commands.items() if id_ == command_id)]
+
+
+def command(guild_ids=None):
+    return types.SimpleNamespace(description='', options=[], allowed_guild_ids=guild_ids)
+
+
+def sync(monkeypatch, tmp_path, registered: dict, commands: dict, cached: dict = None,
+         guild_ids=()) -> dict:
+    discord_commands = FakeDiscordCommands(registered)
+
+    for name in ('add_slash_command', 'get_all_commands', 'remove_slash_command'):
+        monkeypatch.setattr(command_sync.manage_commands, name, getattr(discord_commands, name))
+
+    monkeypatch.setattr(command_sync, 'MANIFEST_PATH', str(tmp_path / 'commands.json'))
+
+    if cached is not None:
+        with open(command_sync.MANIFEST_PATH, 'w') as fp:
+            json.dump({'hash': 'old', 'commands': cached}, fp)
+
+    bot = fakes.FakeBot()
+    bot.guilds = [types.SimpleNamespace(id=id_) for id_ in guild_ids]
+    bot.http = types.SimpleNamespace(token='token')
+    asyncio.run(command_sync.sync_commands(bot, types.SimpleNamespace(commands=commands)))
+    return {scope: set(names) for scope, names in discord_commands.registered.items() if names}
+
+
+def test_commands_leave_guilds_they_are_no_longer_scoped_to(monkeypatch, tmp_path):
+    registered = {1: {'tasks': 1}, 2: {'tasks': 2}}
+    cached = command_sync.build_manifest(
+        types.SimpleNamespace(commands={'tasks': command([1, 2])}))
+
+    assert sync(monkeypatch, tmp_path, registered, {'tasks': command([2])},
+                cached) == {2: {'tasks'}}
+
+
+def test_first_sync_removes_stale_commands_everywhere(monkeypatch, tmp_path):
+    registered = {None: {'tasks': 1, 'old': 2}, 5: {'tasks': 3}}
+
+    assert sync(monkeypatch, tmp_path, registered, {'tasks': command()},
+                guild_ids=[5, 6]) == {None: {'tasks'}}
@@ -0,0 +1,41 @@
+import asyncio
+
+from benchmarks import fakes
+from cogs.configuration import Configuration
+from core import models
+from utils import iter_utils
+
+CONFIRM = '✅'
+
+
+def test_configure_perms_applies_quick_reactions_in_order():
+    async def scenario() -> dict:
+        bot = fakes.FakeBot()
+        disc_guild = fakes.FakeGuild('guild')
+        author = fakes.FakeMember(disc_guild, 'admin')
+        ctx = fakes.FakeSlashContext(disc_guild, author, 'create_control_role')
+        configuring = asyncio.create_task(Configuration.configure_perms(bot, ctx, 'mods'))
+
+        while not ctx.sent or CONFIRM not in ctx.sent[-1].reactions:
+            await asyncio.sleep(0)
+
+        message = ctx.sent[-1]
+
+        def react(index: int, event: str = 'raw_reaction_add'):
+            emoji = CONFIRM if index is None else iter_utils.DIGIT_EMOJIS[index]
+            bot.dispatch(event, fakes.FakeRawReactionEvent(
+                author.id, message.id, emoji,
+                'REACTION_ADD' if event == 'raw_reaction_add' else 'REACTION_REMOVE'))
+
+        # All at once, faster than a listener could be registered again between them.
+        react(1)
+        react(2)
+        react(1, 'raw_reaction_remove')
+        react(3)
+        react(None)
+        return await configuring
+
+    perms = asyncio.run(scenario())
+
+    assert perms == {permission: index in (1, 2)
+                     for index, permission in enumerate(models.ControlRole.PERMS)}
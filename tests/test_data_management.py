@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from benchmarks import fakes
+from core.data_management import DataManager
+
+
+def test_failing_to_load_still_lets_commands_through(monkeypatch, tmp_path):
+    snapshot_path = tmp_path / 'guilds.snapshot'
+    snapshot_path.write_bytes(b'not a snapshot')
+    monkeypatch.setattr(DataManager, 'SNAPSHOT_PATH', str(snapshot_path))
+    monkeypatch.setattr(DataManager, 'JSON_PATH', str(tmp_path / 'guilds.json'))
+
+    async def scenario():
+        data_manager = DataManager()
+        data_manager.preload_data()
+
+        with pytest.raises(Exception):
+            await data_manager.load_data(fakes.FakeBot())
+
+        await asyncio.wait_for(data_manager.wait_until_bound(), timeout=1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from utils import dt_utils, tz_utils
+
+
+def test_now_snapshot_freezes_now(simulated_clock):
+    async def scenario():
+        with dt_utils.now_snapshot():
+            before = dt_utils.now(timezone.utc)
+            await simulated_clock.advance(60)
+            assert dt_utils.now(timezone.utc) == before
+
+        assert dt_utils.now(timezone.utc) == before + timedelta(seconds=60)
+
+    asyncio.run(scenario())
+
+
+def test_tasks_forgetting_the_snapshot_read_the_clock_later(simulated_clock):
+    async def background() -> tuple:
+        inherited = dt_utils.now(timezone.utc)
+        dt_utils.forget_snapshot()
+        await simulated_clock.sleep(3600)
+        return inherited, dt_utils.now(timezone.utc)
+
+    async def scenario():
+        with dt_utils.now_snapshot():
+            started = dt_utils.now(timezone.utc)
+            task = asyncio.create_task(background())
+
+        await simulated_clock.advance(3600)
+        inherited, later = await task
+
+        assert inherited == started
+        assert later == started + timedelta(seconds=3600)
+
+    asyncio.run(scenario())
+
+
+def test_recurring_series_keep_their_wall_clock_time():
+    new_york = tz_utils.get_zone('America/New_York')
+    # Daylight saving time started on March 10th, 2024.
+    series_start = datetime(2024, 3, 8, 9, tzinfo=new_york)
+    daily = [dt_utils.occurrence(series_start, 'daily', i) for i in range(4)]
+
+    assert [i.astimezone(new_york).time() for i in daily] == [series_start.time()] * 4
+    assert dt_utils.next_occurrence(series_start, 'daily', daily[1]) == daily[2]
+
+
+def test_monthly_series_keep_their_day_of_the_month():
+    series_start = datetime(2024, 1, 31, 9, tzinfo=timezone.utc)
+
+    assert dt_utils.occurrence(series_start, 'monthly', 1).day == 29
+    assert dt_utils.occurrence(series_start, 'monthly', 2).day == 31
+    assert dt_utils.next_occurrence(series_start, 'monthly', datetime(
+        2024, 2, 29, 10, tzinfo=timezone.utc)) == datetime(2024, 3, 31, 9, tzinfo=timezone.utc)
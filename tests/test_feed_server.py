@@ -0,0 +1,25 @@
+import asyncio
+
+from core.feed_server import FeedServer
+
+
+def test_feed_tokens_follow_resets_and_deletions(build_team):
+    async def scenario():
+        feed_server = FeedServer()
+        team = build_team()
+        old_token = team.feed_token
+
+        assert feed_server.get_team(old_token) is team
+
+        team.reset_feed_token()
+
+        assert feed_server.get_team(old_token) is None
+        assert feed_server.get_team(team.feed_token) is team
+
+        team.guild.teams.remove(team)
+        team.close()
+
+        assert feed_server.get_team(team.feed_token) is None
+        team.guild.close()
+
+    asyncio.run(scenario())
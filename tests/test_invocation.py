@@ -0,0 +1,56 @@
+import asyncio
+import io
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from benchmarks import fakes
+from core import invocation
+from core.data_management import data_manager
+
+
+def build_ctx(age: float) -> fakes.FakeSlashContext:
+    disc_guild = fakes.FakeGuild('guild')
+    ctx = fakes.FakeSlashContext(disc_guild, fakes.FakeMember(disc_guild, 'member'), 'slow')
+    created = datetime.now(timezone.utc) - timedelta(seconds=age)
+    ctx.interaction_id = str(discord.utils.time_snowflake(created.replace(tzinfo=None)))
+    return ctx
+
+
+def test_deferral_counts_from_when_the_command_was_invoked(monkeypatch):
+    monkeypatch.setattr(invocation, 'DEFER_AFTER', 0.5)
+
+    @invocation.wrap
+    async def slow(self, ctx):
+        await asyncio.sleep(0.2)
+        await ctx.send('done')
+
+    async def scenario():
+        bound = asyncio.Event()
+        bound.set()
+        monkeypatch.setattr(data_manager, '_bound', bound)
+
+        # Checks took most of the time already.
+        late = build_ctx(age=0.4)
+        fresh = build_ctx(age=0)
+        await asyncio.gather(slow(None, late), slow(None, fresh))
+        return late.deferred, fresh.deferred
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_replies_with_files_can_be_sent_first(monkeypatch):
+    @invocation.wrap
+    async def export(self, ctx):
+        await ctx.send(file=discord.File(io.BytesIO(b'tasks'), 'tasks.csv'))
+
+    async def scenario():
+        bound = asyncio.Event()
+        bound.set()
+        monkeypatch.setattr(data_manager, '_bound', bound)
+
+        ctx = build_ctx(age=0)
+        await asyncio.wait_for(export(None, ctx), 1)
+        return ctx.deferred, ctx.responded
+
+    assert asyncio.run(scenario()) == (True, True)
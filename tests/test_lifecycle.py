@@ -0,0 +1,95 @@
+import asyncio
+from datetime import timedelta
+
+import discord
+
+from benchmarks import fakes, slash
+from cogs.teams import Teams
+from core import lifecycle, models
+from core.data_management import data_manager
+from core.feed_server import feed_server
+from core.response_cache import response_cache
+from utils import clock
+
+
+def add_task(team: models.Team, due_in: timedelta, recurrence: str = None):
+    team.add_task(models.Task('write report', [], clock.now(team.guild.tz) + due_in,
+                              recurrence=recurrence))
+
+
+def test_guilds_are_torn_down_even_if_they_cant_be_archived(monkeypatch, tmp_path,
+                                                           simulated_clock, build_team):
+    monkeypatch.setattr(lifecycle, 'ARCHIVE_DIR', str(tmp_path))
+
+    async def scenario():
+        team = build_team()
+        add_task(team, timedelta(days=1))
+        guild = team.guild
+        monkeypatch.setattr(data_manager, 'guilds', [guild])
+        await simulated_clock.advance(0)
+        notifications = set(asyncio.all_tasks()) - {asyncio.current_task()}
+
+        # Serializing dereferences the target channel, which is gone.
+        guild.disc_guild_obj.text_channels.clear()
+        guild.target_channel = None
+
+        assert lifecycle.remove_guild(guild.disc_guild_obj) is guild
+        await simulated_clock.advance(0)
+
+        assert data_manager.guilds == []
+        assert all(i.done() for i in notifications)
+        assert not any(tmp_path.iterdir())
+
+    asyncio.run(scenario())
+
+
+def test_cancelling_a_recurring_notification_while_it_sends_schedules_nothing(
+        monkeypatch, simulated_clock, build_team):
+    class BlockedOutbox:
+        async def send(self, *args, **kwargs):
+            await asyncio.Event().wait()
+
+    monkeypatch.setattr(models, 'outbox', BlockedOutbox())
+
+    async def scenario():
+        team = build_team()
+        add_task(team, timedelta(minutes=30), recurrence='daily')
+        await simulated_clock.advance(1800)
+        team.close()
+        team.guild.close()
+        await simulated_clock.advance(0)
+
+        assert set(asyncio.all_tasks()) == {asyncio.current_task()}
+
+    asyncio.run(scenario())
+
+
+def test_teams_deleted_by_command_are_torn_down(monkeypatch, tmp_path, simulated_clock,
+                                               build_team):
+    monkeypatch.setattr(lifecycle, 'ARCHIVE_DIR', str(tmp_path))
+
+    async def scenario():
+        team = build_team()
+        guild = team.guild
+        add_task(team, timedelta(days=1))
+        monkeypatch.setattr(data_manager, 'guilds', [guild])
+        monkeypatch.setattr(data_manager, '_bound', asyncio.Event())
+        data_manager._bound.set()
+        response_cache.get_or_render(team, 'tasks', (), lambda: discord.Embed(title='tasks'))
+        feed_server.render(team.feed_token, team)
+
+        admin = fakes.FakeMember(guild.disc_guild_obj, 'admin')
+        ctx = fakes.FakeSlashContext(guild.disc_guild_obj, admin, 'delete_team')
+        await slash.invoke(Teams(None), '_delete_team', ctx, team_role=team.role,
+                           confirmation=str(team.role.id))
+        await simulated_clock.advance(0)
+
+        assert guild.teams == []
+        assert team.role not in guild.disc_guild_obj.roles
+        assert models.Team.get_by_feed_token(team.feed_token) is None
+        assert team.feed_token not in feed_server._cache
+        assert not [key for key in response_cache._entries if key[0] == team.role.id]
+        assert [i.name.split('-')[0] for i in tmp_path.iterdir()] == ['team']
+        guild.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+from core import models
+from utils import dt_utils
+
+
+def test_notifications_scheduled_during_a_command_read_the_clock_when_sent(
+        simulated_clock, recording_outbox, build_team):
+    async def scenario():
+        team = build_team()
+        # Batches wait on the simulated clock, so there's no need to pace the loop.
+        team.guild.auto_batch_notify.change_interval(seconds=0)
+        due_datetime = datetime(2024, 3, 6, 17, tzinfo=timezone.utc).astimezone(team.guild.tz)
+
+        # Commands run with "now" frozen.
+        with dt_utils.now_snapshot():
+            team.add_task(models.Task('write report', [], due_datetime))
+
+        await simulated_clock.advance(3 * 86400)
+        team.guild.close()
+
+    asyncio.run(scenario())
+
+    titles = [embed.title for kind, _, embed in recording_outbox.sent if kind == 'notification']
+    assert any('Reminder' in title and '__today__' in title for title in titles)
+
+
+def test_tasks_due_on_a_date_include_recurring_ones(simulated_clock, build_team):
+    async def scenario():
+        team = build_team()
+        start = datetime(2024, 3, 5, 9, tzinfo=timezone.utc).astimezone(team.guild.tz)
+        weekly = models.Task('stand up', [], start, recurrence='weekly')
+        daily = models.Task('check in', [], start + timedelta(hours=1), recurrence='daily')
+        once = models.Task('write report', [], start)
+
+        for task in (daily, weekly, once):
+            team.add_task(task)
+
+        assert models.Team.tasks_due_on(team.tasks, start.date()) == [weekly, once, daily]
+        # Ten years of occurrences later, only the date is checked.
+        later = start.date() + timedelta(weeks=520)
+        assert models.Team.tasks_due_on(team.tasks, later) == [weekly, daily]
+        assert models.Team.tasks_due_on(team.tasks, later + timedelta(days=1)) == [daily]
+        assert models.Team.tasks_due_on(team.tasks, date(2024, 3, 4)) == []
+
+        team.close()
+
+    asyncio.run(scenario())
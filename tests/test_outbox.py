@@ -0,0 +1,65 @@
+import asyncio
+
+from benchmarks import fakes
+from core.outbox import Outbox
+
+
+def build_outbox(monkeypatch, tmp_path) -> Outbox:
+    monkeypatch.setattr(Outbox, 'PATH', str(tmp_path / 'outbox.json'))
+    return Outbox()
+
+
+async def settle(outbox: Outbox, timeout: float = 1):
+    # The outbox sends on real time, so give it a moment.
+    for _ in range(int(timeout / 0.01)):
+        if not outbox.depth:
+            return
+
+        await asyncio.sleep(0.01)
+
+
+def test_workers_survive_unexpected_errors(monkeypatch, tmp_path):
+    async def scenario():
+        outbox = build_outbox(monkeypatch, tmp_path)
+        guild = fakes.FakeGuild('guild')
+        channel = guild.text_channels[0]
+        sends = channel.send
+
+        async def send(content: str = None, **kwargs):
+            if content == 'broken':
+                raise ValueError(content)
+
+            return await sends(content, **kwargs)
+
+        monkeypatch.setattr(channel, 'send', send)
+        monkeypatch.setattr(Outbox, 'WORKERS', 1)
+        await outbox.start(fakes.FakeBot([guild]))
+        await outbox.send(channel, 'broken')
+        await outbox.send(channel, 'fine')
+        await settle(outbox)
+        await outbox.stop()
+        return [message.content for message in channel.sent]
+
+    assert asyncio.run(scenario()) == ['fine']
+
+
+def test_replies_only_hold_other_messages_back_for_so_long(monkeypatch, tmp_path):
+    monkeypatch.setattr(Outbox, 'MAX_HOLD', 0.1)
+
+    async def scenario():
+        outbox = build_outbox(monkeypatch, tmp_path)
+        guild = fakes.FakeGuild('guild')
+        channel = guild.text_channels[0]
+        await outbox.start(fakes.FakeBot([guild]))
+
+        # A reply that never ends, like one command after another.
+        async with outbox.interactive():
+            await outbox.send(channel, 'reminder', kind='notification')
+            await asyncio.sleep(0.05)
+            held = len(channel.sent)
+            await settle(outbox)
+
+        await outbox.stop()
+        return held, [message.content for message in channel.sent]
+
+    assert asyncio.run(scenario()) == (0, ['reminder'])
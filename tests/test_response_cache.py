@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import discord
+
+from core.response_cache import ResponseCache
+
+
+def render(title: str):
+    renders = []
+
+    def render_embed() -> discord.Embed:
+        renders.append(title)
+        return discord.Embed(title=title)
+
+    return render_embed, renders
+
+
+def test_embeds_are_cached_until_their_team_changes(build_team):
+    async def scenario():
+        cache = ResponseCache()
+        team = build_team()
+        render_tasks, renders = render('tasks')
+
+        first = cache.get_or_render(team, 'tasks', (), render_tasks)
+        first.title = 'changed by the caller'
+        assert cache.get_or_render(team, 'tasks', (), render_tasks).title == 'tasks'
+        assert renders == ['tasks']
+
+        team.touch()
+        cache.get_or_render(team, 'tasks', (), render_tasks)
+        assert renders == ['tasks', 'tasks']
+
+        cache.discard_team(team)
+        assert len(cache) == 0 and cache.size == 0
+        team.guild.close()
+
+    asyncio.run(scenario())
+
+
+def test_least_recently_used_embeds_are_evicted_first(build_team):
+    async def scenario():
+        team = build_team()
+        size = len(json.dumps(discord.Embed(title='view 0').to_dict()))
+        # Room for four embeds of this size, but not five.
+        cache = ResponseCache(max_bytes=4 * size)
+
+        for view in ['view 0', 'view 1', 'view 2', 'view 3']:
+            cache.get_or_render(team, view, (), render(view)[0])
+
+        # Seeing the oldest one again makes the next one the least recently used.
+        cache.get_or_render(team, 'view 0', (), render('view 0')[0])
+        cache.get_or_render(team, 'view 4', (), render('view 4')[0])
+
+        assert [key[1] for key in cache._entries] == ['view 2', 'view 3', 'view 0', 'view 4']
+        assert cache.size <= cache.max_bytes
+        team.guild.close()
+
+    asyncio.run(scenario())
+
+
+def test_embeds_too_big_for_the_budget_are_not_cached(build_team):
+    async def scenario():
+        team = build_team()
+        cache = ResponseCache(max_bytes=100)
+        render_big, renders = render('x' * 100)
+
+        cache.get_or_render(team, 'big', (), render_big)
+        cache.get_or_render(team, 'big', (), render_big)
+
+        assert len(cache) == 0
+        assert len(renders) == 2
+        team.guild.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from core import models, search
+
+DUE = datetime(2024, 3, 4, 15, tzinfo=timezone.utc)
+
+
+def build_index(*contents: str) -> search.TaskIndex:
+    index = search.TaskIndex()
+
+    for days, content in enumerate(contents):
+        index.add(models.Task(content, [], DUE + timedelta(days=days)))
+
+    return index
+
+
+def test_verbatim_matches_outrank_fuzzy_ones():
+    index = build_index('write the quarterly report', 'rewrite reports', 'book flights')
+    results = [task.content for task, _ in index.search('report')]
+
+    assert results == ['write the quarterly report', 'rewrite reports']
+
+
+def test_typos_and_accents_still_match():
+    index = build_index('Café menu review', 'book flights')
+
+    assert [task.content for task, _ in index.search('cafe menu reveiw')] == ['Café menu review']
+    assert index.search('xyz') == []
+    assert index.search('!!') == []
+
+
+def test_ties_go_to_the_task_due_sooner():
+    index = build_index('standup notes', 'standup notes')
+    later, sooner = sorted(index._grams, key=lambda x: x.due_datetime, reverse=True)
+
+    assert [task for task, _ in index.search('standup')] == [sooner, later]
+
+
+def test_removed_and_edited_tasks_are_reindexed():
+    index = build_index('water the plants', 'call the bank')
+    plants, bank = sorted(index._grams, key=lambda x: x.due_datetime)
+
+    index.remove(bank)
+    assert len(index) == 1
+    assert index.search('bank') == []
+    assert not any(bank in postings for postings in index._postings.values())
+
+    plants.content = 'repot the cactus'
+    index.update(plants)
+    assert index.search('plants') == []
+    assert [task for task, _ in index.search('cactus')] == [plants]
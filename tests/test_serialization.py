@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import discord
+import pytest
+
+from core import models, serialization
+from core.feed_server import feed_server
+from core.response_cache import response_cache
+
+
+def test_teams_no_longer_stored_are_torn_down(build_team):
+    async def scenario():
+        guild = build_team().guild
+        build_team(guild, name='team 1')
+        kept, gone = guild.teams
+        record = serialization.encode_guild(guild)
+        record['teams'] = [i for i in record['teams'] if i['role_id'] == kept.role.id]
+
+        response_cache.get_or_render(gone, 'tasks', (), lambda: discord.Embed(title='tasks'))
+        feed_server.render(gone.feed_token, gone)
+        serialization.reconcile_guild(guild, record)
+
+        assert guild.teams == [kept]
+        assert models.Team.get_by_feed_token(gone.feed_token) is None
+        assert gone.feed_token not in feed_server._cache
+        assert not [key for key in response_cache._entries if key[0] == gone.role.id]
+        guild.close()
+
+    asyncio.run(scenario())
+
+
+def add_tasks(team: models.Team):
+    # Stored datetimes keep whole minutes, and notifications stay far off.
+    due = (datetime.now(team.guild.tz) + timedelta(days=1)).replace(second=0, microsecond=0)
+    team.add_task(models.Task('write report', ['work'], due))
+    team.add_task(models.Task('stand up', [], due + timedelta(hours=1), recurrence='weekly'))
+
+
+def describe(tasks):
+    return [(task.id, task.content, task.tags, task.due_datetime, task.recurrence,
+             task.series_start) for task in tasks]
+
+
+@pytest.mark.parametrize('name', sorted(serialization.CODECS))
+def test_codecs_round_trip_documents(name, build_team):
+    codec = serialization.CODECS[name]
+
+    async def scenario():
+        team = build_team()
+        add_tasks(team)
+        document = serialization.encode_guilds([team.guild])
+
+        stored = codec.loads(codec.dumps(document))
+        columns = stored['guilds'][0]['teams'][0]['tasks']
+
+        assert stored == document
+        assert describe(serialization.decode_tasks(columns, team.guild.tz)) == describe(team.tasks)
+        team.guild.close()
+
+    asyncio.run(scenario())
+
+
+def test_data_stored_before_schema_versions_is_upgraded(build_team):
+    async def scenario():
+        team = build_team()
+        add_tasks(team)
+        legacy = team.guild.serialize()
+
+        assert serialization.stored_records([legacy]) == [serialization.encode_guild(team.guild)]
+
+        # Even older data only had an offset, if any.
+        del legacy['tz_name']
+        legacy['tz_offset'] = None
+        assert serialization.upgrade_record(legacy)['tz_name'] == 'UTC-5'
+        team.guild.close()
+
+    asyncio.run(scenario())
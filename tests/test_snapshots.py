@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from core import serialization, snapshots
+
+
+def build_guilds(build_team) -> list:
+    guilds = [build_team().guild, build_team().guild]
+    build_team(guilds[1], name='team 1')
+    return guilds
+
+
+@pytest.mark.parametrize('compression', sorted(snapshots.COMPRESSORS))
+@pytest.mark.parametrize('codec', sorted(serialization.CODECS))
+def test_snapshots_round_trip_guild_by_guild(compression, codec, tmp_path, build_team):
+    path = str(tmp_path / 'guilds.snapshot')
+
+    async def scenario():
+        guilds = build_guilds(build_team)
+        snapshots.write(path, guilds, serialization.CODECS[codec], compression)
+        records = [serialization.encode_guild(guild) for guild in guilds]
+
+        assert list(snapshots.iter_records(path)) == records
+        assert snapshots.read_record(path, guilds[1].disc_guild_obj.id) == records[1]
+        assert snapshots.read_record(path, 0) is None
+        assert snapshots.read(path) == serialization.encode_guilds(guilds)
+
+        with open(path, 'rb') as fp:
+            index = snapshots.read_index(fp)
+
+        assert (index['codec'], index['compression']) == (codec, compression)
+        assert [entry[0] for entry in index['guilds']] == [i['id'] for i in records]
+
+        for guild in guilds:
+            guild.close()
+
+    asyncio.run(scenario())
+
+
+def test_incomplete_snapshots_are_rejected(tmp_path, build_team):
+    path = str(tmp_path / 'guilds.snapshot')
+
+    async def scenario():
+        guilds = build_guilds(build_team)
+        snapshots.write(path, guilds)
+
+        for guild in guilds:
+            guild.close()
+
+    asyncio.run(scenario())
+
+    with open(path, 'rb') as fp:
+        data = fp.read()
+
+    with open(path, 'wb') as fp:
+        fp.write(data[:-1])
+
+    with pytest.raises(ValueError):
+        snapshots.read(path)
@@ -0,0 +1,55 @@
+import asyncio
+import io
+from datetime import datetime
+
+import pytest
+
+from core import checks, models, transfer
+from utils import tz_utils
+
+NEW_YORK = tz_utils.get_zone('America/New_York')
+
+
+@pytest.mark.parametrize('url', [
+    'https://cdn.discordapp.com/attachments/1/2/tasks.csv',
+    'https://media.discordapp.net/attachments/1/2/tasks.ics?size=10',
+])
+def test_attachment_urls_are_accepted(url):
+    assert transfer.is_attachment_url(url)
+
+
+@pytest.mark.parametrize('url', [
+    'http://cdn.discordapp.com/attachments/1/2/tasks.csv',
+    'https://127.0.0.1:9877/metrics',
+    'https://cdn.discordapp.com@169.254.169.254/latest/meta-data',
+    'https://cdn.discordapp.com.example.com/tasks.csv',
+    'https://cdn.discordapp.com:8080/tasks.csv',
+    'file:///etc/passwd',
+])
+def test_other_urls_are_never_requested(url):
+    with pytest.raises(checks.InvalidImportError):
+        asyncio.run(transfer.download(url))
+
+
+def test_recurring_tasks_keep_their_local_time_across_daylight_saving(simulated_clock,
+                                                                      build_team):
+    async def scenario():
+        team = build_team()
+        team.guild.tz = NEW_YORK
+        # Clocks in New York go forward on March 10th, 2024.
+        team.add_task(models.Task('stand up', [], datetime(2024, 3, 8, 9, tzinfo=NEW_YORK),
+                                  recurrence='daily'))
+        text = transfer.export_tasks(team, 'ics').read().decode()
+
+        assert 'DTSTART;TZID=America/New_York:20240308T090000\r\n' in text
+        assert ('BEGIN:DAYLIGHT\r\nDTSTART:20240310T020000\r\n'
+                'TZOFFSETFROM:-0500\r\nTZOFFSETTO:-0400\r\n') in text
+
+        imported = build_team(team.guild, name='imported')
+        task, = transfer.import_tasks(imported, io.BytesIO(text.encode()), 'ics', '09:00')
+
+        assert task.series_start == datetime(2024, 3, 8, 9, tzinfo=NEW_YORK)
+        assert [task.occurrence(i).astimezone(NEW_YORK).hour for i in range(4)] == [9] * 4
+        assert task.occurrence(3).utcoffset() != task.occurrence(0).utcoffset()
+
+    asyncio.run(scenario())
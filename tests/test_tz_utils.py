@@ -0,0 +1,89 @@
+import datetime as dt
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from utils import tz_utils
+
+NEW_YORK = tz_utils.get_zone('America/New_York')
+# Clocks in New York went forward at 2:00 on March 10th, 2024 and back at 2:00 on November 3rd.
+SPRING_FORWARD = datetime(2024, 3, 10, 7, tzinfo=timezone.utc)
+FALL_BACK = datetime(2024, 11, 3, 6, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('name', ['America/New_York', 'Europe/London', 'Australia/Sydney',
+                                  'Australia/Lord_Howe', 'America/Sao_Paulo', 'Asia/Kolkata'])
+def test_table_offsets_match_the_zone(name):
+    tz = tz_utils.get_zone(name)
+    table = tz_utils.transition_table(tz, 2024)
+    instant = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    while instant.year == 2024:
+        assert table.offset_at(instant) == instant.astimezone(tz).utcoffset(), instant
+        instant += timedelta(hours=1)
+
+
+def test_table_finds_transitions_to_the_minute():
+    table = tz_utils.transition_table(NEW_YORK, 2024)
+    in_2024 = [i for i in table.instants if i.year == 2024]
+
+    assert in_2024 == [SPRING_FORWARD, FALL_BACK]
+
+
+def test_skipped_local_times_move_forward():
+    table = tz_utils.transition_table(NEW_YORK, 2024)
+
+    # 2:30 never happened, so it's read as 3:30 in daylight time.
+    assert table.to_utc(datetime(2024, 3, 10, 2, 30)) == datetime(2024, 3, 10, 7, 30,
+                                                                   tzinfo=timezone.utc)
+
+
+def test_repeated_local_times_use_the_earlier_instant():
+    table = tz_utils.transition_table(NEW_YORK, 2024)
+
+    # 1:30 happened twice, first in daylight time.
+    assert table.to_utc(datetime(2024, 11, 3, 1, 30)) == datetime(2024, 11, 3, 5, 30,
+                                                                   tzinfo=timezone.utc)
+
+
+def test_next_local_time_keeps_the_wall_clock_across_transitions():
+    batch_time = dt.time(hour=6)
+    instant = tz_utils.next_local_time(NEW_YORK, batch_time, SPRING_FORWARD - timedelta(days=1))
+    gaps = []
+
+    for _ in range(3):
+        following = tz_utils.next_local_time(NEW_YORK, batch_time, instant)
+        assert following.astimezone(NEW_YORK).time() == batch_time
+        gaps.append(following - instant)
+        instant = following
+
+    assert gaps == [timedelta(hours=23), timedelta(days=1), timedelta(days=1)]
+
+    instant = tz_utils.next_local_time(NEW_YORK, batch_time, FALL_BACK - timedelta(days=1))
+    following = tz_utils.next_local_time(NEW_YORK, batch_time, instant)
+
+    assert following - instant == timedelta(hours=25)
+
+
+def test_next_local_time_on_a_skipped_time():
+    after = datetime(2024, 3, 10, tzinfo=NEW_YORK)
+
+    assert tz_utils.next_local_time(NEW_YORK, dt.time(2, 30), after) == datetime(
+        2024, 3, 10, 7, 30, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('name, offset', [('-5', -5), ('+5.5', 5.5), ('-09:30', -9.5),
+                                          ('UTC-3', -3), ('gmt+1', 1),
+                                          ('America/New_York', None), ('5 pm', None)])
+def test_parse_offset(name, offset):
+    assert tz_utils.parse_offset(name) == offset
+
+
+def test_get_zone():
+    assert tz_utils.get_zone('+5.5').utcoffset(None) == timedelta(hours=5, minutes=30)
+    assert tz_utils.zone_name(tz_utils.get_zone('-5')) == 'UTC-5'
+    assert tz_utils.zone_name(NEW_YORK) == 'America/New_York'
+
+    for name in ['Mars/Olympus_Mons', '+25', '../etc/passwd']:
+        with pytest.raises(ValueError):
+            tz_utils.get_zone(name)